@@ -2,9 +2,11 @@
 # © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
 # and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
 
+import hashlib
 import logging
 
-import requests
+import http_client
+from cache import TTLCache
 from config import get_settings
 from requests import codes, exceptions
 from utils import get_headers
@@ -20,6 +22,19 @@ class AccessClient:
     def __init__(self, connection_string: str, dev_mode: bool):
         self.connection_string = connection_string
         self.dev = dev_mode
+        self.user_details_cache = TTLCache(
+            config_settings.USER_DETAILS_CACHE_SIZE,
+            config_settings.USER_DETAILS_CACHE_TTL,
+        )
+
+    @staticmethod
+    def _cache_key(forwarded_headers: dict) -> str | None:
+        if not forwarded_headers:
+            return None
+        token = "\n".join(
+            f"{name}:{value}" for name, value in sorted(forwarded_headers.items())
+        )
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
     def get_user_details(self, headers):
         # If in dev mode, return dummy data.
@@ -31,12 +46,21 @@ class AccessClient:
                 "email": "test.user@example.com",
             }
 
+        forwarded_headers = get_headers(headers)
+        cache_key = self._cache_key(forwarded_headers)
+        if cache_key is not None:
+            cached = self.user_details_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+
         # Build the full URL for the API call.
         url = f"{config_settings.IDENTITY_API_URL}/api/v1/user-details"
         logger.info("Making API call to %s", url)
 
         try:
-            res = requests.get(url, headers=get_headers(headers))
+            res = http_client.get_session().get(
+                url, headers=forwarded_headers, timeout=http_client.get_timeout()
+            )
         except exceptions.RequestException as e:
             logger.exception("Error making API call: %s", e)
             raise e
@@ -45,11 +69,14 @@ class AccessClient:
             data = res.json()
             logger.info("Received successful response from API")
             # Map displayName to username, username to user_id and email to email.
-            return {
+            user_details = {
                 "username": data["content"]["displayName"],
                 "user_id": data["content"]["username"],
                 "email": data["content"]["email"],
             }
+            if cache_key is not None:
+                self.user_details_cache.set(cache_key, user_details)
+            return dict(user_details)
         else:
             logger.error(
                 "API call returned error status %s: %s", res.status_code, res.text
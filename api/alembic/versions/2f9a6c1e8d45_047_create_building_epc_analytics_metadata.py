@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+"""047_create_building_epc_analytics_metadata
+
+Revision ID: 2f9a6c1e8d45
+Revises: e81d5b7c4a09
+Create Date: 2026-03-20 15:12:33.471028
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2f9a6c1e8d45"
+down_revision: Union[str, None] = "e81d5b7c4a09"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS building_epc_analytics_aggregates_snapshot_date_idx
+        ON iris.building_epc_analytics_aggregates(snapshot_date);
+        """
+    )
+
+    # A single row describing the snapshots in the aggregates, read by the API in place of
+    # scanning them. The dashboard cache keys its results on the versions of all its source
+    # views, so no version of the aggregates alone is kept here.
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS iris.building_epc_analytics_metadata (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            latest_snapshot_date DATE,
+            snapshot_dates DATE[] NOT NULL DEFAULT '{}',
+            refreshed_at TIMESTAMPTZ
+        );
+
+        INSERT INTO iris.building_epc_analytics_metadata (id) VALUES (TRUE)
+        ON CONFLICT DO NOTHING;
+        """
+    )
+
+    # The snapshot dates are read from the index one at a time, rather than by scanning
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION iris.refresh_building_epc_analytics_metadata()
+        RETURNS void
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            UPDATE iris.building_epc_analytics_metadata
+            SET snapshot_dates = snapshots.dates,
+                latest_snapshot_date = snapshots.dates[array_upper(snapshots.dates, 1)],
+                refreshed_at = now()
+            FROM (
+                WITH RECURSIVE snapshot AS (
+                    (
+                        SELECT snapshot_date
+                        FROM iris.building_epc_analytics_aggregates
+                        ORDER BY snapshot_date
+                        LIMIT 1
+                    )
+                    UNION ALL
+                    SELECT (
+                        SELECT a.snapshot_date
+                        FROM iris.building_epc_analytics_aggregates a
+                        WHERE a.snapshot_date > snapshot.snapshot_date
+                        ORDER BY a.snapshot_date
+                        LIMIT 1
+                    )
+                    FROM snapshot
+                    WHERE snapshot.snapshot_date IS NOT NULL
+                )
+                SELECT COALESCE(
+                    array_agg(snapshot_date ORDER BY snapshot_date)
+                        FILTER (WHERE snapshot_date IS NOT NULL),
+                    '{}'
+                ) AS dates
+                FROM snapshot
+            ) snapshots;
+        END;
+        $$;
+
+        CREATE OR REPLACE FUNCTION iris.mark_building_epc_analytics_aggregates_changed()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM iris.refresh_building_epc_analytics_metadata();
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    op.execute(
+        """
+        CREATE TRIGGER building_epc_analytics_aggregates_metadata_change
+        AFTER INSERT OR UPDATE OR DELETE ON iris.building_epc_analytics_aggregates
+        FOR EACH STATEMENT EXECUTE FUNCTION iris.mark_building_epc_analytics_aggregates_changed();
+
+        CREATE TRIGGER building_epc_analytics_aggregates_metadata_truncate
+        AFTER TRUNCATE ON iris.building_epc_analytics_aggregates
+        FOR EACH STATEMENT EXECUTE FUNCTION iris.mark_building_epc_analytics_aggregates_changed();
+        """
+    )
+
+    op.execute(
+        """
+        SELECT iris.refresh_building_epc_analytics_metadata();
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        DROP TRIGGER IF EXISTS building_epc_analytics_aggregates_metadata_truncate
+        ON iris.building_epc_analytics_aggregates;
+        DROP TRIGGER IF EXISTS building_epc_analytics_aggregates_metadata_change
+        ON iris.building_epc_analytics_aggregates;
+        DROP FUNCTION IF EXISTS iris.mark_building_epc_analytics_aggregates_changed();
+        DROP FUNCTION IF EXISTS iris.refresh_building_epc_analytics_metadata();
+        DROP TABLE IF EXISTS iris.building_epc_analytics_metadata;
+        DROP INDEX IF EXISTS iris.building_epc_analytics_aggregates_snapshot_date_idx;
+        """
+    )
@@ -0,0 +1,575 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+"""043_incremental_building_epc_analytics
+
+Revision ID: 5b1e7d3c9a20
+Revises: 79071c04f576
+Create Date: 2026-03-09 10:41:27.302915
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1e7d3c9a20"
+down_revision: Union[str, None] = "79071c04f576"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The building_epc_analytics definition from migration 035. The filters are empty for a full
+# rebuild, or restrict every source to the UPRNs being refreshed.
+BUILDING_EPC_ANALYTICS_SELECT = """
+    WITH active_epcs AS (
+        SELECT DISTINCT ON (epc_assessment.uprn) epc_assessment.id,
+            epc_assessment.uprn,
+            epc_assessment.epc_rating,
+            epc_assessment.lodgement_date,
+            epc_assessment.sap_rating,
+            epc_assessment.expiry_date
+        FROM iris.epc_assessment
+        WHERE epc_assessment.lodgement_date IS NOT NULL AND epc_assessment.expiry_date >= CURRENT_DATE
+            {active_epcs_filter}
+        ORDER BY epc_assessment.uprn, epc_assessment.lodgement_date DESC
+    ), year_end_dates AS (
+        SELECT generate_series(date_trunc('year'::text, (( SELECT min(epc_assessment.lodgement_date) AS min
+        FROM iris.epc_assessment
+        WHERE epc_assessment.lodgement_date IS NOT NULL))::timestamp with time zone)::date + '1 year'::interval - '1 day'::interval, date_trunc('year'::text, CURRENT_DATE::timestamp with time zone)::date + '1 year'::interval - '1 day'::interval, '1 year'::interval)::date AS snapshot_date
+    ), snapshot_lookup AS (
+        WITH epc_snapshots AS (
+            SELECT ea_1.uprn,
+                ea_1.lodgement_date,
+                yed.snapshot_date,
+                row_number() OVER (
+                    PARTITION BY ea_1.uprn, yed.snapshot_date ORDER BY ea_1.lodgement_date DESC
+                ) AS rn
+            FROM iris.epc_assessment ea_1
+            CROSS JOIN year_end_dates yed
+            WHERE ea_1.lodgement_date <= yed.snapshot_date AND ea_1.expiry_date >= yed.snapshot_date AND ea_1.lodgement_date IS NOT NULL AND ea_1.expiry_date IS NOT NULL
+                {snapshot_filter}
+    )
+        SELECT epc_snapshots.uprn,
+            epc_snapshots.lodgement_date,
+            array_agg(epc_snapshots.snapshot_date ORDER BY epc_snapshots.snapshot_date) AS active_snapshots
+        FROM epc_snapshots
+        WHERE epc_snapshots.rn = 1
+        GROUP BY epc_snapshots.uprn, epc_snapshots.lodgement_date
+    )
+    SELECT b.uprn,
+        b.point,
+        b.is_residential,
+        ea.lodgement_date,
+        ea.epc_rating,
+        ea.sap_rating,
+        ea.expiry_date,
+        COALESCE(su_epc.type, su_build.type) AS type,
+        COALESCE(su_epc.built_form, su_build.built_form) AS built_form,
+        COALESCE(su_epc.fuel_type, su_build.fuel_type) AS fuel_type,
+        COALESCE(su_epc.window_glazing, su_build.window_glazing) AS window_glazing,
+        COALESCE(su_epc.wall_construction, su_build.wall_construction) AS wall_construction,
+        COALESCE(su_epc.wall_insulation, su_build.wall_insulation) AS wall_insulation,
+        COALESCE(su_epc.roof_construction, su_build.roof_construction) AS roof_construction,
+        COALESCE(su_epc.roof_insulation, su_build.roof_insulation) AS roof_insulation,
+        COALESCE(su_epc.roof_insulation_thickness, su_build.roof_insulation_thickness) AS roof_insulation_thickness,
+        COALESCE(su_epc.floor_construction, su_build.floor_construction) AS floor_construction,
+        COALESCE(su_epc.floor_insulation, su_build.floor_insulation) AS floor_insulation,
+        COALESCE(su_epc.has_roof_solar_panels, su_build.has_roof_solar_panels) AS has_roof_solar_panels,
+        COALESCE(su_epc.roof_material, su_build.roof_material) AS roof_material,
+        COALESCE(su_epc.roof_aspect_area_facing_north_m2, su_build.roof_aspect_area_facing_north_m2) AS roof_aspect_area_facing_north_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_east_m2, su_build.roof_aspect_area_facing_east_m2) AS roof_aspect_area_facing_east_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_south_m2, su_build.roof_aspect_area_facing_south_m2) AS roof_aspect_area_facing_south_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_west_m2, su_build.roof_aspect_area_facing_west_m2) AS roof_aspect_area_facing_west_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_north_east_m2, su_build.roof_aspect_area_facing_north_east_m2) AS roof_aspect_area_facing_north_east_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_south_east_m2, su_build.roof_aspect_area_facing_south_east_m2) AS roof_aspect_area_facing_south_east_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_south_west_m2, su_build.roof_aspect_area_facing_south_west_m2) AS roof_aspect_area_facing_south_west_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_north_west_m2, su_build.roof_aspect_area_facing_north_west_m2) AS roof_aspect_area_facing_north_west_m2,
+        COALESCE(su_epc.roof_aspect_area_indeterminable_m2, su_build.roof_aspect_area_indeterminable_m2) AS roof_aspect_area_indeterminable_m2,
+        COALESCE(su_epc.roof_shape, su_build.roof_shape) AS roof_shape,
+        COALESCE(er.name, sawr.name) AS region_name,
+        blcc.name AS county_name,
+        dbu.name AS district_name,
+        COALESCE(dbuw.name, ued.name) AS ward_name,
+        CASE
+            WHEN aes.id IS NOT NULL THEN true
+            ELSE false
+        END AS epc_active,
+        sl.active_snapshots
+    FROM iris.building b
+    LEFT JOIN iris.epc_assessment ea ON ea.uprn = b.uprn
+    LEFT JOIN active_epcs aes ON ea.id = aes.id
+    LEFT JOIN snapshot_lookup sl ON sl.uprn = b.uprn AND sl.lodgement_date = ea.lodgement_date
+    LEFT JOIN iris.structure_unit su_epc ON su_epc.epc_assessment_id = ea.id
+    LEFT JOIN iris.structure_unit su_build ON su_build.uprn = b.uprn AND su_build.epc_assessment_id IS NULL AND ea.id IS NULL
+    JOIN iris.boundary_line_ceremonial_counties blcc ON st_contains(blcc.geometry, b.point)
+    JOIN iris.district_borough_unitary dbu ON st_contains(dbu.geometry, b.point)
+    LEFT JOIN iris.district_borough_unitary_ward dbuw ON st_contains(dbuw.geometry, b.point)
+    LEFT JOIN iris.unitary_electoral_division ued ON st_contains(ued.geometry, b.point)
+    LEFT JOIN iris.english_region er ON er.fid = dbu.english_region_fid
+    LEFT JOIN iris.scotland_and_wales_region sawr ON sawr.fid = dbu.scotland_and_wales_region_fid
+    WHERE (su_epc.epc_assessment_id IS NOT NULL OR su_build.uprn IS NOT NULL)
+        {building_filter}
+"""
+
+# The building_epc_analytics_aggregates definition from migration 035. The filter is empty for
+# a full rebuild, or restricts the rows aggregated to the (district, ward) areas being refreshed.
+BUILDING_EPC_ANALYTICS_AGGREGATES_SELECT = """
+    WITH snapshot_dates AS (
+        SELECT generate_series(
+            DATE_TRUNC('year', (SELECT MIN(lodgement_date) FROM iris.building_epc_analytics WHERE lodgement_date IS NOT NULL))::date + interval '1 year' - interval '1 day',
+            DATE_TRUNC('year', CURRENT_DATE)::date + interval '1 year' - interval '1 day',
+            interval '1 year'
+        )::date as snapshot_date
+    ),
+    issued_counts AS (
+        SELECT
+            sd.snapshot_date,
+            bea.region_name,
+            bea.county_name,
+            bea.district_name,
+            bea.ward_name,
+            bea.type,
+            COUNT(DISTINCT bea.uprn) as total_issued_count
+        FROM snapshot_dates sd
+        CROSS JOIN iris.building_epc_analytics bea
+        WHERE bea.lodgement_date <= sd.snapshot_date
+          AND bea.active_snapshots IS NOT NULL
+          {area_filter}
+        GROUP BY sd.snapshot_date, bea.region_name, bea.county_name, bea.district_name, bea.ward_name, bea.type
+    ),
+    active_aggregates AS (
+        SELECT
+            unnest(active_snapshots) as snapshot_date,
+            region_name,
+            county_name,
+            district_name,
+            ward_name,
+            type,
+            COUNT(*) as active_epc_count,
+            SUM(sap_rating) as sum_sap_rating,
+            COUNT(*) FILTER (WHERE epc_rating = 'A') as count_rating_a,
+            COUNT(*) FILTER (WHERE epc_rating = 'B') as count_rating_b,
+            COUNT(*) FILTER (WHERE epc_rating = 'C') as count_rating_c,
+            COUNT(*) FILTER (WHERE epc_rating = 'D') as count_rating_d,
+            COUNT(*) FILTER (WHERE epc_rating = 'E') as count_rating_e,
+            COUNT(*) FILTER (WHERE epc_rating = 'F') as count_rating_f,
+            COUNT(*) FILTER (WHERE epc_rating = 'G') as count_rating_g
+        FROM iris.building_epc_analytics
+        WHERE active_snapshots IS NOT NULL
+          {area_filter}
+        GROUP BY snapshot_date, region_name, county_name, district_name, ward_name, type
+    )
+    SELECT
+        aa.snapshot_date,
+        aa.region_name,
+        aa.county_name,
+        aa.district_name,
+        aa.ward_name,
+        aa.type,
+        aa.active_epc_count,
+        aa.sum_sap_rating,
+        aa.count_rating_a,
+        aa.count_rating_b,
+        aa.count_rating_c,
+        aa.count_rating_d,
+        aa.count_rating_e,
+        aa.count_rating_f,
+        aa.count_rating_g,
+        (ic.total_issued_count - aa.active_epc_count) as expired_epc_count
+    FROM active_aggregates aa
+    JOIN issued_counts ic
+        ON aa.snapshot_date = ic.snapshot_date
+        AND aa.region_name IS NOT DISTINCT FROM ic.region_name
+        AND aa.county_name IS NOT DISTINCT FROM ic.county_name
+        AND aa.district_name IS NOT DISTINCT FROM ic.district_name
+        AND aa.ward_name IS NOT DISTINCT FROM ic.ward_name
+        AND aa.type IS NOT DISTINCT FROM ic.type
+"""
+
+AREA_FILTER = """
+          AND district_name = ANY(p_districts)
+          AND (district_name, COALESCE(ward_name, '')) IN (
+              SELECT * FROM unnest(p_districts, p_wards)
+          )
+"""
+
+FULL_BUILDING_EPC_ANALYTICS_SELECT = BUILDING_EPC_ANALYTICS_SELECT.format(
+    active_epcs_filter="", snapshot_filter="", building_filter=""
+)
+UPRNS_BUILDING_EPC_ANALYTICS_SELECT = BUILDING_EPC_ANALYTICS_SELECT.format(
+    active_epcs_filter="AND epc_assessment.uprn = ANY(p_uprns)",
+    snapshot_filter="AND ea_1.uprn = ANY(p_uprns)",
+    building_filter="AND b.uprn = ANY(p_uprns)",
+)
+FULL_AGGREGATES_SELECT = BUILDING_EPC_ANALYTICS_AGGREGATES_SELECT.format(area_filter="")
+AREAS_AGGREGATES_SELECT = BUILDING_EPC_ANALYTICS_AGGREGATES_SELECT.format(
+    area_filter=AREA_FILTER
+)
+
+# Every view and materialized view built on a relation, directly or through other views
+DEPENDENT_VIEWS_QUERY = """
+    WITH RECURSIVE dependent AS (
+        SELECT r.ev_class AS oid, 1 AS depth
+        FROM pg_depend d
+        JOIN pg_rewrite r ON r.oid = d.objid
+        WHERE d.classid = 'pg_rewrite'::regclass
+          AND d.refobjid = to_regclass(:relation)
+          AND r.ev_class <> d.refobjid
+        UNION ALL
+        SELECT r.ev_class, dependent.depth + 1
+        FROM dependent
+        JOIN pg_depend d ON d.refobjid = dependent.oid AND d.classid = 'pg_rewrite'::regclass
+        JOIN pg_rewrite r ON r.oid = d.objid
+        WHERE r.ev_class <> d.refobjid
+    )
+    SELECT
+        quote_ident(n.nspname) || '.' || quote_ident(c.relname) AS name,
+        c.relkind,
+        c.relispopulated,
+        pg_get_viewdef(c.oid) AS definition,
+        ARRAY(
+            SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i WHERE i.indrelid = c.oid
+        ) AS index_definitions,
+        max(dependent.depth) AS depth
+    FROM dependent
+    JOIN pg_class c ON c.oid = dependent.oid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    GROUP BY c.oid, n.nspname, c.relname, c.relkind, c.relispopulated
+    ORDER BY depth
+"""
+
+INDEX_DEFINITIONS_QUERY = """
+    SELECT pg_get_indexdef(i.indexrelid)
+    FROM pg_index i
+    WHERE i.indrelid = to_regclass(:relation)
+"""
+
+
+def _dependent_views(relation: str, exclude: Sequence[str] = ()) -> list:
+    rows = op.get_bind().execute(text(DEPENDENT_VIEWS_QUERY), {"relation": relation})
+    return [row for row in rows if row.name not in exclude]
+
+
+def _index_definitions(relation: str) -> list[str]:
+    rows = op.get_bind().execute(text(INDEX_DEFINITIONS_QUERY), {"relation": relation})
+    return [row[0] for row in rows]
+
+
+def _recreate_views(views: list, with_data: bool) -> None:
+    """Recreates dropped views in dependency order, along with their indexes."""
+    for view in views:
+        definition = view.definition.strip().rstrip(";")
+        if view.relkind == "v":
+            op.execute(f"CREATE VIEW {view.name} AS {definition};")
+            continue
+        data = "WITH DATA" if with_data and view.relispopulated else "WITH NO DATA"
+        op.execute(f"CREATE MATERIALIZED VIEW {view.name} AS {definition} {data};")
+        for index_definition in view.index_definitions:
+            op.execute(index_definition + ";")
+
+
+def _copy_to_table(view: str, table: str) -> None:
+    op.execute(f"CREATE TABLE {table} (LIKE {view});")
+    op.execute(
+        f"""
+        DO $$
+        BEGIN
+            IF (SELECT relispopulated FROM pg_class WHERE oid = '{view}'::regclass) THEN
+                INSERT INTO {table} SELECT * FROM {view};
+            END IF;
+        END;
+        $$;
+        """
+    )
+
+
+def _create_refresh_functions():
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION iris.refresh_building_epc_analytics_aggregates(
+            p_districts text[] DEFAULT NULL,
+            p_wards text[] DEFAULT NULL
+        )
+        RETURNS bigint
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_rows bigint;
+        BEGIN
+            -- NULL rebuilds every aggregate, otherwise p_districts and p_wards are parallel
+            -- arrays of the (district, ward) areas to recompute, with '' for no ward
+            IF p_districts IS NULL THEN
+                TRUNCATE iris.building_epc_analytics_aggregates;
+                INSERT INTO iris.building_epc_analytics_aggregates
+                {FULL_AGGREGATES_SELECT};
+            ELSE
+                DELETE FROM iris.building_epc_analytics_aggregates
+                WHERE TRUE
+                {AREA_FILTER};
+                INSERT INTO iris.building_epc_analytics_aggregates
+                {AREAS_AGGREGATES_SELECT};
+            END IF;
+
+            GET DIAGNOSTICS v_rows = ROW_COUNT;
+            RETURN v_rows;
+        END;
+        $$;
+        """
+    )
+
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION iris.refresh_building_epc_analytics(
+            p_uprns text[] DEFAULT NULL
+        )
+        RETURNS bigint
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_rows bigint;
+            v_districts text[];
+            v_wards text[];
+        BEGIN
+            -- NULL rebuilds every row, otherwise only the rows of the given UPRNs are
+            -- recomputed along with the aggregates of the areas they were and are now in
+            IF p_uprns IS NULL THEN
+                TRUNCATE iris.building_epc_analytics;
+                INSERT INTO iris.building_epc_analytics
+                {FULL_BUILDING_EPC_ANALYTICS_SELECT};
+                GET DIAGNOSTICS v_rows = ROW_COUNT;
+                PERFORM iris.refresh_building_epc_analytics_aggregates();
+                RETURN v_rows;
+            END IF;
+
+            WITH deleted AS (
+                DELETE FROM iris.building_epc_analytics
+                WHERE uprn = ANY(p_uprns)
+                RETURNING district_name, ward_name
+            )
+            SELECT array_agg(district_name), array_agg(ward_name)
+            INTO v_districts, v_wards
+            FROM (
+                SELECT DISTINCT district_name, COALESCE(ward_name, '') AS ward_name
+                FROM deleted
+            ) area;
+
+            INSERT INTO iris.building_epc_analytics
+            {UPRNS_BUILDING_EPC_ANALYTICS_SELECT};
+            GET DIAGNOSTICS v_rows = ROW_COUNT;
+
+            SELECT array_agg(district_name), array_agg(ward_name)
+            INTO v_districts, v_wards
+            FROM (
+                SELECT district_name, COALESCE(ward_name, '') AS ward_name
+                FROM iris.building_epc_analytics
+                WHERE uprn = ANY(p_uprns)
+                UNION
+                SELECT * FROM unnest(v_districts, v_wards)
+            ) area
+            WHERE district_name IS NOT NULL;
+
+            IF v_districts IS NOT NULL THEN
+                PERFORM iris.refresh_building_epc_analytics_aggregates(v_districts, v_wards);
+            END IF;
+            RETURN v_rows;
+        END;
+        $$;
+        """
+    )
+
+
+def _create_change_log():
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS iris.building_epc_analytics_dirty_uprn (
+            uprn TEXT PRIMARY KEY,
+            changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """
+    )
+
+    # A single row recording when the analytics were last brought up to date
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS iris.building_epc_analytics_refresh_state (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            refreshed_on DATE,
+            full_refreshed_at TIMESTAMPTZ,
+            min_lodgement_date DATE
+        );
+
+        INSERT INTO iris.building_epc_analytics_refresh_state (id) VALUES (TRUE)
+        ON CONFLICT DO NOTHING;
+        """
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION iris.mark_building_epc_analytics_dirty()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO iris.building_epc_analytics_dirty_uprn (uprn)
+                SELECT DISTINCT uprn FROM new_rows WHERE uprn IS NOT NULL
+                ON CONFLICT (uprn) DO NOTHING;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                INSERT INTO iris.building_epc_analytics_dirty_uprn (uprn)
+                SELECT DISTINCT uprn FROM old_rows WHERE uprn IS NOT NULL
+                ON CONFLICT (uprn) DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    # Structure units lodged with an EPC may only be linked to their UPRN through it
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION iris.mark_structure_unit_building_epc_analytics_dirty()
+        RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO iris.building_epc_analytics_dirty_uprn (uprn)
+                SELECT DISTINCT COALESCE(r.uprn, ea.uprn)
+                FROM new_rows r
+                LEFT JOIN iris.epc_assessment ea ON ea.id = r.epc_assessment_id
+                WHERE COALESCE(r.uprn, ea.uprn) IS NOT NULL
+                ON CONFLICT (uprn) DO NOTHING;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                INSERT INTO iris.building_epc_analytics_dirty_uprn (uprn)
+                SELECT DISTINCT COALESCE(r.uprn, ea.uprn)
+                FROM old_rows r
+                LEFT JOIN iris.epc_assessment ea ON ea.id = r.epc_assessment_id
+                WHERE COALESCE(r.uprn, ea.uprn) IS NOT NULL
+                ON CONFLICT (uprn) DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        """
+    )
+
+    # Statement level triggers with transition tables, so bulk loads log each UPRN once per
+    # statement rather than firing per row
+    for table, function in [
+        ("building", "mark_building_epc_analytics_dirty"),
+        ("epc_assessment", "mark_building_epc_analytics_dirty"),
+        ("structure_unit", "mark_structure_unit_building_epc_analytics_dirty"),
+    ]:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_epc_analytics_insert
+            AFTER INSERT ON iris.{table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION iris.{function}();
+
+            CREATE TRIGGER {table}_epc_analytics_update
+            AFTER UPDATE ON iris.{table}
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION iris.{function}();
+
+            CREATE TRIGGER {table}_epc_analytics_delete
+            AFTER DELETE ON iris.{table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION iris.{function}();
+            """
+        )
+
+
+def _drop_change_log():
+    for table in ["building", "epc_assessment", "structure_unit"]:
+        for event in ["insert", "update", "delete"]:
+            op.execute(
+                f"DROP TRIGGER IF EXISTS {table}_epc_analytics_{event} ON iris.{table};"
+            )
+
+    op.execute(
+        """
+        DROP FUNCTION IF EXISTS iris.mark_structure_unit_building_epc_analytics_dirty();
+        DROP FUNCTION IF EXISTS iris.mark_building_epc_analytics_dirty();
+        DROP TABLE IF EXISTS iris.building_epc_analytics_refresh_state;
+        DROP TABLE IF EXISTS iris.building_epc_analytics_dirty_uprn;
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    aggregates = "iris.building_epc_analytics_aggregates"
+    dependent_views = _dependent_views("iris.building_epc_analytics", exclude=[aggregates])
+    analytics_indexes = _index_definitions("iris.building_epc_analytics")
+    aggregates_indexes = _index_definitions(aggregates)
+
+    # Copy the current rows across so the dashboards keep working until the first refresh
+    _copy_to_table("iris.building_epc_analytics", "iris.building_epc_analytics_table")
+    _copy_to_table(aggregates, "iris.building_epc_analytics_aggregates_table")
+
+    op.execute("DROP MATERIALIZED VIEW iris.building_epc_analytics CASCADE;")
+    op.execute(
+        "ALTER TABLE iris.building_epc_analytics_table RENAME TO building_epc_analytics;"
+    )
+    op.execute(
+        "ALTER TABLE iris.building_epc_analytics_aggregates_table RENAME TO building_epc_analytics_aggregates;"
+    )
+    for index_definition in analytics_indexes + aggregates_indexes:
+        op.execute(index_definition + ";")
+
+    _recreate_views(dependent_views, with_data=True)
+
+    _create_refresh_functions()
+
+    _create_change_log()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    aggregates = "iris.building_epc_analytics_aggregates"
+    dependent_views = _dependent_views("iris.building_epc_analytics")
+    dependent_names = {view.name for view in dependent_views}
+    dependent_views += [
+        view for view in _dependent_views(aggregates) if view.name not in dependent_names
+    ]
+    analytics_indexes = _index_definitions("iris.building_epc_analytics")
+    aggregates_indexes = _index_definitions(aggregates)
+
+    _drop_change_log()
+
+    op.execute(
+        """
+        DROP FUNCTION IF EXISTS iris.refresh_building_epc_analytics(text[]);
+        DROP FUNCTION IF EXISTS iris.refresh_building_epc_analytics_aggregates(text[], text[]);
+        """
+    )
+
+    op.execute(f"DROP TABLE {aggregates} CASCADE;")
+    op.execute("DROP TABLE iris.building_epc_analytics CASCADE;")
+
+    op.execute(
+        f"""
+        CREATE MATERIALIZED VIEW iris.building_epc_analytics AS (
+            {FULL_BUILDING_EPC_ANALYTICS_SELECT}
+        ) WITH NO DATA;
+        """
+    )
+    op.execute(
+        f"""
+        CREATE MATERIALIZED VIEW {aggregates} AS
+        {FULL_AGGREGATES_SELECT}
+        WITH NO DATA;
+        """
+    )
+    for index_definition in analytics_indexes + aggregates_indexes:
+        op.execute(index_definition + ";")
+
+    _recreate_views(dependent_views, with_data=False)
@@ -0,0 +1,49 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+"""048_create_data_load_state
+
+Revision ID: 5d8b3e7a2c61
+Revises: 2f9a6c1e8d45
+Create Date: 2026-03-23 10:41:57.208316
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d8b3e7a2c61"
+down_revision: Union[str, None] = "2f9a6c1e8d45"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One row per data load run by developer-resources/init_data.py, so a load already
+    # completed from the same source is not run again
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS iris.data_load_state (
+            name TEXT PRIMARY KEY,
+            source TEXT,
+            status TEXT NOT NULL,
+            started_at TIMESTAMPTZ,
+            duration_seconds DOUBLE PRECISION,
+            error TEXT,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        DROP TABLE IF EXISTS iris.data_load_state;
+        """
+    )
@@ -0,0 +1,108 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+"""042_create_current_epc_assessment_view
+
+Revision ID: 79071c04f576
+Revises: c12c1758afac
+Create Date: 2026-03-02 09:12:44.518203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "79071c04f576"
+down_revision: Union[str, None] = "c12c1758afac"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # The current EPC for a UPRN is the best address match, then the latest lodgement.
+    # One row per structure unit of that assessment, so (uprn, structure_unit_rank) is unique
+    # and the view can be refreshed concurrently.
+    # Created with data as the bounding-box queries read from it directly.
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS iris.current_epc_assessment AS
+        WITH current_epc AS (
+            SELECT DISTINCT ON (uprn)
+                id,
+                uprn,
+                epc_rating,
+                lodgement_date,
+                sap_rating,
+                expiry_date,
+                match_score
+            FROM iris.epc_assessment
+            WHERE uprn IS NOT NULL
+            ORDER BY
+                uprn,
+                match_score desc nulls first,
+                lodgement_date desc nulls last,
+                id desc
+        )
+        SELECT
+            ce.uprn,
+            row_number() OVER (PARTITION BY ce.uprn ORDER BY su.type) AS structure_unit_rank,
+            ce.id AS epc_assessment_id,
+            ce.epc_rating,
+            ce.lodgement_date,
+            ce.sap_rating,
+            ce.expiry_date,
+            ce.match_score,
+            su.type AS structure_unit_type,
+            su.built_form,
+            su.fuel_type,
+            su.window_glazing,
+            su.wall_construction,
+            su.wall_insulation,
+            su.floor_construction,
+            su.floor_insulation,
+            su.roof_construction,
+            su.roof_insulation,
+            su.roof_insulation_thickness,
+            su.has_roof_solar_panels,
+            su.roof_material,
+            su.roof_aspect_area_facing_north_m2,
+            su.roof_aspect_area_facing_north_east_m2,
+            su.roof_aspect_area_facing_east_m2,
+            su.roof_aspect_area_facing_south_east_m2,
+            su.roof_aspect_area_facing_south_m2,
+            su.roof_aspect_area_facing_south_west_m2,
+            su.roof_aspect_area_facing_west_m2,
+            su.roof_aspect_area_facing_north_west_m2,
+            su.roof_aspect_area_indeterminable_m2
+        FROM current_epc ce
+        LEFT JOIN iris.structure_unit su ON su.epc_assessment_id = ce.id;
+        """
+    )
+
+    op.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS current_epc_assessment_uprn_rank_idx
+        ON iris.current_epc_assessment(uprn, structure_unit_rank);
+        """
+    )
+
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS current_epc_assessment_epc_assessment_id_idx
+        ON iris.current_epc_assessment(epc_assessment_id);
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        DROP MATERIALIZED VIEW IF EXISTS iris.current_epc_assessment;
+        """
+    )
@@ -0,0 +1,58 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+"""045_create_materialized_view_refresh_log
+
+Revision ID: 7c4e2a9f1b36
+Revises: a3f18c6d2e57
+Create Date: 2026-03-16 09:22:08.640517
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c4e2a9f1b36"
+down_revision: Union[str, None] = "a3f18c6d2e57"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One row per view per run of developer-resources/refresh_materialized_views.py
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS iris.materialized_view_refresh_log (
+            id BIGSERIAL PRIMARY KEY,
+            run_id UUID NOT NULL,
+            view_name TEXT NOT NULL,
+            status TEXT NOT NULL,
+            concurrently BOOLEAN NOT NULL DEFAULT FALSE,
+            started_at TIMESTAMPTZ,
+            duration_seconds DOUBLE PRECISION,
+            row_count BIGINT,
+            error TEXT,
+            logged_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """
+    )
+
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS materialized_view_refresh_log_view_name_idx
+        ON iris.materialized_view_refresh_log(view_name, logged_at DESC);
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        DROP TABLE IF EXISTS iris.materialized_view_refresh_log;
+        """
+    )
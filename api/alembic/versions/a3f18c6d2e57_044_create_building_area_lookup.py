@@ -0,0 +1,420 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+"""044_create_building_area_lookup
+
+Revision ID: a3f18c6d2e57
+Revises: 5b1e7d3c9a20
+Create Date: 2026-03-12 14:05:51.118402
+
+"""
+
+import importlib.util
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3f18c6d2e57"
+down_revision: Union[str, None] = "5b1e7d3c9a20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Boundaries are split into parts of at most this many vertices, so the point-in-polygon tests
+# only load small geometries and the GiST index stays selective
+BOUNDARY_PART_MAX_VERTICES = 256
+
+# The building_epc_analytics definition from migration 043, taking each building's areas from
+# iris.building_area instead of testing it against every boundary
+BUILDING_EPC_ANALYTICS_SELECT = """
+    WITH active_epcs AS (
+        SELECT DISTINCT ON (epc_assessment.uprn) epc_assessment.id,
+            epc_assessment.uprn,
+            epc_assessment.epc_rating,
+            epc_assessment.lodgement_date,
+            epc_assessment.sap_rating,
+            epc_assessment.expiry_date
+        FROM iris.epc_assessment
+        WHERE epc_assessment.lodgement_date IS NOT NULL AND epc_assessment.expiry_date >= CURRENT_DATE
+            {active_epcs_filter}
+        ORDER BY epc_assessment.uprn, epc_assessment.lodgement_date DESC
+    ), year_end_dates AS (
+        SELECT generate_series(date_trunc('year'::text, (( SELECT min(epc_assessment.lodgement_date) AS min
+        FROM iris.epc_assessment
+        WHERE epc_assessment.lodgement_date IS NOT NULL))::timestamp with time zone)::date + '1 year'::interval - '1 day'::interval, date_trunc('year'::text, CURRENT_DATE::timestamp with time zone)::date + '1 year'::interval - '1 day'::interval, '1 year'::interval)::date AS snapshot_date
+    ), snapshot_lookup AS (
+        WITH epc_snapshots AS (
+            SELECT ea_1.uprn,
+                ea_1.lodgement_date,
+                yed.snapshot_date,
+                row_number() OVER (
+                    PARTITION BY ea_1.uprn, yed.snapshot_date ORDER BY ea_1.lodgement_date DESC
+                ) AS rn
+            FROM iris.epc_assessment ea_1
+            CROSS JOIN year_end_dates yed
+            WHERE ea_1.lodgement_date <= yed.snapshot_date AND ea_1.expiry_date >= yed.snapshot_date AND ea_1.lodgement_date IS NOT NULL AND ea_1.expiry_date IS NOT NULL
+                {snapshot_filter}
+    )
+        SELECT epc_snapshots.uprn,
+            epc_snapshots.lodgement_date,
+            array_agg(epc_snapshots.snapshot_date ORDER BY epc_snapshots.snapshot_date) AS active_snapshots
+        FROM epc_snapshots
+        WHERE epc_snapshots.rn = 1
+        GROUP BY epc_snapshots.uprn, epc_snapshots.lodgement_date
+    )
+    SELECT b.uprn,
+        b.point,
+        b.is_residential,
+        ea.lodgement_date,
+        ea.epc_rating,
+        ea.sap_rating,
+        ea.expiry_date,
+        COALESCE(su_epc.type, su_build.type) AS type,
+        COALESCE(su_epc.built_form, su_build.built_form) AS built_form,
+        COALESCE(su_epc.fuel_type, su_build.fuel_type) AS fuel_type,
+        COALESCE(su_epc.window_glazing, su_build.window_glazing) AS window_glazing,
+        COALESCE(su_epc.wall_construction, su_build.wall_construction) AS wall_construction,
+        COALESCE(su_epc.wall_insulation, su_build.wall_insulation) AS wall_insulation,
+        COALESCE(su_epc.roof_construction, su_build.roof_construction) AS roof_construction,
+        COALESCE(su_epc.roof_insulation, su_build.roof_insulation) AS roof_insulation,
+        COALESCE(su_epc.roof_insulation_thickness, su_build.roof_insulation_thickness) AS roof_insulation_thickness,
+        COALESCE(su_epc.floor_construction, su_build.floor_construction) AS floor_construction,
+        COALESCE(su_epc.floor_insulation, su_build.floor_insulation) AS floor_insulation,
+        COALESCE(su_epc.has_roof_solar_panels, su_build.has_roof_solar_panels) AS has_roof_solar_panels,
+        COALESCE(su_epc.roof_material, su_build.roof_material) AS roof_material,
+        COALESCE(su_epc.roof_aspect_area_facing_north_m2, su_build.roof_aspect_area_facing_north_m2) AS roof_aspect_area_facing_north_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_east_m2, su_build.roof_aspect_area_facing_east_m2) AS roof_aspect_area_facing_east_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_south_m2, su_build.roof_aspect_area_facing_south_m2) AS roof_aspect_area_facing_south_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_west_m2, su_build.roof_aspect_area_facing_west_m2) AS roof_aspect_area_facing_west_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_north_east_m2, su_build.roof_aspect_area_facing_north_east_m2) AS roof_aspect_area_facing_north_east_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_south_east_m2, su_build.roof_aspect_area_facing_south_east_m2) AS roof_aspect_area_facing_south_east_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_south_west_m2, su_build.roof_aspect_area_facing_south_west_m2) AS roof_aspect_area_facing_south_west_m2,
+        COALESCE(su_epc.roof_aspect_area_facing_north_west_m2, su_build.roof_aspect_area_facing_north_west_m2) AS roof_aspect_area_facing_north_west_m2,
+        COALESCE(su_epc.roof_aspect_area_indeterminable_m2, su_build.roof_aspect_area_indeterminable_m2) AS roof_aspect_area_indeterminable_m2,
+        COALESCE(su_epc.roof_shape, su_build.roof_shape) AS roof_shape,
+        ba.region_name,
+        ba.county_name,
+        ba.district_name,
+        ba.ward_name,
+        CASE
+            WHEN aes.id IS NOT NULL THEN true
+            ELSE false
+        END AS epc_active,
+        sl.active_snapshots
+    FROM iris.building b
+    JOIN iris.building_area ba ON ba.uprn = b.uprn
+    LEFT JOIN iris.epc_assessment ea ON ea.uprn = b.uprn
+    LEFT JOIN active_epcs aes ON ea.id = aes.id
+    LEFT JOIN snapshot_lookup sl ON sl.uprn = b.uprn AND sl.lodgement_date = ea.lodgement_date
+    LEFT JOIN iris.structure_unit su_epc ON su_epc.epc_assessment_id = ea.id
+    LEFT JOIN iris.structure_unit su_build ON su_build.uprn = b.uprn AND su_build.epc_assessment_id IS NULL AND ea.id IS NULL
+    WHERE (su_epc.epc_assessment_id IS NOT NULL OR su_build.uprn IS NOT NULL)
+        AND ba.county_fid IS NOT NULL
+        AND ba.district_fid IS NOT NULL
+        {building_filter}
+"""
+
+FULL_BUILDING_EPC_ANALYTICS_SELECT = BUILDING_EPC_ANALYTICS_SELECT.format(
+    active_epcs_filter="", snapshot_filter="", building_filter=""
+)
+UPRNS_BUILDING_EPC_ANALYTICS_SELECT = BUILDING_EPC_ANALYTICS_SELECT.format(
+    active_epcs_filter="AND epc_assessment.uprn = ANY(p_uprns)",
+    snapshot_filter="AND ea_1.uprn = ANY(p_uprns)",
+    building_filter="AND b.uprn = ANY(p_uprns)",
+)
+
+BUILDING_AREA_COLUMNS = [
+    "county_fid",
+    "county_name",
+    "district_fid",
+    "district_name",
+    "english_region_fid",
+    "scotland_and_wales_region_fid",
+    "region_name",
+    "ward_fid",
+    "electoral_division_fid",
+    "ward_name",
+]
+
+
+def _load_revision(filename: str):
+    """Loads an earlier revision's module, to reuse its definitions on downgrade."""
+    spec = importlib.util.spec_from_file_location(
+        filename.removesuffix(".py"), Path(__file__).with_name(filename)
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _create_tables():
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS iris.boundary_part (
+            level TEXT NOT NULL,
+            fid INTEGER NOT NULL,
+            geom geometry(Geometry, 4326) NOT NULL
+        );
+        """
+    )
+
+    for level in ["county", "district", "ward", "electoral_division"]:
+        op.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS boundary_part_{level}_geom_idx
+            ON iris.boundary_part USING GIST(geom)
+            WHERE level = '{level}';
+            """
+        )
+
+    # No foreign keys to the boundaries, as reloading a boundary truncates it with CASCADE
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS iris.building_area (
+            uprn TEXT PRIMARY KEY REFERENCES iris.building(uprn) ON DELETE CASCADE,
+            county_fid INTEGER,
+            county_name VARCHAR,
+            district_fid INTEGER,
+            district_name VARCHAR,
+            english_region_fid INTEGER,
+            scotland_and_wales_region_fid INTEGER,
+            region_name VARCHAR,
+            ward_fid INTEGER,
+            electoral_division_fid INTEGER,
+            ward_name VARCHAR,
+            refreshed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """
+    )
+
+    # A single row recording the version of the boundaries building_area was computed from
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS iris.building_area_refresh_state (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            boundary_version TEXT,
+            refreshed_at TIMESTAMPTZ
+        );
+
+        INSERT INTO iris.building_area_refresh_state (id) VALUES (TRUE)
+        ON CONFLICT DO NOTHING;
+        """
+    )
+
+
+def _create_functions():
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION iris.refresh_boundary_parts()
+        RETURNS bigint
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_rows bigint;
+        BEGIN
+            TRUNCATE iris.boundary_part;
+            INSERT INTO iris.boundary_part (level, fid, geom)
+            SELECT 'county', fid, ST_Subdivide(geometry, {BOUNDARY_PART_MAX_VERTICES})
+            FROM iris.boundary_line_ceremonial_counties
+            UNION ALL
+            SELECT 'district', fid, ST_Subdivide(geometry, {BOUNDARY_PART_MAX_VERTICES})
+            FROM iris.district_borough_unitary
+            UNION ALL
+            SELECT 'ward', fid, ST_Subdivide(geometry, {BOUNDARY_PART_MAX_VERTICES})
+            FROM iris.district_borough_unitary_ward
+            UNION ALL
+            SELECT 'electoral_division', fid, ST_Subdivide(geometry, {BOUNDARY_PART_MAX_VERTICES})
+            FROM iris.unitary_electoral_division;
+            GET DIAGNOSTICS v_rows = ROW_COUNT;
+            ANALYZE iris.boundary_part;
+            RETURN v_rows;
+        END;
+        $$;
+        """
+    )
+
+    columns = ", ".join(BUILDING_AREA_COLUMNS)
+    updates = ", ".join(f"{column} = excluded.{column}" for column in BUILDING_AREA_COLUMNS)
+    current = ", ".join(f"building_area.{column}" for column in BUILDING_AREA_COLUMNS)
+    excluded = ", ".join(f"excluded.{column}" for column in BUILDING_AREA_COLUMNS)
+    # A building is placed in the lowest fid part it intersects. Unlike the ST_Contains joins
+    # this replaces, a building exactly on a boundary is assigned to one of the areas sharing
+    # it, rather than to none.
+    parts = "\n".join(
+        f"""
+            LEFT JOIN LATERAL (
+                SELECT p.fid FROM iris.boundary_part p
+                WHERE p.level = '{level}' AND ST_Intersects(p.geom, b.point)
+                ORDER BY p.fid
+                LIMIT 1
+            ) {level} ON true"""
+        for level in ["county", "district", "ward", "electoral_division"]
+    )
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION iris.refresh_building_area(
+            p_uprns text[] DEFAULT NULL,
+            p_log_changes boolean DEFAULT true
+        )
+        RETURNS bigint
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_rows bigint;
+        BEGIN
+            -- Placing buildings before the boundaries are subdivided would give them no areas,
+            -- dropping them from the analytics until the boundaries next change
+            IF (p_uprns IS NULL OR cardinality(p_uprns) > 0)
+                AND NOT EXISTS (SELECT 1 FROM iris.boundary_part)
+            THEN
+                RAISE EXCEPTION 'iris.boundary_part is empty, run iris.refresh_boundary_parts() first';
+            END IF;
+
+            -- NULL recomputes every building. Buildings whose areas change are logged for the
+            -- incremental analytics refresh, unless the caller is that refresh.
+            WITH area AS (
+                SELECT
+                    b.uprn,
+                    county.fid AS county_fid,
+                    blcc.name AS county_name,
+                    district.fid AS district_fid,
+                    dbu.name AS district_name,
+                    dbu.english_region_fid,
+                    dbu.scotland_and_wales_region_fid,
+                    COALESCE(er.name, sawr.name) AS region_name,
+                    ward.fid AS ward_fid,
+                    electoral_division.fid AS electoral_division_fid,
+                    COALESCE(dbuw.name, ued.name) AS ward_name
+                FROM iris.building b
+                {parts}
+                LEFT JOIN iris.boundary_line_ceremonial_counties blcc ON blcc.fid = county.fid
+                LEFT JOIN iris.district_borough_unitary dbu ON dbu.fid = district.fid
+                LEFT JOIN iris.district_borough_unitary_ward dbuw ON dbuw.fid = ward.fid
+                LEFT JOIN iris.unitary_electoral_division ued ON ued.fid = electoral_division.fid
+                LEFT JOIN iris.english_region er ON er.fid = dbu.english_region_fid
+                LEFT JOIN iris.scotland_and_wales_region sawr ON sawr.fid = dbu.scotland_and_wales_region_fid
+                WHERE p_uprns IS NULL OR b.uprn = ANY(p_uprns)
+            ),
+            upserted AS (
+                INSERT INTO iris.building_area (uprn, {columns})
+                SELECT uprn, {columns} FROM area
+                ON CONFLICT (uprn) DO UPDATE
+                SET {updates}, refreshed_at = now()
+                WHERE ({current}) IS DISTINCT FROM ({excluded})
+                RETURNING uprn, (xmax <> 0) AS updated
+            ),
+            logged AS (
+                INSERT INTO iris.building_epc_analytics_dirty_uprn (uprn)
+                SELECT uprn FROM upserted WHERE updated AND p_log_changes
+                ON CONFLICT (uprn) DO NOTHING
+            )
+            SELECT count(*) INTO v_rows FROM upserted;
+            RETURN v_rows;
+        END;
+        $$;
+        """
+    )
+
+
+def _create_refresh_building_epc_analytics_function():
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION iris.refresh_building_epc_analytics(
+            p_uprns text[] DEFAULT NULL
+        )
+        RETURNS bigint
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_rows bigint;
+            v_districts text[];
+            v_wards text[];
+        BEGIN
+            -- NULL rebuilds every row, otherwise only the rows of the given UPRNs are
+            -- recomputed along with the aggregates of the areas they were and are now in
+            IF p_uprns IS NULL THEN
+                -- areas are kept up to date as boundaries are loaded, only new buildings
+                -- need placing
+                PERFORM iris.refresh_building_area(
+                    ARRAY(
+                        SELECT b.uprn
+                        FROM iris.building b
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM iris.building_area ba WHERE ba.uprn = b.uprn
+                        )
+                    ),
+                    false
+                );
+                TRUNCATE iris.building_epc_analytics;
+                INSERT INTO iris.building_epc_analytics
+                {FULL_BUILDING_EPC_ANALYTICS_SELECT};
+                GET DIAGNOSTICS v_rows = ROW_COUNT;
+                PERFORM iris.refresh_building_epc_analytics_aggregates();
+                RETURN v_rows;
+            END IF;
+
+            PERFORM iris.refresh_building_area(p_uprns, false);
+
+            WITH deleted AS (
+                DELETE FROM iris.building_epc_analytics
+                WHERE uprn = ANY(p_uprns)
+                RETURNING district_name, ward_name
+            )
+            SELECT array_agg(district_name), array_agg(ward_name)
+            INTO v_districts, v_wards
+            FROM (
+                SELECT DISTINCT district_name, COALESCE(ward_name, '') AS ward_name
+                FROM deleted
+            ) area;
+
+            INSERT INTO iris.building_epc_analytics
+            {UPRNS_BUILDING_EPC_ANALYTICS_SELECT};
+            GET DIAGNOSTICS v_rows = ROW_COUNT;
+
+            SELECT array_agg(district_name), array_agg(ward_name)
+            INTO v_districts, v_wards
+            FROM (
+                SELECT district_name, COALESCE(ward_name, '') AS ward_name
+                FROM iris.building_epc_analytics
+                WHERE uprn = ANY(p_uprns)
+                UNION
+                SELECT * FROM unnest(v_districts, v_wards)
+            ) area
+            WHERE district_name IS NOT NULL;
+
+            IF v_districts IS NOT NULL THEN
+                PERFORM iris.refresh_building_epc_analytics_aggregates(v_districts, v_wards);
+            END IF;
+            RETURN v_rows;
+        END;
+        $$;
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _create_tables()
+
+    _create_functions()
+
+    _create_refresh_building_epc_analytics_function()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    migration_043 = _load_revision("5b1e7d3c9a20_043_incremental_building_epc_analytics.py")
+
+    migration_043._create_refresh_functions()
+
+    op.execute(
+        """
+        DROP FUNCTION IF EXISTS iris.refresh_building_area(text[], boolean);
+        DROP FUNCTION IF EXISTS iris.refresh_boundary_parts();
+        DROP TABLE IF EXISTS iris.building_area_refresh_state;
+        DROP TABLE IF EXISTS iris.building_area;
+        DROP TABLE IF EXISTS iris.boundary_part;
+        """
+    )
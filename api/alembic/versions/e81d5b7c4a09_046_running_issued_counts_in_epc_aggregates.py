@@ -0,0 +1,226 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+"""046_running_issued_counts_in_epc_aggregates
+
+Revision ID: e81d5b7c4a09
+Revises: 7c4e2a9f1b36
+Create Date: 2026-03-18 11:37:45.905163
+
+"""
+
+import importlib.util
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e81d5b7c4a09"
+down_revision: Union[str, None] = "7c4e2a9f1b36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The aggregates from migration 043 with the same rows. Each building is counted once, at the
+# year end of its first lodgement, and a running sum over the years gives the number issued
+# by each snapshot, where 043 joined every building to every snapshot date.
+BUILDING_EPC_ANALYTICS_AGGREGATES_SELECT = """
+    WITH first_issued AS (
+        SELECT
+            snapshot_date,
+            region_name,
+            county_name,
+            district_name,
+            ward_name,
+            type,
+            COUNT(*) as issued_count
+        FROM (
+            SELECT
+                (DATE_TRUNC('year', MIN(lodgement_date)) + interval '1 year' - interval '1 day')::date as snapshot_date,
+                region_name,
+                county_name,
+                district_name,
+                ward_name,
+                type
+            FROM iris.building_epc_analytics
+            WHERE active_snapshots IS NOT NULL
+              {area_filter}
+            GROUP BY uprn, region_name, county_name, district_name, ward_name, type
+        ) first_lodgements
+        GROUP BY snapshot_date, region_name, county_name, district_name, ward_name, type
+    ),
+    active_aggregates AS (
+        SELECT
+            unnest(active_snapshots) as snapshot_date,
+            region_name,
+            county_name,
+            district_name,
+            ward_name,
+            type,
+            COUNT(*) as active_epc_count,
+            SUM(sap_rating) as sum_sap_rating,
+            COUNT(*) FILTER (WHERE epc_rating = 'A') as count_rating_a,
+            COUNT(*) FILTER (WHERE epc_rating = 'B') as count_rating_b,
+            COUNT(*) FILTER (WHERE epc_rating = 'C') as count_rating_c,
+            COUNT(*) FILTER (WHERE epc_rating = 'D') as count_rating_d,
+            COUNT(*) FILTER (WHERE epc_rating = 'E') as count_rating_e,
+            COUNT(*) FILTER (WHERE epc_rating = 'F') as count_rating_f,
+            COUNT(*) FILTER (WHERE epc_rating = 'G') as count_rating_g
+        FROM iris.building_epc_analytics
+        WHERE active_snapshots IS NOT NULL
+          {area_filter}
+        GROUP BY snapshot_date, region_name, county_name, district_name, ward_name, type
+    ),
+    -- grouping treats missing names as equal, as the IS NOT DISTINCT FROM join in 043 did
+    snapshots AS (
+        SELECT
+            snapshot_date,
+            region_name,
+            county_name,
+            district_name,
+            ward_name,
+            type,
+            MAX(issued_count) as issued_count,
+            MAX(active_epc_count) as active_epc_count,
+            MAX(sum_sap_rating) as sum_sap_rating,
+            MAX(count_rating_a) as count_rating_a,
+            MAX(count_rating_b) as count_rating_b,
+            MAX(count_rating_c) as count_rating_c,
+            MAX(count_rating_d) as count_rating_d,
+            MAX(count_rating_e) as count_rating_e,
+            MAX(count_rating_f) as count_rating_f,
+            MAX(count_rating_g) as count_rating_g
+        FROM (
+            SELECT
+                snapshot_date, region_name, county_name, district_name, ward_name, type,
+                issued_count,
+                NULL::bigint as active_epc_count,
+                NULL::bigint as sum_sap_rating,
+                NULL::bigint as count_rating_a,
+                NULL::bigint as count_rating_b,
+                NULL::bigint as count_rating_c,
+                NULL::bigint as count_rating_d,
+                NULL::bigint as count_rating_e,
+                NULL::bigint as count_rating_f,
+                NULL::bigint as count_rating_g
+            FROM first_issued
+            UNION ALL
+            SELECT
+                snapshot_date, region_name, county_name, district_name, ward_name, type,
+                NULL::bigint as issued_count,
+                active_epc_count,
+                sum_sap_rating,
+                count_rating_a,
+                count_rating_b,
+                count_rating_c,
+                count_rating_d,
+                count_rating_e,
+                count_rating_f,
+                count_rating_g
+            FROM active_aggregates
+        ) counts
+        GROUP BY snapshot_date, region_name, county_name, district_name, ward_name, type
+    ),
+    running AS (
+        SELECT
+            snapshots.*,
+            SUM(issued_count) OVER (
+                PARTITION BY region_name, county_name, district_name, ward_name, type
+                ORDER BY snapshot_date
+            )::bigint as total_issued_count
+        FROM snapshots
+    )
+    SELECT
+        snapshot_date,
+        region_name,
+        county_name,
+        district_name,
+        ward_name,
+        type,
+        active_epc_count,
+        sum_sap_rating,
+        count_rating_a,
+        count_rating_b,
+        count_rating_c,
+        count_rating_d,
+        count_rating_e,
+        count_rating_f,
+        count_rating_g,
+        (total_issued_count - active_epc_count) as expired_epc_count
+    FROM running
+    WHERE active_epc_count IS NOT NULL
+"""
+
+AREA_FILTER = """
+              AND district_name = ANY(p_districts)
+              AND (district_name, COALESCE(ward_name, '')) IN (
+                  SELECT * FROM unnest(p_districts, p_wards)
+              )
+"""
+
+FULL_AGGREGATES_SELECT = BUILDING_EPC_ANALYTICS_AGGREGATES_SELECT.format(area_filter="")
+AREAS_AGGREGATES_SELECT = BUILDING_EPC_ANALYTICS_AGGREGATES_SELECT.format(
+    area_filter=AREA_FILTER
+)
+
+
+def _load_revision(filename: str):
+    """Loads an earlier revision's module, to reuse its definitions on downgrade."""
+    spec = importlib.util.spec_from_file_location(
+        filename.removesuffix(".py"), Path(__file__).with_name(filename)
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _create_aggregates_function(full_select: str, areas_select: str, area_filter: str):
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION iris.refresh_building_epc_analytics_aggregates(
+            p_districts text[] DEFAULT NULL,
+            p_wards text[] DEFAULT NULL
+        )
+        RETURNS bigint
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            v_rows bigint;
+        BEGIN
+            -- NULL rebuilds every aggregate, otherwise p_districts and p_wards are parallel
+            -- arrays of the (district, ward) areas to recompute, with '' for no ward
+            IF p_districts IS NULL THEN
+                TRUNCATE iris.building_epc_analytics_aggregates;
+                INSERT INTO iris.building_epc_analytics_aggregates
+                {full_select};
+            ELSE
+                DELETE FROM iris.building_epc_analytics_aggregates
+                WHERE TRUE
+                {area_filter};
+                INSERT INTO iris.building_epc_analytics_aggregates
+                {areas_select};
+            END IF;
+
+            GET DIAGNOSTICS v_rows = ROW_COUNT;
+            RETURN v_rows;
+        END;
+        $$;
+        """
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The aggregates hold the same rows either way, so they are not rebuilt here
+    _create_aggregates_function(FULL_AGGREGATES_SELECT, AREAS_AGGREGATES_SELECT, AREA_FILTER)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    migration_043 = _load_revision("5b1e7d3c9a20_043_incremental_building_epc_analytics.py")
+    _create_aggregates_function(
+        migration_043.FULL_AGGREGATES_SELECT,
+        migration_043.AREAS_AGGREGATES_SELECT,
+        migration_043.AREA_FILTER,
+    )
@@ -1,5 +1,6 @@
 import os
 from functools import lru_cache
+from typing import Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,6 +13,11 @@ class Settings(BaseSettings):
 
     ENVIRONMENT: str = "DEV"
     PORT: int = 5021
+    WORKERS: int = 1
+    LOOP: str = "auto"
+    HTTP_PROTOCOL: str = "auto"
+    GRACEFUL_SHUTDOWN_TIMEOUT: int = 25
+    LIMIT_MAX_REQUESTS: Optional[int] = None
 
     DB_USERNAME: str
     DB_PASSWORD: str
@@ -25,6 +31,7 @@ class Settings(BaseSettings):
     DATASET: str = "knowledge"
     DATA_URI: str = "http://ndtp.co.uk/data#"
     UPDATE_MODE: str = "SCG"
+    COMBINED_BUILDING_QUERY: bool = False
     ACCESS_PROTOCOL: str = "http"
     ACCESS_HOST: str = "localhost"
     ACCESS_PORT: int = 8091
@@ -35,6 +42,50 @@ class Settings(BaseSettings):
     BOOTSTRAP_SERVERS: str = "localhost:9092"
     IES_TOPIC: str = "knowledge"
     DB_QUERY_TIMEOUT: int = 29
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_COMMAND_TIMEOUT: Optional[float] = None
+    DB_PGBOUNCER: bool = False
+    DB_STREAM_PARTITION_SIZE: int = 2000
+
+    HTTP_MAX_HOSTS: int = 10
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 30.0
+    HTTP_MAX_RETRIES: int = 2
+    HTTP_RETRY_BACKOFF: float = 0.5
+
+    USER_DETAILS_CACHE_SIZE: int = 1024
+    USER_DETAILS_CACHE_TTL: float = 60.0
+
+    GEOJSON_CACHE_CHECK_INTERVAL: float = 5.0
+    GEOJSON_GZIP_LEVEL: int = 6
+    GEOJSON_BROTLI_QUALITY: int = 5
+
+    TILE_CACHE_SIZE: int = 1024
+    TILE_CACHE_TTL: float = 300.0
+    BUILDING_TILE_MIN_ZOOM: int = 11
+
+    DASHBOARD_CACHE_BACKEND: str = "local"
+    DASHBOARD_CACHE_URL: Optional[str] = None
+    DASHBOARD_CACHE_SIZE: int = 512
+    DASHBOARD_CACHE_TTL: float = 3600.0
+    DASHBOARD_CACHE_CHECK_INTERVAL: float = 5.0
+    DASHBOARD_BATCH_CONCURRENCY: int = 4
+    SNAPSHOT_METADATA_ENABLED: bool = True
+
+    POLYGON_SELECTION_CACHE_SIZE: int = 16
+    POLYGON_SELECTION_CACHE_TTL: float = 900.0
+    POLYGON_SELECTION_MAX_UPRNS: int = 10000
+    POLYGON_MAX_VERTICES: int = 5000
+    POLYGON_MAX_AREA_KM2: float = 25000.0
+    POLYGON_SIMPLIFY_TOLERANCE: float = 0.00001
+    POLYGON_SUBDIVIDE_MAX_VERTICES: int = 256
 
     def get_db_connection_string(self):
         if self.ENVIRONMENT == "TEST":
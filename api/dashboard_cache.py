@@ -0,0 +1,300 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Optional, Protocol
+
+from cache import TTLCache
+from config import get_settings
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils import PolygonSelection, expand_wales_region, polygon_hash
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # redis is only needed for the shared backend
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# The tables and materialized views the dashboard charts are computed from
+DASHBOARD_SOURCE_VIEWS = [
+    "iris.building_epc_analytics",
+    "iris.building_epc_analytics_aggregates",
+    "iris.building_extreme_weather_analytics",
+    "iris.building_weather_analytics",
+    "iris.building_weather_analytics_aggregates",
+    "iris.ons_deprivation_metrics_analytics",
+    "iris.oa_area_membership_mv",
+    "iris.oa_boundaries_analytics",
+]
+
+# Changes whenever one of the views is refreshed, see VIEW_VERSION_QUERY in layer_cache
+DATA_VERSION_QUERY = """
+    SELECT string_agg(
+        c.oid::text || ':' || c.relfilenode::text || ':' ||
+            COALESCE(s.n_tup_ins + s.n_tup_upd + s.n_tup_del, 0)::text,
+        ',' ORDER BY c.oid
+    )
+    FROM unnest(CAST(:views AS text[])) AS v(name)
+    JOIN pg_class c ON c.oid = to_regclass(v.name)
+    LEFT JOIN pg_stat_all_tables s ON s.relid = c.oid
+"""
+
+
+class DashboardCacheBackend(Protocol):
+    async def get(self, key: str) -> Any: ...
+
+    async def set(self, key: str, value: Any) -> None: ...
+
+    async def clear(self) -> None: ...
+
+
+class LocalDashboardCacheBackend:
+    """
+    Holds dashboard results in an in-process LRU cache, so each API worker has its own entries.
+
+    Args:
+        max_size (int): The maximum number of results held.
+        ttl_seconds (float | None): How long a result is kept.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: Optional[float] = None):
+        self._cache = TTLCache(max_size, ttl_seconds)
+
+    async def get(self, key: str) -> Any:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any) -> None:
+        self._cache.set(key, value)
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+
+class SharedDashboardCacheBackend:
+    """
+    Holds dashboard results as JSON in a key-value store shared by every API replica.
+
+    Args:
+        client: An asynchronous client with the `get`, `set`, `delete` and `scan_iter` methods of
+            `redis.asyncio.Redis`.
+        ttl_seconds (float | None): How long a result is kept.
+        prefix (str): Prepended to every key written to the store.
+    """
+
+    def __init__(
+        self, client, ttl_seconds: Optional[float] = None, prefix: str = "iris:dashboard:"
+    ):
+        self._client = client
+        self._ttl_seconds = ttl_seconds
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Any:
+        value = await self._client.get(self._prefix + key)
+        return None if value is None else json.loads(value)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self._client.set(
+            self._prefix + key,
+            json.dumps(value, separators=(",", ":")),
+            ex=int(self._ttl_seconds) if self._ttl_seconds else None,
+        )
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._client.scan_iter(match=self._prefix + "*")]
+        if keys:
+            await self._client.delete(*keys)
+
+
+class LocalSharedCacheClient:
+    """
+    A dictionary standing in for a shared store client, for running the shared backend
+    without a Redis server e.g. in tests.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._values: dict[str, tuple[Optional[float], str]] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        expires_at, value = self._values.get(key, (None, None))
+        if expires_at is not None and expires_at <= self.clock():
+            del self._values[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ex: Optional[int] = None) -> None:
+        self._values[key] = (None if ex is None else self.clock() + ex, value)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._values.pop(key, None)
+
+    async def scan_iter(self, match: str) -> AsyncIterator[str]:
+        prefix = match.rstrip("*")
+        for key in list(self._values):
+            if key.startswith(prefix):
+                yield key
+
+
+def create_dashboard_cache_backend() -> Optional[DashboardCacheBackend]:
+    backend = settings.DASHBOARD_CACHE_BACKEND.lower()
+    if backend == "none":
+        return None
+    if backend == "local":
+        return LocalDashboardCacheBackend(
+            settings.DASHBOARD_CACHE_SIZE, settings.DASHBOARD_CACHE_TTL
+        )
+    if backend == "redis":
+        if redis_asyncio is None:
+            raise RuntimeError(
+                "DASHBOARD_CACHE_BACKEND is redis but the redis package is not installed"
+            )
+        return SharedDashboardCacheBackend(
+            redis_asyncio.from_url(settings.DASHBOARD_CACHE_URL),
+            settings.DASHBOARD_CACHE_TTL,
+        )
+    raise ValueError(f"Unknown dashboard cache backend: {backend}")
+
+
+def dashboard_cache_key(endpoint: str, data_version: str, filters: dict) -> str:
+    """
+    Builds the cache key of a dashboard result from its endpoint, the data version and a
+    canonical form of its filters, so equivalent filters share an entry.
+
+    Args:
+        endpoint (str): The dashboard chart the result is for.
+        data_version (str): The data version the result was computed from.
+        filters (dict): The filter parameters of the request.
+
+    Returns:
+        str: The cache key.
+    """
+    canonical = {}
+    for name, value in filters.items():
+        if value is None or value == []:
+            continue
+        if name == "polygon":
+            value = (
+                value.polygon_hash
+                if isinstance(value, PolygonSelection)
+                else polygon_hash(value)
+            )
+        elif name.endswith("area_names"):
+            # area names only filter a query alongside their area level
+            if not filters.get(name.replace("area_names", "area_level")):
+                continue
+            value = sorted(set(expand_wales_region(value)))
+        canonical[name] = value
+
+    digest = hashlib.sha256(
+        json.dumps(canonical, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+    return f"{endpoint}:{data_version}:{digest[:32]}"
+
+
+class DashboardCache:
+    """
+    Caches dashboard chart results keyed on their filters and the version of the data they
+    were computed from, so a refresh of the analytics views makes earlier entries unreachable.
+
+    Args:
+        backend (DashboardCacheBackend | None): Where results are held. `None` disables caching.
+        check_interval (float): How long a data version is trusted before it is read again.
+    """
+
+    def __init__(
+        self, backend: Optional[DashboardCacheBackend], check_interval: float = 5.0
+    ):
+        self.backend = backend
+        self.check_interval = check_interval
+        self._data_version: Optional[str] = None
+        self._checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def data_version(self, db: AsyncSession) -> Optional[str]:
+        if self._recently_checked():
+            return self._data_version
+
+        async with self._lock:
+            if not self._recently_checked():
+                stamp = (
+                    await db.execute(
+                        text(DATA_VERSION_QUERY), {"views": DASHBOARD_SOURCE_VIEWS}
+                    )
+                ).scalar()
+                self._data_version = (
+                    hashlib.sha256(stamp.encode("utf-8")).hexdigest()[:16]
+                    if stamp
+                    else None
+                )
+                self._checked_at = time.monotonic()
+        return self._data_version
+
+    def invalidate(self) -> None:
+        self._checked_at = None
+
+    def cached(self, endpoint: str):
+        """
+        Decorates a dashboard route so its result is served from the cache. The route must take
+        its database session as `db`; every other keyword argument is treated as a filter.
+        """
+
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return await func(*args, **kwargs)
+
+                data_version = await self.data_version(kwargs["db"])
+                if data_version is None:
+                    return await func(*args, **kwargs)
+
+                filters = {name: value for name, value in kwargs.items() if name != "db"}
+                key = dashboard_cache_key(endpoint, data_version, filters)
+                cached = await self._get(key)
+                if cached is not None:
+                    return cached
+
+                result = jsonable_encoder(await func(*args, **kwargs))
+                await self._set(key, result)
+                return result
+
+            return wrapper
+
+        return decorator
+
+    async def _get(self, key: str) -> Any:
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Dashboard cache read failed: {e}")
+            return None
+
+    async def _set(self, key: str, value: Any) -> None:
+        try:
+            await self.backend.set(key, value)
+        except Exception as e:
+            logger.warning(f"Dashboard cache write failed: {e}")
+
+    def _recently_checked(self) -> bool:
+        return (
+            self._checked_at is not None
+            and time.monotonic() - self._checked_at < self.check_interval
+        )
+
+
+dashboard_cache = DashboardCache(
+    create_dashboard_cache_backend(), settings.DASHBOARD_CACHE_CHECK_INTERVAL
+)
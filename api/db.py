@@ -4,10 +4,13 @@
 
 
 import logging
-from typing import AsyncIterator, Optional
+import os
+from typing import AsyncIterator, Optional, Sequence
+from uuid import uuid4
 
 from config import get_settings
-from sqlalchemy import text
+from pool_metrics import InstrumentedAsyncAdaptedQueuePool, instrument_engine
+from sqlalchemy import Row, event, text
 from sqlalchemy.ext.asyncio import (AsyncEngine, AsyncSession,
                                     create_async_engine)
 from sqlalchemy.orm import sessionmaker
@@ -17,15 +20,64 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 db_connection_string = settings.get_db_connection_string()
 
-if db_connection_string and db_connection_string.startswith("postgres"):
-    statement_timeout_ms = str(settings.DB_QUERY_TIMEOUT * 1000)
+
+class QueryTimeoutError(Exception):
+    """A query outlasted the command timeout asyncpg enforces on it."""
+
+
+def raise_query_timeouts(exception_context) -> None:
+    """Raise asyncpg's command timeouts as QueryTimeoutError, so they are not mistaken for
+    any other timeout in the request.
+    """
+    if isinstance(exception_context.original_exception, TimeoutError):
+        raise QueryTimeoutError(
+            "The query took too long to complete"
+        ) from exception_context.original_exception
+
+
+def create_postgres_engine(connection_string: str, timeout_seconds: int) -> AsyncEngine:
+    """Create an engine whose connections run every statement under the given timeout.
+    The timeout is applied as a server setting when each connection is opened, so no
+    statement is needed to set it. PgBouncer does not pass server settings on, so behind it
+    the timeout is enforced by asyncpg as a command timeout instead.
+    """
+    statement_timeout_ms = str(timeout_seconds * 1000)
     logger.info(
         f"Connecting to PostgreSQL database with query timeout: ({statement_timeout_ms}ms)"
     )
-    engine: Optional[AsyncEngine] = create_async_engine(
-        db_connection_string,
-        connect_args={"server_settings": {"statement_timeout": statement_timeout_ms}},
-        pool_pre_ping=True,
+    if settings.DB_PGBOUNCER:
+        # prepared statements do not survive PgBouncer moving the session between servers
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            "command_timeout": settings.DB_COMMAND_TIMEOUT or timeout_seconds,
+        }
+    else:
+        connect_args = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "command_timeout": settings.DB_COMMAND_TIMEOUT,
+            "server_settings": {"statement_timeout": statement_timeout_ms},
+        }
+    postgres_engine = create_async_engine(
+        connection_string,
+        connect_args=connect_args,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    instrument_engine(postgres_engine)
+    event.listen(postgres_engine.sync_engine, "handle_error", raise_query_timeouts)
+    return postgres_engine
+
+
+if db_connection_string and db_connection_string.startswith("postgres"):
+    engine: Optional[AsyncEngine] = create_postgres_engine(
+        db_connection_string, settings.DB_QUERY_TIMEOUT
     )
 elif db_connection_string and db_connection_string.startswith("sqlite"):
     engine: Optional[AsyncEngine] = create_async_engine(
@@ -41,6 +93,9 @@ if engine:
 else:
     async_session_maker = None
 
+# the process the engines were created in, so a forked worker knows to replace their pools
+engine_pid = os.getpid()
+
 
 async def get_db() -> AsyncIterator[AsyncSession]:
     if async_session_maker is None:
@@ -49,6 +104,42 @@ async def get_db() -> AsyncIterator[AsyncSession]:
         yield session
 
 
+def get_session_maker() -> sessionmaker:
+    """Provides the session factory to routes that open several sessions of their own,
+    e.g. to run independent queries concurrently.
+    """
+    if async_session_maker is None:
+        raise RuntimeError("Database not configured")
+    return async_session_maker
+
+
+async def stream_partitions(
+    query: text,
+    params: Optional[dict] = None,
+    partition_size: Optional[int] = None,
+) -> AsyncIterator[Sequence[Row]]:
+    """Stream the rows of a query in partitions through a server-side cursor.
+    The rows are read on a session of their own, since they are consumed while the response
+    is being sent, after the request's session has been closed.
+    """
+    if async_session_maker is None:
+        raise RuntimeError("Database not configured")
+    partition_size = partition_size or settings.DB_STREAM_PARTITION_SIZE
+    async with async_session_maker() as session:
+        if settings.DB_PGBOUNCER:
+            # no server-side cursors behind PgBouncer, the rows are read at once instead
+            result = await session.execute(query, params)
+            for partition in result.partitions(partition_size):
+                yield partition
+            return
+
+        result = await session.stream(
+            query, params, execution_options={"yield_per": partition_size}
+        )
+        async for partition in result.partitions():
+            yield partition
+
+
 async def execute_with_timeout(
     session: AsyncSession,
     query: text,
@@ -67,3 +158,38 @@ async def execute_with_timeout(
         text(f"SET LOCAL statement_timeout = '{settings.DB_QUERY_TIMEOUT * 1000}'")
     )
     return result
+
+
+def get_engines() -> dict[int, AsyncEngine]:
+    """The engines of this process, keyed by the statement timeout their connections run under."""
+    return {settings.DB_QUERY_TIMEOUT: engine} if engine is not None else {}
+
+
+def reset_pools_after_fork() -> None:
+    """Give a worker forked from the process that created the engines pools of its own.
+    The connections inherited from the parent are left open for it rather than closed, as
+    they are still in use there.
+    """
+    global engine_pid
+    if os.getpid() == engine_pid:
+        return
+    for inherited_engine in get_engines().values():
+        inherited_engine.sync_engine.dispose(close=False)
+    engine_pid = os.getpid()
+
+
+async def dispose_engines() -> None:
+    """Close every pooled connection, when the worker shuts down."""
+    for process_engine in get_engines().values():
+        await process_engine.dispose()
+
+
+def get_pool_metrics() -> dict:
+    """The state of each database pool and the metrics of its checkouts, keyed by the
+    statement timeout its connections run under.
+    """
+    return {
+        f"{timeout_seconds}s": timeout_engine.sync_engine.pool.stats()
+        for timeout_seconds, timeout_engine in get_engines().items()
+        if isinstance(timeout_engine.sync_engine.pool, InstrumentedAsyncAdaptedQueuePool)
+    }
@@ -0,0 +1,117 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+import requests
+from config import get_settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+RETRY_STATUS_CODES = (502, 503, 504)
+
+session: Optional[requests.Session] = None
+async_client: Optional[httpx.AsyncClient] = None
+
+
+def get_timeout() -> tuple[float, float]:
+    """Connect and read timeouts, in seconds, for outbound HTTP calls."""
+    return (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+
+
+def _build_session() -> requests.Session:
+    # Only idempotent requests are retried so SPARQL updates are never replayed
+    retry = Retry(
+        total=settings.HTTP_MAX_RETRIES,
+        backoff_factor=settings.HTTP_RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.HTTP_MAX_HOSTS,
+        pool_maxsize=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        max_retries=retry,
+    )
+    new_session = requests.Session()
+    new_session.mount("http://", adapter)
+    new_session.mount("https://", adapter)
+    return new_session
+
+
+def _build_async_client() -> httpx.AsyncClient:
+    connect_timeout, read_timeout = get_timeout()
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        # failed connections are retried by get_with_retry alone, not by the transport too
+        transport=httpx.AsyncHTTPTransport(retries=0),
+    )
+
+
+def get_session() -> requests.Session:
+    """Returns the shared keep-alive session used for blocking calls."""
+    global session
+    if session is None:
+        session = _build_session()
+    return session
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Returns the shared connection-pooled client used for non-blocking calls."""
+    global async_client
+    if async_client is None:
+        async_client = _build_async_client()
+    return async_client
+
+
+async def get_with_retry(url: str, **kwargs) -> httpx.Response:
+    """Issues a GET on the shared async client, retrying transient failures with
+    exponential backoff.
+    """
+    client = get_async_client()
+    for attempt in range(settings.HTTP_MAX_RETRIES + 1):
+        last_attempt = attempt == settings.HTTP_MAX_RETRIES
+        try:
+            response = await client.get(url, **kwargs)
+        except httpx.TransportError as e:
+            if last_attempt:
+                raise
+            logger.warning("GET %s failed (%s), retrying", url, e)
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                return response
+            logger.warning("GET %s returned %s, retrying", url, response.status_code)
+        await asyncio.sleep(settings.HTTP_RETRY_BACKOFF * 2**attempt)
+
+
+async def open_clients() -> None:
+    get_session()
+    get_async_client()
+    logger.info(
+        "HTTP clients started with up to %s connections per host",
+        settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+    )
+
+
+async def close_clients() -> None:
+    global session, async_client
+    if async_client is not None:
+        await async_client.aclose()
+        async_client = None
+    if session is not None:
+        session.close()
+        session = None
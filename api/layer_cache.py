@@ -0,0 +1,177 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+
+import asyncio
+import gzip
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from config import get_settings
+from fastapi import Request, Response, status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+APPLICATION_JSON = "application/json"
+
+# A non-concurrent REFRESH MATERIALIZED VIEW rewrites the view into a new relfilenode and a
+# concurrent refresh writes rows in place, so together they identify the refreshed contents.
+VIEW_VERSION_QUERY = """
+    SELECT c.oid::text || ':' || c.relfilenode::text || ':' ||
+        COALESCE(s.n_tup_ins + s.n_tup_upd + s.n_tup_del, 0)::text
+    FROM pg_class c
+    LEFT JOIN pg_stat_all_tables s ON s.relid = c.oid
+    WHERE c.oid = to_regclass(:view)
+"""
+
+
+@dataclass(frozen=True)
+class GeoJsonLayer:
+    """
+    A GeoJSON layer held in memory alongside its pre-compressed encodings.
+
+    Args:
+        etag (str): A strong entity tag derived from the layer contents.
+        body (bytes): The uncompressed GeoJSON.
+        gzip_body (bytes): The gzip-encoded GeoJSON.
+        brotli_body (bytes | None): The brotli-encoded GeoJSON, when brotli is installed.
+        version (str | None): The materialized view version the layer was read from.
+    """
+
+    etag: str
+    body: bytes
+    gzip_body: bytes
+    brotli_body: Optional[bytes] = None
+    version: Optional[str] = None
+
+    @classmethod
+    def from_text(cls, geojson: str, version: Optional[str] = None) -> "GeoJsonLayer":
+        body = geojson.encode("utf-8")
+        return cls(
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=settings.GEOJSON_GZIP_LEVEL),
+            brotli_body=(
+                brotli.compress(body, quality=settings.GEOJSON_BROTLI_QUALITY)
+                if brotli is not None
+                else None
+            ),
+            version=version,
+        )
+
+
+class GeoJsonLayerCache:
+    """
+    Caches GeoJSON layers read from materialized views, re-reading a layer only once the
+    view it comes from has been refreshed.
+    """
+
+    def __init__(self):
+        self._layers: dict[str, GeoJsonLayer] = {}
+        self._checked_at: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def invalidate(self, view: Optional[str] = None) -> None:
+        if view is None:
+            self._layers.clear()
+            self._checked_at.clear()
+        else:
+            self._layers.pop(view, None)
+            self._checked_at.pop(view, None)
+
+    async def get(self, db: AsyncSession, view: str) -> GeoJsonLayer:
+        cached = self._layers.get(view)
+        if cached is not None and self._recently_checked(view):
+            return cached
+
+        lock = self._locks.setdefault(view, asyncio.Lock())
+        async with lock:
+            cached = self._layers.get(view)
+            if cached is not None and self._recently_checked(view):
+                return cached
+
+            version = (
+                await db.execute(text(VIEW_VERSION_QUERY), {"view": view})
+            ).scalar()
+            self._checked_at[view] = time.monotonic()
+            if cached is not None and version is not None and cached.version == version:
+                return cached
+
+            result = await db.execute(
+                text(f"SELECT geojson::text AS geojson FROM {view};")
+            )
+            geojson = result.fetchone()[0]
+            layer = await asyncio.to_thread(GeoJsonLayer.from_text, geojson, version)
+            if version is not None:
+                logger.info("Cached GeoJSON layer %s at version %s", view, version)
+                self._layers[view] = layer
+            return layer
+
+    def _recently_checked(self, view: str) -> bool:
+        checked_at = self._checked_at.get(view)
+        return (
+            checked_at is not None
+            and time.monotonic() - checked_at < settings.GEOJSON_CACHE_CHECK_INTERVAL
+        )
+
+
+geojson_layer_cache = GeoJsonLayerCache()
+
+
+def _accepted_encodings(request: Request) -> set[str]:
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        encoding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(encoding.strip().lower())
+    return accepted
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def geojson_layer_response(request: Request, layer: GeoJsonLayer) -> Response:
+    """
+    Builds the response for a cached GeoJSON layer, answering conditional requests with a 304
+    and choosing the best pre-compressed encoding the client accepts.
+
+    Args:
+        request (Request): The incoming request.
+        layer (GeoJsonLayer): The cached layer.
+
+    Returns:
+        Response: The layer, or an empty 304 response when the client's copy is current.
+    """
+    headers = {"ETag": layer.etag, "Vary": "Accept-Encoding"}
+    if _etag_matches(request, layer.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    accepted = _accepted_encodings(request)
+    if layer.brotli_body is not None and "br" in accepted:
+        headers["Content-Encoding"] = "br"
+        content = layer.brotli_body
+    elif "gzip" in accepted:
+        headers["Content-Encoding"] = "gzip"
+        content = layer.gzip_body
+    else:
+        content = layer.body
+    return Response(content=content, media_type=APPLICATION_JSON, headers=headers)
@@ -3,7 +3,12 @@
 # and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
 
 
+import os
+from contextlib import asynccontextmanager
+
 import asyncpg.exceptions
+import db
+import http_client
 import sqlalchemy.exc
 import uvicorn
 from config import get_settings
@@ -14,30 +19,26 @@ from routes import router
 
 config_settings = get_settings()
 
-with open("README.md", "r") as file:
-    description = file.read()
-
-app = FastAPI(
-    title="NDT Assessment Write-Back API",
-    description=description,
-    docs_url="/api-docs",
-    openapi_url="/api-docs/openapi.json",
-    license_info={
-        "name": "Apache 2.0",
-        "url": "https://www.apache.org/licenses/LICENSE-2.0.html",
-    },
-)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-@app.exception_handler(sqlalchemy.exc.DBAPIError)
+README_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "README.md")
+
+
+def read_description() -> str:
+    try:
+        with open(README_PATH, "r") as file:
+            return file.read()
+    except OSError:
+        return ""
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db.reset_pools_after_fork()
+    await http_client.open_clients()
+    yield
+    await http_client.close_clients()
+    await db.dispose_engines()
+
+
 async def query_timeout_handler(request: Request, exc: sqlalchemy.exc.DBAPIError):
     sqlstate = getattr(exc.orig, "sqlstate", None)
     if sqlstate == asyncpg.exceptions.QueryCanceledError.sqlstate:
@@ -52,7 +53,75 @@ async def query_timeout_handler(request: Request, exc: sqlalchemy.exc.DBAPIError
     raise exc
 
 
-app.include_router(router)
+async def command_timeout_handler(request: Request, exc: db.QueryTimeoutError):
+    # behind PgBouncer, query timeouts are enforced by asyncpg rather than the server
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={
+            "detail": "The request took too long to complete.",
+            "error": "QueryCanceledError",
+        },
+    )
+
+
+def create_app() -> FastAPI:
+    """
+    Builds the API. Nothing is read or connected here: the README becomes the OpenAPI
+    description when the schema is first requested, and the clients are opened in the
+    lifespan hook.
+    """
+    app = FastAPI(
+        title="NDT Assessment Write-Back API",
+        docs_url="/api-docs",
+        openapi_url="/api-docs/openapi.json",
+        license_info={
+            "name": "Apache 2.0",
+            "url": "https://www.apache.org/licenses/LICENSE-2.0.html",
+        },
+        lifespan=lifespan,
+    )
+
+    def openapi():
+        if app.openapi_schema is None:
+            app.description = read_description()
+        return FastAPI.openapi(app)
+
+    app.openapi = openapi
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_exception_handler(sqlalchemy.exc.DBAPIError, query_timeout_handler)
+    app.add_exception_handler(db.QueryTimeoutError, command_timeout_handler)
+    app.include_router(router)
+    return app
+
+
+app = create_app()
+
+
+def run():
+    """
+    Serve the API. With more than one worker, uvicorn supervises that many processes, each
+    importing the app and creating engines of its own. On shutdown, in-flight requests are
+    given the graceful shutdown timeout to finish. uvloop and httptools are used when
+    installed.
+    """
+    uvicorn.run(
+        "main:app" if config_settings.WORKERS > 1 else app,
+        host="0.0.0.0",
+        port=int(config_settings.PORT),
+        workers=config_settings.WORKERS,
+        loop=config_settings.LOOP,
+        http=config_settings.HTTP_PROTOCOL,
+        timeout_graceful_shutdown=config_settings.GRACEFUL_SHUTDOWN_TIMEOUT,
+        limit_max_requests=config_settings.LIMIT_MAX_REQUESTS,
+    )
+
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=int(config_settings.PORT))
+    run()
@@ -2,9 +2,6 @@
 # © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
 # and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
 
-import datetime
-import re
-
 from models.dto_models import (
     BuildingAttributePercentage,
     BuildingAttributePercentagesPerRegion,
@@ -21,25 +18,14 @@ from models.dto_models import (
     BuildingWindDrivenRainData,
     BuildingWindDrivenRainSchema,
     DetailedBuilding,
-    EpcAndOsBuildingSchema,
     EpcStatistics,
     FilterableBuilding,
     FilterableBuildingSchema,
     FilterSummary,
     FlaggedBuilding,
     FlagHistory,
-    SimpleBuilding,
 )
 
-structure_unit_type_hierarchy = {
-    "House": 1,
-    "Flat": 1,
-    "Park Home": 1,
-    "Maisonette": 2,
-    "Bungalow": 2,
-}
-get_type_rank = structure_unit_type_hierarchy.get
-
 
 def strip_uri(uri: str) -> str:
     """
@@ -261,6 +247,50 @@ def map_ngd_roof_aspect_area_facings_results(
             assign(field, m2)
 
 
+def split_building_details_results(results: dict) -> tuple[dict, ...]:
+    """
+    Splits the combined building details SPARQL result back into the per-section
+    results expected by `map_single_building_response`.
+
+    Args:
+        results (dict): SPARQL data retrieved by the combined building details query, where each
+        binding is tagged with the section it belongs to.
+
+    Returns:
+        tuple[dict, ...]: The building, roof, floor, wall and window, fuel type, NGD roof material,
+        NGD solar panel presence, NGD roof shape and NGD roof aspect area results, in that order.
+    """
+    sections = {
+        "epc": [],
+        "fuelType": [],
+        "roofMaterial": [],
+        "solarPanelPresence": [],
+        "roofShape": [],
+        "roofAspectAreas": [],
+    }
+    if results and results.get("results") and results["results"].get("bindings"):
+        for result in results["results"]["bindings"]:
+            section = get_uri_from_result(result, "section")
+            if section in sections:
+                sections[section].append(result)
+
+    def as_results(bindings: list) -> dict:
+        return {"results": {"bindings": bindings}}
+
+    epc_results = as_results(sections["epc"])
+    return (
+        epc_results,
+        epc_results,
+        epc_results,
+        epc_results,
+        as_results(sections["fuelType"]),
+        as_results(sections["roofMaterial"]),
+        as_results(sections["solarPanelPresence"]),
+        as_results(sections["roofShape"]),
+        as_results(sections["roofAspectAreas"]),
+    )
+
+
 def map_single_building_response(
     uprn: str,
     building_results: dict,
@@ -305,36 +335,95 @@ def map_single_building_response(
     return building
 
 
-def map_bounded_buildings_response(
-    results: [EpcAndOsBuildingSchema],
-) -> list[SimpleBuilding]:
+def map_bounded_building_row(result) -> dict:
     """
-    Maps a `SimpleBuilding` array response from a SQL query result.
+    Maps a single bounding box row to the fields of a `SimpleBuilding`. Rows are unpacked
+    by position, as returned by `get_buildings_in_bounding_box_query`.
 
     Args:
-        results list[BuildingGeoMappingSchema]: General data retrieved regarding the building
-        e.g. the UPRN, TOID, coordinates.
+        result: A row of UPRN, first line of address, TOID, longitude, latitude, EPC rating
+        and structure unit type.
 
     Returns:
-        list[SimpleBuilding]: A list of `SimpleBuilding` instances.
+        dict: The building's UPRN, TOID, address, coordinates and current energy rating.
     """
-    buildings = {}
-    if results:
-        for result in results:
-            # Take the lowest rank of structure unit type, e.g. take "Maisonette" over "Flat"
-            if result.uprn not in buildings or get_type_rank(
-                result.structure_unit_type, 0
-            ) > get_type_rank(buildings[result.uprn].structure_unit_type, 0):
-                building = SimpleBuilding()
-                building.uprn = result.uprn
-                building.first_line_of_address = result.first_line_of_address
-                building.toid = result.toid
-                building.energy_rating = result.epc_rating
-                building.structure_unit_type = result.structure_unit_type
-                building.latitude = str(result.lattitude)
-                building.longitude = str(result.longitude)
-                buildings[result.uprn] = building
-    return list(buildings.values())
+    (
+        uprn,
+        first_line_of_address,
+        toid,
+        longitude,
+        latitude,
+        epc_rating,
+        structure_unit_type,
+    ) = result
+    return {
+        "uprn": uprn,
+        "toid": toid,
+        "first_line_of_address": first_line_of_address,
+        "energy_rating": epc_rating,
+        "structure_unit_type": structure_unit_type,
+        "latitude": str(latitude),
+        "longitude": str(longitude),
+    }
+
+
+def map_bounded_buildings_response(results) -> list[dict]:
+    """
+    Maps the rows of a bounding box query to `SimpleBuilding` shaped dictionaries, without
+    building a model per row. The query already returns a single row per UPRN.
+
+    Args:
+        results: The rows returned by `get_buildings_in_bounding_box_query`.
+
+    Returns:
+        list[dict]: The fields of a `SimpleBuilding` for each building.
+    """
+    return [
+        {"uri": None, "securityLabel": None, "types": [], **map_bounded_building_row(row)}
+        for row in results
+    ]
+
+
+def map_filterable_building_row(result) -> dict:
+    """
+    Maps a single filterable building row to the fields of a `FilterableBuilding`.
+
+    Args:
+        result: A row returned by `get_filterable_buildings_in_bounding_box_query`, or a
+        `FilterableBuildingSchema`.
+
+    Returns:
+        dict: The building's filterable attributes.
+    """
+    return {
+        "uprn": result.uprn,
+        "postcode": result.post_code,
+        "lodgement_date": str(result.lodgement_date),
+        "built_form": result.built_form,
+        "fuel_type": result.fuel_type,
+        "floor_construction": result.floor_construction,
+        "floor_insulation": result.floor_insulation,
+        "roof_construction": result.roof_construction,
+        "roof_insulation_location": result.roof_insulation,
+        "roof_insulation_thickness": result.roof_insulation_thickness,
+        "wall_construction": result.wall_construction,
+        "wall_insulation": result.wall_insulation,
+        "window_glazing": result.window_glazing,
+        "has_roof_solar_panels": result.has_roof_solar_panels,
+        "roof_material": (
+            result.roof_material.replace(" ", "")
+            if result.roof_material
+            else result.roof_material
+        ),
+        "roof_aspect_area_facing_north": result.roof_aspect_area_facing_north_m2,
+        "roof_aspect_area_facing_north_east": result.roof_aspect_area_facing_north_east_m2,
+        "roof_aspect_area_facing_east": result.roof_aspect_area_facing_east_m2,
+        "roof_aspect_area_facing_south_east": result.roof_aspect_area_facing_south_east_m2,
+        "roof_aspect_area_facing_south": result.roof_aspect_area_facing_south_m2,
+        "roof_aspect_area_facing_south_west": result.roof_aspect_area_facing_south_west_m2,
+        "roof_aspect_area_facing_west": result.roof_aspect_area_facing_west_m2,
+        "roof_aspect_area_facing_north_west": result.roof_aspect_area_facing_north_west_m2,
+    }
 
 
 def map_bounded_filterable_buildings_response(
@@ -352,51 +441,7 @@ def map_bounded_filterable_buildings_response(
     buildings = []
     if results:
         for result in results:
-            building = FilterableBuilding()
-            building.uprn = result.uprn
-            building.lodgement_date = str(result.lodgement_date)
-            building.postcode = result.post_code
-            building.built_form = result.built_form
-            building.fuel_type = result.fuel_type
-            building.window_glazing = result.window_glazing
-            building.wall_construction = result.wall_construction
-            building.wall_insulation = result.wall_insulation
-            building.floor_construction = result.floor_construction
-            building.floor_insulation = result.floor_insulation
-            building.roof_construction = result.roof_construction
-            building.roof_insulation_location = result.roof_insulation
-            building.roof_insulation_thickness = result.roof_insulation_thickness
-            building.roof_material = (
-                result.roof_material.replace(" ", "")
-                if result.roof_material
-                else result.roof_material
-            )
-            building.has_roof_solar_panels = result.has_roof_solar_panels
-            building.roof_aspect_area_facing_north = (
-                result.roof_aspect_area_facing_north_m2
-            )
-            building.roof_aspect_area_facing_north_east = (
-                result.roof_aspect_area_facing_north_east_m2
-            )
-            building.roof_aspect_area_facing_north_west = (
-                result.roof_aspect_area_facing_north_west_m2
-            )
-            building.roof_aspect_area_facing_east = (
-                result.roof_aspect_area_facing_east_m2
-            )
-            building.roof_aspect_area_facing_south = (
-                result.roof_aspect_area_facing_south_m2
-            )
-            building.roof_aspect_area_facing_south_east = (
-                result.roof_aspect_area_facing_south_east_m2
-            )
-            building.roof_aspect_area_facing_south_west = (
-                result.roof_aspect_area_facing_south_west_m2
-            )
-            building.roof_aspect_area_facing_west = (
-                result.roof_aspect_area_facing_west_m2
-            )
-            buildings.append(building)
+            buildings.append(FilterableBuilding(**map_filterable_building_row(result)))
     return buildings
 
 
@@ -474,199 +519,56 @@ def map_flagged_buildings_response(results: dict) -> list[FlaggedBuilding]:
     return flags
 
 
-def _add_postcode_filter(filter_summary: FilterSummary, post_code: str):
-    post_code_matches = re.search(r"^[0-9A-Z]{3,4}", post_code)
-    if post_code_matches:
-        transformed_post_code = post_code_matches.group()
-        filter_summary.postcode.add(transformed_post_code)
-
-
-def _add_built_form_filter(filter_summary: FilterSummary, built_form: str):
-    if built_form and len(built_form) > 0:
-        filter_summary.built_form.add(built_form)
-
-
-def _add_lodgment_date_filter(
-    filter_summary: FilterSummary, lodgement_date: datetime.date
-):
-    if lodgement_date:
-        inspection_year = str(lodgement_date.year)
-        filter_summary.inspection_year.add(inspection_year)
-
-
-def _add_fuel_type_filter(filter_summary: FilterSummary, fuel_type: str):
-    if fuel_type and len(fuel_type) > 0:
-        filter_summary.fuel_type.add(fuel_type)
-
-
-def _add_window_glazing_filter(filter_summary: FilterSummary, window_glazing: str):
-    if window_glazing and len(window_glazing) > 0:
-        filter_summary.window_glazing.add(window_glazing)
-
-
-def _add_wall_construction_filter(
-    filter_summary: FilterSummary, wall_construction: str
-):
-    if wall_construction and len(wall_construction) > 0:
-        filter_summary.wall_construction.add(wall_construction)
-
-
-def _add_wall_insulation_filter(filter_summary: FilterSummary, wall_insulation: str):
-    if wall_insulation and len(wall_insulation) > 0:
-        filter_summary.wall_insulation.add(wall_insulation)
-
-
-def _add_floor_construction_filter(
-    filter_summary: FilterSummary, floor_construction: str
-):
-    if floor_construction and len(floor_construction) > 0:
-        filter_summary.floor_construction.add(floor_construction)
-
-
-def _add_floor_insulation_filter(filter_summary: FilterSummary, floor_insulation: str):
-    if floor_insulation and len(floor_insulation) > 0:
-        filter_summary.floor_insulation.add(floor_insulation)
-
-
-def _add_roof_construction_filter(
-    filter_summary: FilterSummary, roof_construction: str
-):
-    if roof_construction and len(roof_construction) > 0:
-        filter_summary.roof_construction.add(roof_construction)
-
-
-def _add_roof_insulation_location_filter(
-    filter_summary: FilterSummary, roof_insulation_location: str
-):
-    if roof_insulation_location and len(roof_insulation_location) > 0:
-        filter_summary.roof_insulation_location.add(roof_insulation_location)
+ROOF_ASPECT_AREA_DIRECTIONS = [
+    ("any_roof_facing_north", "North"),
+    ("any_roof_facing_north_east", "NorthEast"),
+    ("any_roof_facing_north_west", "NorthWest"),
+    ("any_roof_facing_south", "South"),
+    ("any_roof_facing_south_east", "SouthEast"),
+    ("any_roof_facing_south_west", "SouthWest"),
+    ("any_roof_facing_east", "East"),
+    ("any_roof_facing_west", "West"),
+]
 
 
-def _add_roof_insulation_thickness_filter(
-    filter_summary: FilterSummary, roof_insulation_thickness: str
-):
-    if roof_insulation_thickness and len(roof_insulation_thickness) > 0:
-        filter_summary.roof_insulation_thickness.add(roof_insulation_thickness)
-
-
-def _add_has_roof_solar_panels_filter(
-    filter_summary: FilterSummary, has_roof_solar_panels: bool
-):
-    if (
-        has_roof_solar_panels is not None
-        and len(filter_summary.has_roof_solar_panels) < 2
-    ):
-        filter_summary.has_roof_solar_panels.add(
-            "HasSolarPanels" if has_roof_solar_panels else "NoSolarPanels"
-        )
-
-
-def _add_roof_material_filter(filter_summary: FilterSummary, roof_material: str):
-    if roof_material and len(roof_material) > 0:
-        filter_summary.roof_material.add(roof_material.replace(" ", ""))
-
-
-def _add_roof_aspect_area_direction_filter(
-    filter_summary: FilterSummary,
-    roof_aspect_area_facing_north_m2: float,
-    roof_aspect_area_facing_north_east_m2: float,
-    roof_aspect_area_facing_east_m2: float,
-    roof_aspect_area_facing_south_east_m2: float,
-    roof_aspect_area_facing_south_m2: float,
-    roof_aspect_area_facing_south_west_m2: float,
-    roof_aspect_area_facing_west_m2: float,
-    roof_aspect_area_facing_north_west_m2: float,
-):
-    if (
-        roof_aspect_area_facing_north_m2
-        and roof_aspect_area_facing_north_m2 > 0
-        and "North" not in filter_summary.roof_aspect_area_direction
-    ):
-        filter_summary.roof_aspect_area_direction.add("North")
-    if (
-        roof_aspect_area_facing_north_east_m2
-        and roof_aspect_area_facing_north_east_m2 > 0
-        and "NorthEast" not in filter_summary.roof_aspect_area_direction
-    ):
-        filter_summary.roof_aspect_area_direction.add("NorthEast")
-    if (
-        roof_aspect_area_facing_north_west_m2
-        and roof_aspect_area_facing_north_west_m2 > 0
-        and "NorthWest" not in filter_summary.roof_aspect_area_direction
-    ):
-        filter_summary.roof_aspect_area_direction.add("NorthWest")
-    if (
-        roof_aspect_area_facing_south_m2
-        and roof_aspect_area_facing_south_m2 > 0
-        and "South" not in filter_summary.roof_aspect_area_direction
-    ):
-        filter_summary.roof_aspect_area_direction.add("South")
-    if (
-        roof_aspect_area_facing_south_east_m2
-        and roof_aspect_area_facing_south_east_m2 > 0
-        and "SouthEast" not in filter_summary.roof_aspect_area_direction
-    ):
-        filter_summary.roof_aspect_area_direction.add("SouthEast")
-    if (
-        roof_aspect_area_facing_south_west_m2
-        and roof_aspect_area_facing_south_west_m2 > 0
-        and "SouthWest" not in filter_summary.roof_aspect_area_direction
-    ):
-        filter_summary.roof_aspect_area_direction.add("SouthWest")
-    if (
-        roof_aspect_area_facing_east_m2
-        and roof_aspect_area_facing_east_m2 > 0
-        and "East" not in filter_summary.roof_aspect_area_direction
-    ):
-        filter_summary.roof_aspect_area_direction.add("East")
-    if (
-        roof_aspect_area_facing_west_m2
-        and roof_aspect_area_facing_west_m2 > 0
-        and "West" not in filter_summary.roof_aspect_area_direction
-    ):
-        filter_summary.roof_aspect_area_direction.add("West")
-
-
-def map_filter_summary_response(results: [FilterableBuildingSchema]) -> FilterSummary:
+def map_filter_summary_response(result) -> FilterSummary:
     """
-    Maps a `list[FilterableBuildingSchema]` to a `FilterSummary`
+    Maps the aggregated filter summary row of a bounding box to a `FilterSummary`
 
     Args:
-        results -> `list[FilterSummarySchema]`: A list of filter summaries for the buildings
+        result: The single row returned by `get_filter_summary_in_bounding_box_query`
 
     Returns:
         `FilterSummary`: A summary of the available filters
     """
-    mapped_result: FilterSummary = FilterSummary()
-    for result in results:
-        _add_postcode_filter(mapped_result, result.post_code)
-        _add_built_form_filter(mapped_result, result.built_form)
-        _add_lodgment_date_filter(mapped_result, result.lodgement_date)
-        _add_fuel_type_filter(mapped_result, result.fuel_type)
-        _add_window_glazing_filter(mapped_result, result.window_glazing)
-        _add_wall_construction_filter(mapped_result, result.wall_construction)
-        _add_wall_insulation_filter(mapped_result, result.wall_insulation)
-        _add_floor_construction_filter(mapped_result, result.floor_construction)
-        _add_floor_insulation_filter(mapped_result, result.floor_insulation)
-        _add_has_roof_solar_panels_filter(mapped_result, result.has_roof_solar_panels)
-        _add_roof_material_filter(mapped_result, result.roof_material)
-        _add_roof_aspect_area_direction_filter(
-            mapped_result,
-            result.roof_aspect_area_facing_north_m2,
-            result.roof_aspect_area_facing_north_east_m2,
-            result.roof_aspect_area_facing_east_m2,
-            result.roof_aspect_area_facing_south_east_m2,
-            result.roof_aspect_area_facing_south_m2,
-            result.roof_aspect_area_facing_south_west_m2,
-            result.roof_aspect_area_facing_west_m2,
-            result.roof_aspect_area_facing_north_west_m2,
-        )
-        _add_roof_construction_filter(mapped_result, result.roof_construction)
-        _add_roof_insulation_location_filter(mapped_result, result.roof_insulation)
-        _add_roof_insulation_thickness_filter(
-            mapped_result, result.roof_insulation_thickness
-        )
-    return mapped_result
+    has_roof_solar_panels = set()
+    if result.any_roof_solar_panels:
+        has_roof_solar_panels.add("HasSolarPanels")
+    if result.any_no_roof_solar_panels:
+        has_roof_solar_panels.add("NoSolarPanels")
+
+    return FilterSummary(
+        postcode=set(result.postcode or []),
+        built_form=set(result.built_form or []),
+        inspection_year=set(result.inspection_year or []),
+        energy_rating={"EPC In Date", "EPC Expired"},
+        fuel_type=set(result.fuel_type or []),
+        window_glazing=set(result.window_glazing or []),
+        wall_construction=set(result.wall_construction or []),
+        wall_insulation=set(result.wall_insulation or []),
+        floor_construction=set(result.floor_construction or []),
+        floor_insulation=set(result.floor_insulation or []),
+        has_roof_solar_panels=has_roof_solar_panels,
+        roof_material=set(result.roof_material or []),
+        roof_aspect_area_direction={
+            direction
+            for column_name, direction in ROOF_ASPECT_AREA_DIRECTIONS
+            if getattr(result, column_name)
+        },
+        roof_construction=set(result.roof_construction or []),
+        roof_insulation_location=set(result.roof_insulation_location or []),
+        roof_insulation_thickness=set(result.roof_insulation_thickness or []),
+    )
 
 
 def map_percentage_building_attributes_per_region_response(
@@ -5,8 +5,6 @@ import datetime
 from typing import List, Optional
 
 import pydantic
-from geoalchemy2 import WKBElement
-from geoalchemy2.shape import to_shape
 from pydantic import BaseModel
 
 from .ies_models import IesThing
@@ -176,31 +174,6 @@ class SimpleBuilding(Building):
     toid: Optional[str] = None
 
 
-class EpcAndOsBuildingSchema(BaseModel):
-    uprn: str
-    first_line_of_address: str
-    toid: str
-    lattitude: float
-    longitude: float
-    epc_rating: Optional[str] = None
-    structure_unit_type: Optional[str] = None
-
-    @classmethod
-    def from_orm(cls, obj):
-        wkb_point = WKBElement(obj.point)
-        # convert geometry to WKT format
-        shape_obj = to_shape(wkb_point)
-        return cls(
-            uprn=obj.uprn,
-            first_line_of_address=obj.first_line_of_address,
-            toid=obj.toid,
-            longitude=shape_obj.x,
-            lattitude=shape_obj.y,
-            epc_rating=obj.epc_rating,
-            structure_unit_type=obj.structure_unit_type,
-        )
-
-
 class FilterableBuildingSchema(BaseModel):
     uprn: str
     post_code: str
@@ -269,7 +242,7 @@ class FilterSummary(BaseModel):
     wall_insulation: set[str] = set()
     floor_construction: set[str] = set()
     floor_insulation: set[str] = set()
-    has_roof_solar_panels: set[bool] = set()
+    has_roof_solar_panels: set[str] = set()
     roof_material: set[str] = set()
     roof_aspect_area_direction: set[str] = set()
     roof_construction: set[str] = set()
@@ -316,6 +289,29 @@ class CountOfEpcRatingsPerRegion(CountOfEpcRatings):
         )
 
 
+class BuildingCluster(CountOfEpcRatings):
+    longitude: float
+    latitude: float
+    building_count: int
+    no_rating: int
+
+    @classmethod
+    def from_orm(cls, obj):
+        return cls(
+            longitude=obj.longitude,
+            latitude=obj.latitude,
+            building_count=obj.building_count,
+            epc_a=obj.epc_a,
+            epc_b=obj.epc_b,
+            epc_c=obj.epc_c,
+            epc_d=obj.epc_d,
+            epc_e=obj.epc_e,
+            epc_f=obj.epc_f,
+            epc_g=obj.epc_g,
+            no_rating=obj.no_rating,
+        )
+
+
 class EPCRatingsByCategory(BaseModel):
     name: str
     epc_a: int
@@ -0,0 +1,139 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from cache import TTLCache
+from config import get_settings
+from dashboard_cache import dashboard_cache
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils import PolygonSelection, polygon_hash
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Makes the polygon valid and simplifies it, then joins buildings against its subdivided parts
+# so the spatial index is only probed with small bounding boxes. The parts are returned for
+# the spatial filter of polygons with too many buildings to resolve.
+PREPARE_POLYGON_QUERY = """
+    WITH prepared AS (
+        SELECT ST_SimplifyPreserveTopology(
+            ST_CollectionExtract(ST_MakeValid(ST_GeomFromGeoJSON(:polygon)), 3),
+            :tolerance
+        ) AS geom
+    ),
+    part AS (
+        SELECT ST_Subdivide(geom, :max_part_vertices) AS geom
+        FROM prepared
+    )
+    SELECT
+        (SELECT ST_AsGeoJSON(geom) FROM prepared) AS geojson,
+        ARRAY(SELECT ST_AsGeoJSON(geom) FROM part) AS parts,
+        ARRAY(
+            SELECT DISTINCT b.uprn
+            FROM part
+            JOIN iris.building b ON ST_Intersects(b.point, part.geom)
+            LIMIT :limit
+        ) AS uprns
+"""
+
+
+class PolygonSelectionCache:
+    """
+    Prepares dashboard polygons in the database and resolves them to the UPRNs of the buildings
+    inside them once, keyed by the polygon's hash and the data version, so every chart drawn for
+    the same polygon can select its rows by UPRN until the buildings are reloaded.
+
+    Args:
+        max_size (int): The maximum number of polygons held. 0 prepares polygons on every request.
+        ttl_seconds (float | None): How long a resolved polygon is kept.
+        max_uprns (int): Polygons containing more buildings than this are left unresolved and
+            filtered spatially, to bound the size of each entry and of the UPRN array bound
+            to every chart query.
+        data_version (Callable | None): Gives the version of the data the UPRNs are resolved
+            from, e.g. `DashboardCache.data_version`.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: Optional[float] = None,
+        max_uprns: int = 0,
+        data_version: Optional[Callable[[AsyncSession], Awaitable[Optional[str]]]] = None,
+    ):
+        self.max_uprns = max_uprns
+        self.data_version = data_version
+        self._selections = TTLCache(max_size, ttl_seconds)
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def resolve(
+        self, db: AsyncSession, polygon: "str | PolygonSelection | None"
+    ) -> Optional[PolygonSelection]:
+        if polygon is None or isinstance(polygon, PolygonSelection):
+            return polygon
+
+        key = polygon_hash(polygon)
+        if self._selections.max_size <= 0:
+            return await self._resolve(db, polygon, key)
+
+        # a selection resolved before the buildings changed is not served after
+        cache_key = (
+            f"{await self.data_version(db)}:{key}" if self.data_version is not None else key
+        )
+        selection = self._selections.get(cache_key)
+        if selection is not None:
+            return selection
+
+        lock = self._locks.setdefault(cache_key, asyncio.Lock())
+        try:
+            async with lock:
+                selection = self._selections.get(cache_key)
+                if selection is None:
+                    selection = await self._resolve(db, polygon, key)
+                    self._selections.set(cache_key, selection)
+        finally:
+            if not lock.locked():
+                self._locks.pop(cache_key, None)
+        return selection
+
+    def clear(self) -> None:
+        self._selections.clear()
+
+    async def _resolve(
+        self, db: AsyncSession, polygon: str, key: str
+    ) -> PolygonSelection:
+        row = (
+            await db.execute(
+                text(PREPARE_POLYGON_QUERY),
+                {
+                    "polygon": polygon,
+                    "tolerance": settings.POLYGON_SIMPLIFY_TOLERANCE,
+                    "max_part_vertices": settings.POLYGON_SUBDIVIDE_MAX_VERTICES,
+                    "limit": self.max_uprns + 1,
+                },
+            )
+        ).one()
+        geojson = row.geojson or polygon
+        if 0 < self.max_uprns < len(row.uprns):
+            logger.info(
+                f"Polygon {key[:12]} contains over {self.max_uprns} buildings, filtering spatially"
+            )
+        if self.max_uprns <= 0 or len(row.uprns) > self.max_uprns:
+            return PolygonSelection(
+                geojson=geojson, polygon_hash=key, parts=list(row.parts) or None
+            )
+        return PolygonSelection(geojson=geojson, polygon_hash=key, uprns=list(row.uprns))
+
+
+polygon_selection_cache = PolygonSelectionCache(
+    settings.POLYGON_SELECTION_CACHE_SIZE,
+    settings.POLYGON_SELECTION_CACHE_TTL,
+    settings.POLYGON_SELECTION_MAX_UPRNS,
+    dashboard_cache.data_version,
+)
@@ -2,7 +2,10 @@
 # © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
 # and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
 
-from utils import WELSH_REGIONS, expand_wales_region
+from datetime import date
+
+from utils import (WELSH_REGIONS, PolygonSelection, expand_wales_region,
+                   polygon_geojson)
 
 EPC_ACTIVE_TRUE = "epc_active = true"
 REGION_NAME_PRESENT = "region_name IS NOT NULL AND region_name != ''"
@@ -434,95 +437,387 @@ def get_ngd_roof_aspect_areas_for_building(uprn: str) -> str:
     """
 
 
+def get_building_details(uprn: str) -> str:
+    """
+    Combined form of the nine per-building SPARQL queries, returning one row per
+    section tagged with ?section so the UPRN's subgraph is only matched once.
+    """
+    return f"""
+        PREFIX ies:          <http://informationexchangestandard.org/ont/ies#>
+        PREFIX building:     <http://ies.data.gov.uk/ontology/ies-building1#>
+        PREFIX data:         <http://ndtp.co.uk/data#>
+        PREFIX xsd:          <http://www.w3.org/2001/XMLSchema#>
+        PREFIX qudt:         <http://qudt.org/schema/qudt/>
+        PREFIX unit:         <http://qudt.org/vocab/unit/>
+        PREFIX quantitykind: <http://qudt.org/vocab/quantitykind/>
+
+        SELECT ?section ?lodgementDate ?builtForm ?structureUnitType
+            ?roofConstruction ?roofInsulation ?roofInsulationThickness
+            ?floorConstruction ?floorInsulation
+            ?wallConstruction ?wallInsulation ?windowGlazing
+            ?fuelType ?roofMaterial ?solarPanelPresence ?roofShape ?direction ?m2
+        WHERE {{
+            {{
+                SELECT ("epc" AS ?section) ?lodgementDate ?builtForm ?structureUnitType
+                    ?roofConstruction ?roofInsulation ?roofInsulationThickness
+                    ?floorConstruction ?floorInsulation
+                    ?wallConstruction ?wallInsulation ?windowGlazing
+                WHERE {{
+                    ?structureUnit ies:isIdentifiedBy data:UPRN_{uprn} .
+                    ?structureUnit a building:StructureUnit .
+                    ?structureUnitState a building:StructureUnitState .
+                    ?structureUnitState ies:isStateOf ?structureUnit .
+
+                    ?epc_result building:lodgementDate ?lodgementDate .
+                    ?epc_result ies:isParticipantIn ?epc_assessment .
+                    ?epc_assessment building:assessedStateForEnergyPerformance ?structureUnitState .
+
+                    OPTIONAL {{
+                        ?addressMatch a ies:AssessToBeTrue ;
+                            ies:assessed data:UPRN_{uprn} ;
+                            ies:confidence ?matchScore ;
+                            ies:isPartOf ?epc_assessment .
+                    }}
+
+                    OPTIONAL {{
+                        ?_bf a ?builtForm .
+                        ?builtForm a building:BuiltForm .
+                        ?_bf ies:isStateOf ?structureUnit .
+                    }}
+                    OPTIONAL {{
+                        ?_sut a ?structureUnitType .
+                        ?structureUnitType a building:StructureUnitType .
+                        ?_sut ies:isStateOf ?structureUnit .
+                    }}
+                    OPTIONAL {{
+                        ?_rc a ?roofConstruction .
+                        ?roofConstruction a building:RoofConstruction .
+                        ?_rc ies:isPartOf ?structureUnitState .
+                    }}
+                    OPTIONAL {{
+                        ?_ri a ?roofInsulation .
+                        ?roofInsulation a building:RoofInsulationLocation .
+                        ?_ri ies:isPartOf ?structureUnitState .
+                    }}
+                    OPTIONAL {{
+                        ?_rit a ?roofInsulationThickness .
+                        ?roofInsulationThickness a building:RoofInsulationThickness .
+                        ?_rit ies:isPartOf ?structureUnitState .
+                    }}
+                    OPTIONAL {{
+                        ?_fc a ?floorConstruction .
+                        ?floorConstruction a building:FloorConstruction .
+                        ?_fc ies:isPartOf ?structureUnitState .
+                    }}
+                    OPTIONAL {{
+                        ?_fi a ?floorInsulation .
+                        ?floorInsulation a building:FloorInsulation .
+                        ?_fi ies:isPartOf ?structureUnitState .
+                    }}
+                    OPTIONAL {{
+                        ?_wc a ?wallConstruction .
+                        ?wallConstruction a building:WallConstruction .
+                        ?_wc ies:isPartOf ?structureUnitState .
+                    }}
+                    OPTIONAL {{
+                        ?_wi a ?wallInsulation .
+                        ?wallInsulation a building:WallInsulation .
+                        ?_wi ies:isPartOf ?structureUnitState .
+                    }}
+                    OPTIONAL {{
+                        ?_wg a ?windowGlazing .
+                        ?windowGlazing a building:GlazingType .
+                        ?_wg ies:isPartOf ?structureUnitState .
+                    }}
+                }} ORDER BY ASC(BOUND(?matchScore)) DESC(?matchScore) DESC(?lodgementDate)
+                LIMIT 1
+            }}
+            UNION
+            {{
+                SELECT ("fuelType" AS ?section) ?fuelType
+                WHERE {{
+                    {{
+                        SELECT ?structureUnitState
+                        WHERE {{
+                            ?structureUnit ies:isIdentifiedBy data:UPRN_{uprn} ;
+                                            a building:StructureUnit .
+                            ?structureUnitState a building:StructureUnitState ;
+                                    ies:isStateOf ?structureUnit .
+                            ?epc_assessment building:assessedStateForEnergyPerformance ?structureUnitState .
+
+                            OPTIONAL {{
+                                ?addressMatch a ies:AssessToBeTrue ;
+                                    ies:assessed data:UPRN_{uprn} ;
+                                    ies:confidence ?matchScore ;
+                                    ies:isPartOf ?epc_assessment .
+                            }}
+
+                            BIND(STR(?structureUnitState) AS ?s)
+                            BIND(REPLACE(?s, ".*_([0-9]{{8}})$", "$1") AS ?yyyymmdd)
+                            FILTER( ?yyyymmdd != ?s )
+                            BIND(SUBSTR(?yyyymmdd,1,4) AS ?yyyy)
+                            BIND(SUBSTR(?yyyymmdd,5,2) AS ?mm)
+                            BIND(SUBSTR(?yyyymmdd,7,2) AS ?dd)
+                            FILTER ( xsd:integer(?mm) >= 1 && xsd:integer(?mm) <= 12 )
+                            FILTER ( xsd:integer(?dd) >= 1 && xsd:integer(?dd) <= 31 )
+                            BIND( xsd:date(CONCAT(?yyyy, "-", ?mm, "-", ?dd)) AS ?lodgement )
+                        }} ORDER BY ASC(BOUND(?matchScore)) DESC(?matchScore) DESC(?lodgement) LIMIT 1
+                    }}
+                    GRAPH <http://ndtp.com/graph/heating-v2> {{
+                        ?structureUnitState building:isServicedBy ?heatingSystem .
+                        ?heatingSystem building:isOperableWithFuel ?fuelType .
+                    }}
+                }}
+            }}
+            UNION
+            {{
+                SELECT ("roofMaterial" AS ?section) ?roofMaterial
+                WHERE {{
+                    data:StructureUnit_{uprn} ies:isPartOf ?building .
+                    ?roof ies:isPartOf ?building .
+                    ?roofState a building:RoofState ;
+                              ies:isStateOf ?roof ;
+                              building:isMadeOf ?roofMaterial .
+                }}
+                LIMIT 1
+            }}
+            UNION
+            {{
+                SELECT ("solarPanelPresence" AS ?section) ?solarPanelPresence
+                WHERE {{
+                    data:StructureUnit_{uprn} ies:isPartOf ?building .
+                    ?state ies:isStateOf ?building ;
+                           a ?solarPanelPresence .
+                    VALUES ?solarPanelPresence {{
+                        building:NoSolarPanels
+                        building:HasSolarPanels
+                        building:UnknownSolarPanelPresence
+                    }}
+                }}
+                LIMIT 1
+            }}
+            UNION
+            {{
+                SELECT DISTINCT ("roofShape" AS ?section) ?roofShape
+                WHERE {{
+                    data:StructureUnit_{uprn} ies:isPartOf ?building .
+                    ?shapeState ies:isStateOf ?building ;
+                                a building:RoofState ;
+                                a ?roofShape .
+                    VALUES ?roofShape {{
+                        building:PitchedRoofShape
+                        building:FlatRoofShape
+                        building:MixedRoofShape
+                        building:UnknownRoofShape
+                    }}
+                }}
+                LIMIT 1
+            }}
+            UNION
+            {{
+                SELECT ("roofAspectAreas" AS ?section) ?direction ?m2
+                WHERE {{
+                    data:StructureUnit_{uprn} ies:isPartOf ?building .
+                    ?roof ies:isPartOf ?building .
+                    ?roofState a building:RoofState ; ies:isStateOf ?roof .
+
+                    ?aspect a ?directionClass ;
+                            ies:isPartOf ?roofState ;
+                            building:hasCombinedSurfaceArea [
+                                building:hasQuantity [
+                                    qudt:hasQuantityKind quantitykind:Area ;
+                                    qudt:unit unit:M2 ;
+                                    qudt:value ?m2
+                                ]
+                            ] .
+
+                    VALUES ?directionClass {{
+                        building:NorthFacingRoofSectionSum
+                        building:NorthEastFacingRoofSectionSum
+                        building:EastFacingRoofSectionSum
+                        building:SouthEastFacingRoofSectionSum
+                        building:SouthFacingRoofSectionSum
+                        building:SouthWestFacingRoofSectionSum
+                        building:WestFacingRoofSectionSum
+                        building:NorthWestFacingRoofSectionSum
+                        building:AreaIndeterminableRoofSectionSum
+                    }}
+                    BIND(STRAFTER(STR(?directionClass), "#") AS ?direction)
+                }}
+            }}
+        }}
+    """
+
+
 def get_buildings_in_bounding_box_query() -> str:
+    # One row per UPRN, taking the highest ranked structure unit type e.g. "Maisonette" over
+    # "Flat", so rows can be mapped and streamed as they arrive.
     return """
-        WITH filtered_buildings AS (
-            SELECT uprn, first_line_of_address, toid, point
-            FROM iris.building
-            WHERE is_residential = true AND
-                point && ST_MakeEnvelope(:min_long, :min_lat, :max_long, :max_lat, :srid)
-                AND ST_Intersects(point, ST_MakeEnvelope(:min_long, :min_lat, :max_long, :max_lat, :srid))
+        SELECT DISTINCT ON (b.uprn)
+            b.uprn,
+            b.first_line_of_address,
+            b.toid,
+            ST_X(b.point) AS longitude,
+            ST_Y(b.point) AS latitude,
+            ce.epc_rating,
+            ce.structure_unit_type
+        FROM
+            iris.building b
+        LEFT JOIN iris.current_epc_assessment ce
+        ON
+            ce.uprn = b.uprn
+        WHERE b.is_residential = true
+            AND b.point && ST_MakeEnvelope(:min_long, :min_lat, :max_long, :max_lat, :srid)
+            AND ST_Intersects(b.point, ST_MakeEnvelope(:min_long, :min_lat, :max_long, :max_lat, :srid))
+        ORDER BY
+            b.uprn,
+            CASE ce.structure_unit_type
+                WHEN 'Maisonette' THEN 2
+                WHEN 'Bungalow' THEN 2
+                WHEN 'House' THEN 1
+                WHEN 'Flat' THEN 1
+                WHEN 'Park Home' THEN 1
+                ELSE 0
+            END DESC,
+            ce.structure_unit_rank;
+    """
+
+
+# Clusters are snapped to a grid of this many cells across the width of a map tile at the zoom
+BUILDING_CLUSTER_CELLS_PER_TILE = 8
+
+
+def _building_cluster_grid_size(zoom: int) -> float:
+    # the width of a grid cell in degrees, 32 screen pixels on a 256px tile at the given zoom
+    return 360.0 / (2**zoom * BUILDING_CLUSTER_CELLS_PER_TILE)
+
+
+def get_building_clusters_in_bounding_box_query(
+    min_long: float, max_long: float, min_lat: float, max_lat: float, zoom: int
+):
+    """
+    Builds a query that snaps the buildings inside a bounding box to a zoom dependent grid and
+    counts the current EPC ratings in each cell.
+
+    Args:
+        min_long (float): The western edge of the bounding box.
+        max_long (float): The eastern edge of the bounding box.
+        min_lat (float): The southern edge of the bounding box.
+        max_lat (float): The northern edge of the bounding box.
+        zoom (int): The map zoom level the clusters are drawn at.
+
+    Returns:
+        tuple[str, dict]: The query and its parameters. The query returns one row per grid cell.
+    """
+    params = {
+        "min_long": min_long,
+        "max_long": max_long,
+        "min_lat": min_lat,
+        "max_lat": max_lat,
+        "srid": 4326,
+        "grid_size": _building_cluster_grid_size(zoom),
+    }
+    query = """
+        WITH buildings AS (
+            SELECT DISTINCT ON (bea.uprn)
+                bea.epc_rating,
+                bea.point
+            FROM iris.building_epc_analytics bea
+            WHERE bea.point && ST_MakeEnvelope(:min_long, :min_lat, :max_long, :max_lat, :srid)
+            ORDER BY bea.uprn, bea.epc_active DESC, bea.lodgement_date DESC NULLS LAST
+        ),
+        clusters AS (
+            SELECT
+                ST_Centroid(ST_Collect(point)) AS centroid,
+                COUNT(*) AS building_count,
+                COUNT(*) FILTER (WHERE epc_rating = 'A') AS epc_a,
+                COUNT(*) FILTER (WHERE epc_rating = 'B') AS epc_b,
+                COUNT(*) FILTER (WHERE epc_rating = 'C') AS epc_c,
+                COUNT(*) FILTER (WHERE epc_rating = 'D') AS epc_d,
+                COUNT(*) FILTER (WHERE epc_rating = 'E') AS epc_e,
+                COUNT(*) FILTER (WHERE epc_rating = 'F') AS epc_f,
+                COUNT(*) FILTER (WHERE epc_rating = 'G') AS epc_g,
+                COUNT(*) FILTER (WHERE epc_rating IS NULL) AS no_rating
+            FROM buildings
+            GROUP BY ST_SnapToGrid(point, :grid_size)
         )
         SELECT
-            fb.uprn,
-            fb.first_line_of_address,
-            fb.toid,
-            fb.point,
-            ea.epc_rating,
-            su.type as structure_unit_type
+            ST_X(centroid) AS longitude,
+            ST_Y(centroid) AS latitude,
+            building_count,
+            epc_a, epc_b, epc_c, epc_d, epc_e, epc_f, epc_g,
+            no_rating
+        FROM clusters;
+    """
+    return query, params
+
+
+def get_filterable_buildings_in_bounding_box_query() -> str:
+    return """
+        SELECT
+            b.uprn, b.toid, b.post_code,
+            ce.built_form, ce.fuel_type,
+            ce.lodgement_date, ce.window_glazing,
+            ce.wall_construction, ce.wall_insulation,
+            ce.floor_construction, ce.floor_insulation,
+            ce.has_roof_solar_panels, ce.roof_material,
+            ce.roof_aspect_area_facing_north_m2,
+            ce.roof_aspect_area_facing_north_east_m2,
+            ce.roof_aspect_area_facing_north_west_m2,
+            ce.roof_aspect_area_facing_east_m2,
+            ce.roof_aspect_area_facing_south_m2,
+            ce.roof_aspect_area_facing_south_east_m2,
+            ce.roof_aspect_area_facing_south_west_m2,
+            ce.roof_aspect_area_facing_west_m2,
+            ce.roof_construction, ce.roof_insulation,
+            ce.roof_insulation_thickness
         FROM
-            filtered_buildings fb
-        LEFT JOIN LATERAL (
-            SELECT
-                id,
-                uprn,
-                epc_rating,
-                lodgement_date
-            FROM
-                iris.epc_assessment
-            WHERE
-                uprn = fb.uprn
-            ORDER BY
-                match_score desc nulls first,
-                lodgement_date desc nulls last,
-                id desc
-            LIMIT 1
-        ) ea ON
-            TRUE
-        LEFT JOIN iris.structure_unit su
+            iris.building b
+        LEFT JOIN iris.current_epc_assessment ce
         ON
-            su.epc_assessment_id = ea.id;
+            ce.uprn = b.uprn
+        WHERE b.is_residential = true
+            AND b.point && ST_MakeEnvelope(:min_long, :min_lat, :max_long, :max_lat, :srid)
+            AND ST_Intersects(b.point, ST_MakeEnvelope(:min_long, :min_lat, :max_long, :max_lat, :srid));
     """
 
 
-def get_filterable_buildings_in_bounding_box_query() -> str:
+def get_filter_summary_in_bounding_box_query() -> str:
     return """
-        WITH filtered_buildings AS (
-            SELECT uprn, toid, post_code, point
-            FROM iris.building
-            WHERE is_residential = true
-                AND point && ST_MakeEnvelope(:min_long, :min_lat, :max_long, :max_lat, :srid)
-                AND ST_Intersects(point, ST_MakeEnvelope(:min_long, :min_lat, :max_long, :max_lat, :srid))
-        )
         SELECT
-            fb.uprn, fb.toid, fb.post_code,
-            su.built_form, su.fuel_type,
-            ea.lodgement_date, su.window_glazing,
-            su.wall_construction, su.wall_insulation,
-            su.floor_construction, su.floor_insulation,
-            su.has_roof_solar_panels, su.roof_material,
-            su.roof_aspect_area_facing_north_m2,
-            su.roof_aspect_area_facing_north_east_m2,
-            su.roof_aspect_area_facing_north_west_m2,
-            su.roof_aspect_area_facing_east_m2,
-            su.roof_aspect_area_facing_south_m2,
-            su.roof_aspect_area_facing_south_east_m2,
-            su.roof_aspect_area_facing_south_west_m2,
-            su.roof_aspect_area_facing_west_m2,
-            su.roof_construction, su.roof_insulation,
-            su.roof_insulation_thickness
+            array_remove(array_agg(DISTINCT substring(b.post_code from '^[0-9A-Z]{3,4}')), NULL) AS postcode,
+            array_agg(DISTINCT ce.built_form) FILTER (WHERE ce.built_form <> '') AS built_form,
+            array_agg(DISTINCT extract(year from ce.lodgement_date)::int::text)
+                FILTER (WHERE ce.lodgement_date IS NOT NULL) AS inspection_year,
+            array_agg(DISTINCT ce.fuel_type) FILTER (WHERE ce.fuel_type <> '') AS fuel_type,
+            array_agg(DISTINCT ce.window_glazing) FILTER (WHERE ce.window_glazing <> '') AS window_glazing,
+            array_agg(DISTINCT ce.wall_construction) FILTER (WHERE ce.wall_construction <> '') AS wall_construction,
+            array_agg(DISTINCT ce.wall_insulation) FILTER (WHERE ce.wall_insulation <> '') AS wall_insulation,
+            array_agg(DISTINCT ce.floor_construction) FILTER (WHERE ce.floor_construction <> '') AS floor_construction,
+            array_agg(DISTINCT ce.floor_insulation) FILTER (WHERE ce.floor_insulation <> '') AS floor_insulation,
+            bool_or(ce.has_roof_solar_panels) AS any_roof_solar_panels,
+            bool_or(NOT ce.has_roof_solar_panels) AS any_no_roof_solar_panels,
+            array_agg(DISTINCT replace(ce.roof_material, ' ', '')) FILTER (WHERE ce.roof_material <> '') AS roof_material,
+            bool_or(ce.roof_aspect_area_facing_north_m2 > 0) AS any_roof_facing_north,
+            bool_or(ce.roof_aspect_area_facing_north_east_m2 > 0) AS any_roof_facing_north_east,
+            bool_or(ce.roof_aspect_area_facing_east_m2 > 0) AS any_roof_facing_east,
+            bool_or(ce.roof_aspect_area_facing_south_east_m2 > 0) AS any_roof_facing_south_east,
+            bool_or(ce.roof_aspect_area_facing_south_m2 > 0) AS any_roof_facing_south,
+            bool_or(ce.roof_aspect_area_facing_south_west_m2 > 0) AS any_roof_facing_south_west,
+            bool_or(ce.roof_aspect_area_facing_west_m2 > 0) AS any_roof_facing_west,
+            bool_or(ce.roof_aspect_area_facing_north_west_m2 > 0) AS any_roof_facing_north_west,
+            array_agg(DISTINCT ce.roof_construction) FILTER (WHERE ce.roof_construction <> '') AS roof_construction,
+            array_agg(DISTINCT ce.roof_insulation) FILTER (WHERE ce.roof_insulation <> '') AS roof_insulation_location,
+            array_agg(DISTINCT ce.roof_insulation_thickness)
+                FILTER (WHERE ce.roof_insulation_thickness <> '') AS roof_insulation_thickness
         FROM
-            filtered_buildings fb
-        LEFT JOIN LATERAL (
-            SELECT
-                id,
-                uprn,
-                epc_rating,
-                lodgement_date
-            FROM
-                iris.epc_assessment
-            WHERE
-                uprn = fb.uprn
-            ORDER BY
-                match_score desc nulls first,
-                lodgement_date desc nulls last,
-                id desc
-            LIMIT 1
-        ) ea ON
-            TRUE
-        LEFT JOIN iris.structure_unit su
+            iris.building b
+        LEFT JOIN iris.current_epc_assessment ce
         ON
-            su.epc_assessment_id = ea.id;
+            ce.uprn = b.uprn
+        WHERE b.is_residential = true
+            AND b.point && ST_MakeEnvelope(:min_long, :min_lat, :max_long, :max_lat, :srid)
+            AND ST_Intersects(b.point, ST_MakeEnvelope(:min_long, :min_lat, :max_long, :max_lat, :srid));
     """
 
 
@@ -622,6 +917,30 @@ def area_level_to_column(area_level: str) -> str:
         )
 
 
+def _polygon_condition(polygon: "str | PolygonSelection", params: dict) -> str:
+    """
+    Builds the condition restricting rows with a `uprn` and `point` to a polygon. A polygon
+    resolved to its UPRNs is matched by UPRN, otherwise the point is tested spatially, against
+    the polygon's subdivided parts when it was prepared.
+    """
+    if isinstance(polygon, PolygonSelection) and polygon.uprns is not None:
+        params["polygon_uprns"] = polygon.uprns
+        return "uprn = ANY(:polygon_uprns)"
+    if isinstance(polygon, PolygonSelection) and polygon.parts:
+        params["polygon_parts"] = polygon.parts
+        # the parts are parsed once for the query, as the subquery is uncorrelated
+        return """EXISTS (
+                SELECT 1
+                FROM unnest((
+                    SELECT array_agg(ST_GeomFromGeoJSON(part))
+                    FROM unnest(CAST(:polygon_parts AS text[])) AS part
+                )) AS polygon_part(geom)
+                WHERE ST_Intersects(polygon_part.geom, point)
+            )"""
+    params["polygon"] = polygon_geojson(polygon)
+    return "ST_Within(point, ST_GeomFromGeoJSON(:polygon))"
+
+
 def _wales_grouped_column(column: str) -> str:
     """Returns a CASE expression that groups Welsh regions into 'Wales'."""
     return f"""CASE
@@ -633,10 +952,10 @@ def _wales_grouped_column(column: str) -> str:
 
 def _get_epc_rating_query_with_polygon(per_region: bool, polygon: str):
     """Build EPC rating query for polygon filter using building_epc_analytics."""
-    params = {"polygon": polygon}
+    params = {}
     where_conditions = [
         EPC_ACTIVE_TRUE,
-        "ST_Within(point, ST_GeomFromGeoJSON(:polygon))",
+        _polygon_condition(polygon, params),
     ]
     if per_region:
         where_conditions.append(REGION_NAME_PRESENT)
@@ -662,14 +981,23 @@ def _get_epc_rating_query_with_polygon(per_region: bool, polygon: str):
     return query, params
 
 
+def _latest_snapshot_condition(snapshot_date: "date | None", params: dict) -> str:
+    """
+    Restricts aggregates to the latest snapshot, bound as a parameter when it is known from the
+    snapshot metadata and otherwise looked up by the query.
+    """
+    if snapshot_date is None:
+        return "snapshot_date = (SELECT MAX(snapshot_date) FROM iris.building_epc_analytics_aggregates)"
+    params["snapshot_date"] = snapshot_date
+    return "snapshot_date = :snapshot_date"
+
+
 def _get_epc_rating_query_from_aggregates(
-    per_region: bool, area_level: str, area_names: list
+    per_region: bool, area_level: str, area_names: list, snapshot_date: date = None
 ):
     """Build EPC rating query from pre-aggregated data."""
     params = {}
-    where_conditions = [
-        "snapshot_date = (SELECT MAX(snapshot_date) FROM iris.building_epc_analytics_aggregates)"
-    ]
+    where_conditions = [_latest_snapshot_condition(snapshot_date, params)]
 
     if area_level and area_names:
         area_names = expand_wales_region(area_names)
@@ -707,10 +1035,13 @@ def get_count_of_epc_rating_query(
     polygon: str = None,
     area_level: str = None,
     area_names: list = None,
+    snapshot_date: date = None,
 ):
     if polygon:
         return _get_epc_rating_query_with_polygon(per_region, polygon)
-    return _get_epc_rating_query_from_aggregates(per_region, area_level, area_names)
+    return _get_epc_rating_query_from_aggregates(
+        per_region, area_level, area_names, snapshot_date
+    )
 
 
 def _get_average_daily_sunlight_hours_per_area_query(
@@ -759,8 +1090,8 @@ def _get_average_daily_sunlight_hours_query_with_polygon(
         polygon: str
     ):
 
-    params = {"polygon": polygon}
-    where_conditions = ["ST_Within(point, ST_GeomFromGeoJSON(:polygon))"]
+    params = {}
+    where_conditions = [_polygon_condition(polygon, params)]
 
     query = f"""
         SELECT
@@ -806,8 +1137,7 @@ def get_percentage_of_buildings_attributes_per_region_query(
     where_conditions.append(EPC_ACTIVE_TRUE)
 
     if polygon:
-        where_conditions.append("ST_Within(point, ST_GeomFromGeoJSON(:polygon))")
-        params["polygon"] = polygon
+        where_conditions.append(_polygon_condition(polygon, params))
     elif area_level and area_names:
         area_names = expand_wales_region(area_names)
         where_conditions.append(
@@ -848,8 +1178,7 @@ def get_fuel_types_by_building_type_query(
     where_conditions.append(EPC_ACTIVE_TRUE)
 
     if polygon:
-        where_conditions.append("ST_Within(point, ST_GeomFromGeoJSON(:polygon))")
-        params["polygon"] = polygon
+        where_conditions.append(_polygon_condition(polygon, params))
     elif area_level and area_names:
         area_names = expand_wales_region(area_names)
         where_conditions.append(
@@ -899,17 +1228,18 @@ def get_filtered_avg_sap_rating_overtime_query(
         )
 
     if polygon:
-        query = """
+        params = {}
+        query = f"""
             SELECT
                 unnest(active_snapshots) as date,
                 AVG(sap_rating) as avg_sap_rating
             FROM iris.building_epc_analytics
             WHERE active_snapshots IS NOT NULL
-              AND ST_Within(point, ST_GeomFromGeoJSON(:polygon))
+              AND {_polygon_condition(polygon, params)}
             GROUP BY date
             ORDER BY date ASC;
         """
-        return query, {"polygon": polygon}
+        return query, params
 
     area_names = expand_wales_region(area_names)
     query = f"""
@@ -931,8 +1261,7 @@ def get_buildings_affected_by_extreme_weather_data_query(
     params = {}
 
     if polygon:
-        params["polygon"] = polygon
-        filter_condition = "ST_Within(point, ST_GeomFromGeoJSON(:polygon))"
+        filter_condition = _polygon_condition(polygon, params)
     elif area_level and area_names:
         area_names = expand_wales_region(area_names)
         params["area_names"] = area_names
@@ -955,36 +1284,50 @@ def get_buildings_affected_by_extreme_weather_data_query(
 
 
 def get_number_of_in_date_and_expired_epcs_query(
-    polygon: str = None, area_level: str = None, area_names: list = None
+    polygon: str = None,
+    area_level: str = None,
+    area_names: list = None,
+    snapshot_dates: list = None,
 ):
-    """Get in-date and expired EPC counts over time, optionally filtered by area."""
+    """
+    Get in-date and expired EPC counts over time, optionally filtered by area. The snapshot
+    dates of a polygon timeline are taken from the snapshot metadata when given.
+    """
     params = {}
 
     # For polygon filters, calculate dynamically from building_epc_analytics (spatial query required)
     if polygon:
-        params["polygon"] = polygon
-
-        query = """
-            WITH snapshot_dates AS (
-                SELECT generate_series(
+        if snapshot_dates:
+            params["snapshot_dates"] = snapshot_dates
+            snapshot_dates_select = "unnest(CAST(:snapshot_dates AS date[]))"
+        else:
+            snapshot_dates_select = """generate_series(
                     DATE_TRUNC('year', (SELECT MIN(lodgement_date) FROM iris.building_epc_analytics WHERE lodgement_date IS NOT NULL))::date + interval '1 year' - interval '1 day',
                     DATE_TRUNC('year', CURRENT_DATE)::date + interval '1 year' - interval '1 day',
                     interval '1 year'
-                )::date as snapshot_date
+                )::date"""
+        query = f"""
+            WITH snapshot_dates AS (
+                SELECT {snapshot_dates_select} as snapshot_date
             ),
             filtered_buildings AS (
                 SELECT uprn, lodgement_date, active_snapshots
                 FROM iris.building_epc_analytics
                 WHERE active_snapshots IS NOT NULL
-                  AND ST_Within(point, ST_GeomFromGeoJSON(:polygon))
+                  AND {_polygon_condition(polygon, params)}
+            ),
+            first_issued AS (
+                SELECT
+                    (DATE_TRUNC('year', MIN(lodgement_date)) + interval '1 year' - interval '1 day')::date as snapshot_date
+                FROM filtered_buildings
+                GROUP BY uprn
             ),
             issued_counts AS (
                 SELECT
                     sd.snapshot_date,
-                    COUNT(DISTINCT fb.uprn) as total_issued_count
+                    SUM(COUNT(fi.snapshot_date)) OVER (ORDER BY sd.snapshot_date)::bigint as total_issued_count
                 FROM snapshot_dates sd
-                CROSS JOIN filtered_buildings fb
-                WHERE fb.lodgement_date <= sd.snapshot_date
+                LEFT JOIN first_issued fi ON fi.snapshot_date = sd.snapshot_date
                 GROUP BY sd.snapshot_date
             ),
             active_counts AS (
@@ -1000,6 +1343,7 @@ def get_number_of_in_date_and_expired_epcs_query(
                 (ic.total_issued_count - COALESCE(ac.active_epc_count, 0)) AS expired
             FROM issued_counts ic
             LEFT JOIN active_counts ac ON ic.snapshot_date = ac.snapshot_date
+            WHERE ic.total_issued_count > 0
             ORDER BY ic.snapshot_date;
         """
         return query, params
@@ -1039,7 +1383,7 @@ def get_buildings_by_deprivation_dimension_query(
     join_clause = ""
 
     if polygon:
-        params["polygon"] = polygon
+        params["polygon"] = polygon_geojson(polygon)
         where_conditions.append(
             "ST_Intersects(mb.geom, ST_Transform(ST_GeomFromGeoJSON(:polygon), 27700))"
         )
@@ -1167,6 +1511,7 @@ def get_count_of_epc_rating_by_area_level_query(
     group_by_level: str,
     filter_area_level: str = None,
     filter_area_names: list = None,
+    snapshot_date: date = None,
 ):
     params = {}
     where_conditions = []
@@ -1181,9 +1526,7 @@ def get_count_of_epc_rating_by_area_level_query(
 
     where_conditions.append(f"{group_column} IS NOT NULL AND {group_column} != ''")
 
-    where_conditions.append(
-        "snapshot_date = (SELECT MAX(snapshot_date) FROM iris.building_epc_analytics_aggregates)"
-    )
+    where_conditions.append(_latest_snapshot_condition(snapshot_date, params))
 
     where_clause = "WHERE " + " AND ".join(where_conditions)
 
@@ -1293,8 +1636,7 @@ def get_count_of_epc_rating_by_features_query(
     where_conditions = [EPC_ACTIVE_TRUE, "epc_rating IS NOT NULL", config["where"]]
 
     if polygon:
-        where_conditions.append("ST_Within(point, ST_GeomFromGeoJSON(:polygon))")
-        params["polygon"] = polygon
+        where_conditions.append(_polygon_condition(polygon, params))
     elif area_level and area_names:
         area_names = expand_wales_region(area_names)
         filter_column = area_level_to_column(area_level)
@@ -1328,7 +1670,7 @@ def get_epc_ratings_overtime_query(
     params = {}
 
     if polygon:
-        query = """
+        query = f"""
             SELECT
                 unnest(active_snapshots) as date,
                 COUNT(*) FILTER (WHERE epc_rating = 'A') AS epc_a,
@@ -1340,11 +1682,10 @@ def get_epc_ratings_overtime_query(
                 COUNT(*) FILTER (WHERE epc_rating = 'G') AS epc_g
             FROM iris.building_epc_analytics
             WHERE active_snapshots IS NOT NULL
-              AND ST_Within(point, ST_GeomFromGeoJSON(:polygon))
+              AND {_polygon_condition(polygon, params)}
             GROUP BY date
             ORDER BY date ASC;
         """
-        params["polygon"] = polygon
     else:
         where_clause = ""
         if area_level and area_names:
@@ -1375,7 +1716,8 @@ def get_epc_ratings_overtime_query(
 
 def get_sap_rating_overtime_by_property_type_query(polygon: str):
     """Get average SAP rating over time grouped by property type for a polygon area."""
-    query = """
+    params = {}
+    query = f"""
         SELECT
             unnest(active_snapshots) as date,
             type as name,
@@ -1384,11 +1726,11 @@ def get_sap_rating_overtime_by_property_type_query(polygon: str):
         WHERE active_snapshots IS NOT NULL
           AND type IS NOT NULL
           AND type != ''
-          AND ST_Within(point, ST_GeomFromGeoJSON(:polygon))
+          AND {_polygon_condition(polygon, params)}
         GROUP BY date, type
         ORDER BY date ASC, type ASC;
     """
-    return query, {"polygon": polygon}
+    return query, params
 
 
 def get_sap_rating_overtime_by_area_query(
@@ -1597,3 +1939,104 @@ def get_building_details_for_bulk_download_query(uprns: [str]):
     params = {"uprns": uprns}
 
     return query, params
+
+
+VECTOR_TILE_EXTENT = 4096
+VECTOR_TILE_BUFFER = 64
+# Below this zoom, building points are drawn on a coarser grid and collapsed to one point per cell
+BUILDING_TILE_DETAIL_ZOOM = 14
+
+VECTOR_TILE_POLYGON_LAYERS = {
+    "wards": "iris.uk_ward",
+    "districts": "iris.district_borough_unitary",
+    "regions": "iris.uk_region",
+}
+VECTOR_TILE_LAYERS = ("buildings", *VECTOR_TILE_POLYGON_LAYERS)
+
+
+def _tile_simplification_tolerance(z: int) -> float:
+    # roughly a quarter of a 256px screen pixel, in degrees, at the given zoom
+    return 360.0 / (2**z * 256 * 4)
+
+
+def get_vector_tile_query(layer: str, z: int, x: int, y: int):
+    """
+    Builds a query that renders one Mapbox vector tile for the given layer.
+
+    Args:
+        layer (str): One of `VECTOR_TILE_LAYERS`.
+        z (int): The tile zoom level.
+        x (int): The tile column.
+        y (int): The tile row.
+
+    Returns:
+        tuple[str, dict]: The query and its parameters. The query returns a single bytea column.
+    """
+    if layer not in VECTOR_TILE_LAYERS:
+        raise ValueError(f"Invalid tile layer: {layer}")
+    if not 0 <= x < 2**z or not 0 <= y < 2**z:
+        raise ValueError(f"Tile {z}/{x}/{y} is out of range")
+
+    params = {"z": z, "x": x, "y": y, "layer": layer, "buffer": VECTOR_TILE_BUFFER}
+
+    if layer == "buildings":
+        detailed = z >= BUILDING_TILE_DETAIL_ZOOM
+        params["extent"] = VECTOR_TILE_EXTENT if detailed else 256
+        query = f"""
+            WITH bounds AS (
+                SELECT
+                    ST_TileEnvelope(:z, :x, :y) AS geom,
+                    ST_Transform(ST_TileEnvelope(:z, :x, :y), 4326) AS geom_4326
+            ),
+            buildings AS (
+                SELECT DISTINCT ON (bea.uprn)
+                    bea.uprn,
+                    bea.epc_rating,
+                    bea.type,
+                    bea.point
+                FROM iris.building_epc_analytics bea, bounds
+                WHERE bea.point && bounds.geom_4326
+                ORDER BY bea.uprn, bea.epc_active DESC, bea.lodgement_date DESC NULLS LAST
+            ),
+            mvt_geom AS (
+                SELECT {"" if detailed else "DISTINCT ON (geom)"}
+                    ST_AsMVTGeom(
+                        ST_Transform(b.point, 3857), bounds.geom, :extent, :buffer, true
+                    ) AS geom,
+                    b.uprn,
+                    b.epc_rating,
+                    b.type AS structure_unit_type
+                FROM buildings b, bounds
+            )
+            SELECT ST_AsMVT(mvt_geom.*, :layer, :extent, 'geom')
+            FROM mvt_geom
+            WHERE geom IS NOT NULL;
+        """
+        return query, params
+
+    params["extent"] = VECTOR_TILE_EXTENT
+    params["tolerance"] = _tile_simplification_tolerance(z)
+    query = f"""
+        WITH bounds AS (
+            SELECT
+                ST_TileEnvelope(:z, :x, :y) AS geom,
+                ST_Transform(ST_TileEnvelope(:z, :x, :y), 4326) AS geom_4326
+        ),
+        mvt_geom AS (
+            SELECT
+                ST_AsMVTGeom(
+                    ST_Transform(ST_SimplifyPreserveTopology(t.geometry, :tolerance), 3857),
+                    bounds.geom,
+                    :extent,
+                    :buffer,
+                    true
+                ) AS geom,
+                t.name
+            FROM {VECTOR_TILE_POLYGON_LAYERS[layer]} t, bounds
+            WHERE t.geometry && bounds.geom_4326
+        )
+        SELECT ST_AsMVT(mvt_geom.*, :layer, :extent, 'geom')
+        FROM mvt_geom
+        WHERE geom IS NOT NULL;
+    """
+    return query, params
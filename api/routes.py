@@ -2,17 +2,26 @@
 # © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
 # and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
 
+import asyncio
 import configparser
+import os
 import uuid
 from datetime import datetime
-from typing import Annotated, List, Optional, Tuple
+from functools import lru_cache
+from typing import Annotated, List, Optional
 
-import requests
+import http_client
+import httpx
 from access import AccessClient
+from cache import TTLCache
 from config import get_settings
-from db import execute_with_timeout, get_db
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
-from mappers import (map_bounded_buildings_response,
+from dashboard_cache import dashboard_cache
+from db import get_db, get_pool_metrics, get_session_maker, stream_partitions
+from fastapi import (APIRouter, Depends, HTTPException, Path, Query, Request,
+                     Response)
+from fastapi.responses import JSONResponse
+from layer_cache import GeoJsonLayer, geojson_layer_response
+from mappers import (map_bounded_building_row, map_bounded_buildings_response,
                      map_bounded_filterable_buildings_response,
                      map_building_details_for_bulk_download,
                      map_building_hot_summer_days_response,
@@ -21,13 +30,16 @@ from mappers import (map_bounded_buildings_response,
                      map_building_weather_summary_response,
                      map_building_wind_driven_rain_response,
                      map_epc_statistics_response, map_filter_summary_response,
+                     map_filterable_building_row,
                      map_flagged_buildings_response,
                      map_percentage_building_attributes_per_region_response,
                      map_single_building_response,
-                     map_structure_unit_flag_history_response)
+                     map_structure_unit_flag_history_response,
+                     split_building_details_results)
 from models.dto_models import (AverageDailySunlightHoursPerArea,
                                AverageSapRatingPerLodgementDate,
                                BuildingAttributePercentagesPerRegion,
+                               BuildingCluster,
                                BuildingDetailsForBulkDownload,
                                BuildingDetailsForBulkDownloadSchema,
                                BuildingExtremeWeatherSummaryData,
@@ -42,7 +54,7 @@ from models.dto_models import (AverageDailySunlightHoursPerArea,
                                BuildingWindDrivenRainData,
                                BuildingWindDrivenRainSchema, CountOfEpcRatings,
                                CountOfEpcRatingsPerRegion, DetailedBuilding,
-                               DetailedBuildingSchema, EpcAndOsBuildingSchema,
+                               DetailedBuildingSchema,
                                EpcRatingCountsOvertime, EPCRatingsByCategory,
                                EpcStatistics, FilterableBuilding,
                                FilterableBuildingSchema, FilterSummary,
@@ -53,10 +65,13 @@ from models.ies_models import (EDH, ClassificationEmum, IesAccount,
                                IesAssessment, IesAssessToBeFalse,
                                IesAssessToBeTrue, IesClass, IesEntity,
                                IesPerson, IesState, IesThing, ies)
-from pydantic import AfterValidator, BaseModel
+from polygon_selection import polygon_selection_cache
+from pydantic import AfterValidator, BaseModel, Field, field_validator
 from query import (get_all_ngd_attributes_pg,
                    get_average_daily_sunlight_hours_query,
-                   get_building, get_building_details_for_bulk_download_query,
+                   get_building, get_building_clusters_in_bounding_box_query,
+                   get_building_details,
+                   get_building_details_for_bulk_download_query,
                    get_buildings_affected_by_extreme_weather_data_query,
                    get_buildings_by_deprivation_dimension_query,
                    get_buildings_in_bounding_box_query,
@@ -65,6 +80,7 @@ from query import (get_all_ngd_attributes_pg,
                    get_count_of_epc_rating_query, get_county_names_query,
                    get_district_names_query, get_epc_attributes_pg,
                    get_epc_ratings_overtime_query,
+                   get_filter_summary_in_bounding_box_query,
                    get_filterable_buildings_in_bounding_box_query,
                    get_filtered_avg_sap_rating_overtime_query,
                    get_flag_history, get_flagged_buildings,
@@ -85,10 +101,10 @@ from query import (get_all_ngd_attributes_pg,
                    get_sap_rating_overtime_by_property_type_query,
                    get_statistics_for_wards,
                    get_sunlight_hours_data_for_building_query,
+                   get_vector_tile_query,
                    get_walls_and_windows_for_building, get_ward_names_query,
                    get_weather_summary_data_for_building_query,
                    get_wind_driven_rain_data_for_building_query)
-from rdflib import Graph
 from requests import codes, exceptions
 from services.climate_service import (fetch_geojson_for_hot_summer_days,
                                       fetch_geojson_for_icing_days,
@@ -100,12 +116,16 @@ from services.energy_performance_service import (
     fetch_geojson_for_energy_performance_by_districts,
     fetch_geojson_for_energy_performance_by_regions,
     fetch_geojson_for_energy_performance_by_wards)
+from snapshot_metadata import snapshot_metadata_cache
 from sqlalchemy import bindparam, text
 from sqlalchemy.ext.asyncio import AsyncSession
+from streaming import (RESPONSE_FORMAT_PATTERN, STREAMING_RESPONSES,
+                       get_response_format, streaming_rows_response)
 from utils import get_headers as get_forwarding_headers
 from utils import has_bindings, validate_geojson_polygon
 
 AREA_LEVEL_PATTERN = "^(region|county|district|ward)$"
+TILE_LAYER_PATTERN = "^(buildings|wards|districts|regions)$"
 FEATURE_PATTERN = "^(glazing_types|fuel_types|wall_construction|wall_insulation|floor_construction|floor_insulation|roof_construction|roof_material|roof_insulation|roof_insulation_thickness|solar_panels|roof_aspect)$"
 
 EPC_FIELDS = [
@@ -134,29 +154,45 @@ ACCESS_API_CALL_ERROR = "Error calling Access, Internal Server Error"
 IDENTITY_API_CALL_ERROR = "Error calling Identity API, Internal Server Error"
 ISO_8601_URL = "http://iso.org/iso8601#"
 APPLICATION_JSON = "application/json"
+MAPBOX_VECTOR_TILE = "application/vnd.mapbox-vector-tile"
+SIMPLE_BUILDING_FIELDS = [
+    "uprn",
+    "toid",
+    "first_line_of_address",
+    "energy_rating",
+    "structure_unit_type",
+    "latitude",
+    "longitude",
+]
 
 GeoJSONPolygon = Annotated[str, AfterValidator(validate_geojson_polygon)]
 
-if config_settings.UPDATE_MODE == "KAFKA":
-    from ia_map_lib import Adapter, Record, RecordUtils
+
+@lru_cache
+def get_knowledge_adapter():
+    """The Kafka adapter that updates are written to in KAFKA update mode, connected on the
+    first update so the API only loads the Kafka stack when an update is made.
+    """
+    from ia_map_lib import Adapter
     from ia_map_lib.sinks import KafkaSink
 
-    knowledgeSink = KafkaSink(
+    knowledge_sink = KafkaSink(
         topic=config_settings.IES_TOPIC, broker=config_settings.BOOTSTRAP_SERVERS
     )
-    knowledgeAdapter = Adapter(
-        knowledgeSink, name="IoW Write-Back API", source_name="local data"
-    )
+    return Adapter(knowledge_sink, name="IoW Write-Back API", source_name="local data")
 
 
 def get_headers(security_labels):
+    from ia_map_lib import RecordUtils
+
     return RecordUtils.to_headers(
         {"Security-Label": security_labels, "Content-Type": "application/n-triples"}
     )
 
 
+# read on the first request for the version info
+SETUP_CFG_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "setup.cfg")
 config = configparser.ConfigParser()
-config.read("setup.cfg")
 # The URIs used in the ontologies
 ndt_ont = "http://ndtp.co.uk/ontology#"
 
@@ -169,6 +205,7 @@ def add_prefix(prefix, uri):
 
 
 access_client = AccessClient(access_url, config_settings.DEV_MODE)
+tile_cache = TTLCache(config_settings.TILE_CACHE_SIZE, config_settings.TILE_CACHE_TTL)
 prefix_dict = {}
 add_prefix("xsd", "http://www.w3.org/2001/XMLSchema#")
 add_prefix("dc", "http://purl.org/dc/elements/1.1/")
@@ -234,13 +271,34 @@ def run_sparql_query(
     global jena_url
     get_uri = jena_url + "/" + query_dataset + "/query"
     try:
-        response = requests.get(
-            get_uri, params={"query": prefixes + query}, headers=headers
+        response = http_client.get_session().get(
+            get_uri,
+            params={"query": prefixes + query},
+            headers=headers,
+            timeout=http_client.get_timeout(),
         )
         response.raise_for_status()
         return response.json()
     except exceptions.HTTPError as e:
         raise HTTPException(e.response.status_code)
+    except exceptions.Timeout:
+        raise HTTPException(codes.gateway_timeout)
+
+
+async def run_sparql_query_async(
+    query: str, headers: dict[str, str], query_dataset=config_settings.DATASET
+):
+    get_uri = jena_url + "/" + query_dataset + "/query"
+    try:
+        response = await http_client.get_with_retry(
+            get_uri, params={"query": prefixes + query}, headers=headers
+        )
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(e.response.status_code)
+    except httpx.TimeoutException:
+        raise HTTPException(codes.gateway_timeout)
 
 
 def run_sparql_update(
@@ -260,16 +318,24 @@ def run_sparql_update(
             **forwarding_headers,
         }
         try:
-            requests.post(post_uri, headers=headers, data=prefixes + query)
+            http_client.get_session().post(
+                post_uri,
+                headers=headers,
+                data=prefixes + query,
+                timeout=http_client.get_timeout(),
+            )
         except exceptions.HTTPError as e:
             raise HTTPException(e.response.status_code)
     elif config_settings.UPDATE_MODE == "KAFKA":
+        from ia_map_lib import Record
+        from rdflib import Graph
+
         g = Graph()
         g.update(query)
         out_data = g.serialize(format="nt")
         try:
             record = Record(get_headers(sec_label.to_string()), None, out_data)
-            knowledgeAdapter.send(record)
+            get_knowledge_adapter().send(record)
         except Exception as e:
             print(e)
             raise e
@@ -371,9 +437,19 @@ def test_user(request: Request):
 
 @router.get("/version-info")
 def version():
+    if not config.has_section("metadata"):
+        config.read(SETUP_CFG_PATH)
     return config["metadata"]
 
 
+@router.get(
+    "/db-pool-metrics",
+    description="Gets the state of each database connection pool, with counts of checkouts and how long they waited for and held a connection",
+)
+def db_pool_metrics():
+    return get_pool_metrics()
+
+
 @router.post("/test-post")
 def test_post(req: Request):
     print("testing post")
@@ -437,14 +513,20 @@ def post_person(per: IesPerson):
 
 
 @router.get("/dashboard/epc-ratings", response_model=List[CountOfEpcRatings])
+@dashboard_cache.cached("epc-ratings")
 async def get_epc_ratings_for_dashboard(
     db: Annotated[AsyncSession, Depends(get_db)],
     polygon: Annotated[Optional[GeoJSONPolygon], Query()] = None,
     area_level: Annotated[Optional[str], Query(pattern=AREA_LEVEL_PATTERN)] = None,
     area_names: Annotated[Optional[List[str]], Query()] = None,
 ):
+    polygon = await polygon_selection_cache.resolve(db, polygon)
+    snapshot = await snapshot_metadata_cache.get(db)
     query, params = get_count_of_epc_rating_query(
-        polygon=polygon, area_level=area_level, area_names=area_names
+        polygon=polygon,
+        area_level=area_level,
+        area_names=area_names,
+        snapshot_date=snapshot.latest_snapshot_date,
     )
     results = await db.execute(text(query), params)
     mapped_results = [CountOfEpcRatings.from_orm(row) for row in results]
@@ -455,14 +537,21 @@ async def get_epc_ratings_for_dashboard(
 @router.get(
     "/dashboard/epc-ratings-per-region", response_model=List[CountOfEpcRatingsPerRegion]
 )
+@dashboard_cache.cached("epc-ratings-per-region")
 async def get_epc_ratings_per_region_for_dashboard(
     db: Annotated[AsyncSession, Depends(get_db)],
     polygon: Annotated[Optional[GeoJSONPolygon], Query()] = None,
     area_level: Annotated[Optional[str], Query(pattern=AREA_LEVEL_PATTERN)] = None,
     area_names: Annotated[Optional[List[str]], Query()] = None,
 ):
+    polygon = await polygon_selection_cache.resolve(db, polygon)
+    snapshot = await snapshot_metadata_cache.get(db)
     query, params = get_count_of_epc_rating_query(
-        per_region=True, polygon=polygon, area_level=area_level, area_names=area_names
+        per_region=True,
+        polygon=polygon,
+        area_level=area_level,
+        area_names=area_names,
+        snapshot_date=snapshot.latest_snapshot_date,
     )
     results = await db.execute(text(query), params)
     mapped_results = [CountOfEpcRatingsPerRegion.from_orm(row) for row in results]
@@ -473,6 +562,7 @@ async def get_epc_ratings_per_region_for_dashboard(
 @router.get(
     "/dashboard/epc-ratings-by-area-level", response_model=List[EPCRatingsByCategory]
 )
+@dashboard_cache.cached("epc-ratings-by-area-level")
 async def get_epc_ratings_by_area_level_for_dashboard(
     db: Annotated[AsyncSession, Depends(get_db)],
     group_by_level: Annotated[str, Query(..., pattern=AREA_LEVEL_PATTERN)],
@@ -481,10 +571,12 @@ async def get_epc_ratings_by_area_level_for_dashboard(
     ] = None,
     filter_area_names: Annotated[Optional[List[str]], Query()] = None,
 ):
+    snapshot = await snapshot_metadata_cache.get(db)
     query, params = get_count_of_epc_rating_by_area_level_query(
         group_by_level=group_by_level,
         filter_area_level=filter_area_level,
         filter_area_names=filter_area_names,
+        snapshot_date=snapshot.latest_snapshot_date,
     )
     results = await db.execute(text(query), params)
 
@@ -494,6 +586,7 @@ async def get_epc_ratings_by_area_level_for_dashboard(
 @router.get(
     "/dashboard/epc-ratings-by-feature", response_model=List[EPCRatingsByCategory]
 )
+@dashboard_cache.cached("epc-ratings-by-feature")
 async def get_epc_ratings_by_feature_for_dashboard(
     db: Annotated[AsyncSession, Depends(get_db)],
     feature: Annotated[str, Query(..., pattern=FEATURE_PATTERN)],
@@ -501,6 +594,7 @@ async def get_epc_ratings_by_feature_for_dashboard(
     area_level: Annotated[Optional[str], Query(pattern=AREA_LEVEL_PATTERN)] = None,
     area_names: Annotated[Optional[List[str]], Query()] = None,
 ):
+    polygon = await polygon_selection_cache.resolve(db, polygon)
     query, params = get_count_of_epc_rating_by_features_query(
         feature=feature, polygon=polygon, area_level=area_level, area_names=area_names
     )
@@ -513,12 +607,14 @@ async def get_epc_ratings_by_feature_for_dashboard(
     "/dashboard/building-attributes-percentage-per-region",
     response_model=List[BuildingAttributePercentagesPerRegion],
 )
+@dashboard_cache.cached("building-attributes-percentage-per-region")
 async def get_percentage_building_attributes_per_region(
     db: Annotated[AsyncSession, Depends(get_db)],
     polygon: Annotated[Optional[GeoJSONPolygon], Query()] = None,
     area_level: Annotated[Optional[str], Query(pattern=AREA_LEVEL_PATTERN)] = None,
     area_names: Annotated[Optional[List[str]], Query()] = None,
 ):
+    polygon = await polygon_selection_cache.resolve(db, polygon)
     query, params = get_percentage_of_buildings_attributes_per_region_query(
         polygon=polygon, area_level=area_level, area_names=area_names
     )
@@ -531,6 +627,7 @@ async def get_percentage_building_attributes_per_region(
     "/dashboard/sap-rating-overtime",
     response_model=List[AverageSapRatingPerLodgementDate],
 )
+@dashboard_cache.cached("sap-rating-overtime")
 async def get_sap_rating_overtime(
     db: Annotated[AsyncSession, Depends(get_db)],
     polygon: Annotated[Optional[GeoJSONPolygon], Query()] = None,
@@ -550,6 +647,7 @@ async def get_sap_rating_overtime(
     }
 
     if polygon or (area_level and area_names):
+        polygon = await polygon_selection_cache.resolve(db, polygon)
         filtered_query, params = get_filtered_avg_sap_rating_overtime_query(
             polygon=polygon, area_level=area_level, area_names=area_names
         )
@@ -566,10 +664,12 @@ async def get_sap_rating_overtime(
     "/dashboard/sap-rating-overtime-by-property-type",
     response_model=List[SapRatingTimelineDataPoint],
 )
+@dashboard_cache.cached("sap-rating-overtime-by-property-type")
 async def get_sap_rating_overtime_by_property_type(
     db: Annotated[AsyncSession, Depends(get_db)],
     polygon: Annotated[GeoJSONPolygon, Query(...)],
 ):
+    polygon = await polygon_selection_cache.resolve(db, polygon)
     query, params = get_sap_rating_overtime_by_property_type_query(polygon=polygon)
     results = await db.execute(text(query), params)
     return [SapRatingTimelineDataPoint.from_orm(row) for row in results]
@@ -579,6 +679,7 @@ async def get_sap_rating_overtime_by_property_type(
     "/dashboard/sap-rating-overtime-by-area",
     response_model=List[SapRatingTimelineDataPoint],
 )
+@dashboard_cache.cached("sap-rating-overtime-by-area")
 async def get_sap_rating_overtime_by_area(
     db: Annotated[AsyncSession, Depends(get_db)],
     group_by_level: Annotated[str, Query(..., pattern=AREA_LEVEL_PATTERN)],
@@ -600,12 +701,14 @@ async def get_sap_rating_overtime_by_area(
     "/dashboard/epc-ratings-overtime",
     response_model=List[EpcRatingCountsOvertime],
 )
+@dashboard_cache.cached("epc-ratings-overtime")
 async def get_epc_ratings_overtime(
     db: Annotated[AsyncSession, Depends(get_db)],
     polygon: Annotated[Optional[GeoJSONPolygon], Query()] = None,
     area_level: Annotated[Optional[str], Query(pattern=AREA_LEVEL_PATTERN)] = None,
     area_names: Annotated[Optional[List[str]], Query()] = None,
 ):
+    polygon = await polygon_selection_cache.resolve(db, polygon)
     query, params = get_epc_ratings_overtime_query(
         polygon=polygon, area_level=area_level, area_names=area_names
     )
@@ -619,12 +722,14 @@ async def get_epc_ratings_overtime(
     "/dashboard/fuel-types-by-building-type",
     response_model=List[FuelTypesByBuildingType],
 )
+@dashboard_cache.cached("fuel-types-by-building-type")
 async def get_fuel_types_by_building_type(
     db: Annotated[AsyncSession, Depends(get_db)],
     polygon: Annotated[Optional[GeoJSONPolygon], Query()] = None,
     area_level: Annotated[Optional[str], Query(pattern=AREA_LEVEL_PATTERN)] = None,
     area_names: Annotated[Optional[List[str]], Query()] = None,
 ):
+    polygon = await polygon_selection_cache.resolve(db, polygon)
     query, params = get_fuel_types_by_building_type_query(
         polygon=polygon, area_level=area_level, area_names=area_names
     )
@@ -638,12 +743,14 @@ async def get_fuel_types_by_building_type(
     "/dashboard/buildings-affected-by-extreme-weather",
     response_model=List[BuildingsAffectedByExtremeWeather],
 )
+@dashboard_cache.cached("buildings-affected-by-extreme-weather")
 async def get_buildings_affected_by_extreme_weather(
     db: Annotated[AsyncSession, Depends(get_db)],
     polygon: Annotated[Optional[GeoJSONPolygon], Query()] = None,
     area_level: Annotated[Optional[str], Query(pattern=AREA_LEVEL_PATTERN)] = None,
     area_names: Annotated[Optional[List[str]], Query()] = None,
 ):
+    polygon = await polygon_selection_cache.resolve(db, polygon)
     has_filter = bool(polygon or (area_level and area_names))
     query, params = get_buildings_affected_by_extreme_weather_data_query(
         polygon=polygon, area_level=area_level, area_names=area_names
@@ -662,14 +769,20 @@ async def get_buildings_affected_by_extreme_weather(
     "/dashboard/no-of-in-date-and-expired-epcs",
     response_model=List[NumberOfInDateAndExpiredEpcs],
 )
+@dashboard_cache.cached("no-of-in-date-and-expired-epcs")
 async def get_number_of_in_date_and_expired_epcs(
     db: Annotated[AsyncSession, Depends(get_db)],
     polygon: Annotated[Optional[GeoJSONPolygon], Query()] = None,
     area_level: Annotated[Optional[str], Query(pattern=AREA_LEVEL_PATTERN)] = None,
     area_names: Annotated[Optional[List[str]], Query()] = None,
 ):
+    polygon = await polygon_selection_cache.resolve(db, polygon)
+    snapshot = await snapshot_metadata_cache.get(db)
     query, params = get_number_of_in_date_and_expired_epcs_query(
-        polygon=polygon, area_level=area_level, area_names=area_names
+        polygon=polygon,
+        area_level=area_level,
+        area_names=area_names,
+        snapshot_dates=snapshot.snapshot_dates,
     )
     results = await db.execute(text(query), params)
     mapped_results = [NumberOfInDateAndExpiredEpcs.from_orm(row) for row in results]
@@ -681,12 +794,14 @@ async def get_number_of_in_date_and_expired_epcs(
     "/dashboard/buildings-by-deprivation-dimension",
     response_model=List[BuildingsByDeprivationDimension],
 )
+@dashboard_cache.cached("buildings-by-deprivation-dimension")
 async def get_buildings_by_deprivation_dimension_for_dashboard(
     db: Annotated[AsyncSession, Depends(get_db)],
     polygon: Annotated[Optional[GeoJSONPolygon], Query()] = None,
     area_level: Annotated[Optional[str], Query(pattern=AREA_LEVEL_PATTERN)] = None,
     area_names: Annotated[Optional[List[str]], Query()] = None,
 ):
+    polygon = await polygon_selection_cache.resolve(db, polygon)
     query, params = get_buildings_by_deprivation_dimension_query(
         polygon=polygon, area_level=area_level, area_names=area_names
     )
@@ -700,6 +815,7 @@ async def get_buildings_by_deprivation_dimension_for_dashboard(
     "/dashboard/average-daily-sunlight-hours-by-area-level",
     response_model=List[AverageDailySunlightHoursPerArea],
 )
+@dashboard_cache.cached("average-daily-sunlight-hours-by-area-level")
 async def get_average_daily_sunlight_hours(
     db: Annotated[AsyncSession, Depends(get_db)],
     group_by_level: Annotated[str, Query(..., pattern=AREA_LEVEL_PATTERN)],
@@ -707,6 +823,7 @@ async def get_average_daily_sunlight_hours(
     area_names: Annotated[Optional[List[str]], Query()] = None,
     polygon: Annotated[Optional[GeoJSONPolygon], Query()] = None,
 ):
+    polygon = await polygon_selection_cache.resolve(db, polygon)
     query, params = get_average_daily_sunlight_hours_query(
         group_by_level=group_by_level, area_level=area_level, area_names=area_names, polygon=polygon
     )
@@ -718,9 +835,69 @@ async def get_average_daily_sunlight_hours(
     return mapped_results
 
 
+# Charts that are filtered by a polygon or by area level and names, and can be requested together
+DASHBOARD_BATCH_CHARTS = {
+    "epc-ratings": get_epc_ratings_for_dashboard,
+    "epc-ratings-per-region": get_epc_ratings_per_region_for_dashboard,
+    "building-attributes-percentage-per-region": get_percentage_building_attributes_per_region,
+    "sap-rating-overtime": get_sap_rating_overtime,
+    "epc-ratings-overtime": get_epc_ratings_overtime,
+    "fuel-types-by-building-type": get_fuel_types_by_building_type,
+    "buildings-affected-by-extreme-weather": get_buildings_affected_by_extreme_weather,
+    "no-of-in-date-and-expired-epcs": get_number_of_in_date_and_expired_epcs,
+    "buildings-by-deprivation-dimension": get_buildings_by_deprivation_dimension_for_dashboard,
+}
+
+
+class DashboardBatchRequest(BaseModel):
+    charts: Annotated[List[str], Field(min_length=1)]
+    polygon: Optional[GeoJSONPolygon] = None
+    area_level: Annotated[Optional[str], Field(pattern=AREA_LEVEL_PATTERN)] = None
+    area_names: Optional[List[str]] = None
+
+    @field_validator("charts")
+    @classmethod
+    def validate_charts(cls, charts: List[str]) -> List[str]:
+        unknown = [chart for chart in charts if chart not in DASHBOARD_BATCH_CHARTS]
+        if unknown:
+            raise ValueError(
+                f"Unknown charts {unknown}, expected any of {list(DASHBOARD_BATCH_CHARTS)}"
+            )
+        return list(dict.fromkeys(charts))
+
+
+@router.post(
+    "/dashboard/batch",
+    description="Gets several dashboard charts for the same filter in one request. Each chart is computed concurrently on its own pooled connection and keyed by its name in the response",
+)
+async def get_dashboard_batch(batch: DashboardBatchRequest):
+    # taken once the charts are validated, so an unknown chart is rejected without a database
+    session_maker = get_session_maker()
+    semaphore = asyncio.Semaphore(config_settings.DASHBOARD_BATCH_CONCURRENCY)
+
+    # resolve the polygon to its buildings once, rather than in every chart
+    polygon = batch.polygon
+    if polygon:
+        async with session_maker() as session:
+            polygon = await polygon_selection_cache.resolve(session, polygon)
+
+    async def get_chart(chart: str):
+        async with semaphore, session_maker() as session:
+            return await DASHBOARD_BATCH_CHARTS[chart](
+                db=session,
+                polygon=polygon,
+                area_level=batch.area_level,
+                area_names=batch.area_names,
+            )
+
+    results = await asyncio.gather(*(get_chart(chart) for chart in batch.charts))
+    return dict(zip(batch.charts, results))
+
+
 @router.get(
     "/buildings",
     response_model=List[SimpleBuilding],
+    responses=STREAMING_RESPONSES,
     description="Gets all the buildings inside a bounding box along with their types, TOIDs, UPRNs, and current energy ratings",
 )
 async def get_buildings_in_bounding_box(
@@ -730,22 +907,56 @@ async def get_buildings_in_bounding_box(
     max_lat: float,
     req: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
+    response_format: Annotated[
+        Optional[str], Query(alias="format", pattern=RESPONSE_FORMAT_PATTERN)
+    ] = None,
 ):
+    params = {
+        "min_long": min_long,
+        "max_long": max_long,
+        "min_lat": min_lat,
+        "max_lat": max_lat,
+        "srid": 4326,
+    }
+    response_format = get_response_format(req, response_format)
+    if response_format != "json":
+        return streaming_rows_response(
+            response_format,
+            stream_partitions(text(get_buildings_in_bounding_box_query()), params),
+            map_bounded_building_row,
+            SIMPLE_BUILDING_FIELDS,
+        )
+
     buildings_in_bounding_box_results = await db.execute(
-        text(get_buildings_in_bounding_box_query()),
-        {
-            "min_long": min_long,
-            "max_long": max_long,
-            "min_lat": min_lat,
-            "max_lat": max_lat,
-            "srid": 4326,
-        },
+        text(get_buildings_in_bounding_box_query()), params
+    )
+    return JSONResponse(
+        map_bounded_buildings_response(buildings_in_bounding_box_results)
     )
-    results = [
-        EpcAndOsBuildingSchema.from_orm(result)
-        for result in buildings_in_bounding_box_results
-    ]
-    return map_bounded_buildings_response(results)
+
+
+@router.get(
+    "/buildings/clusters",
+    response_model=List[BuildingCluster],
+    description="Gets the buildings inside a bounding box grouped into grid cells sized for the map zoom level, with the count of current energy ratings and the centroid of each cell",
+)
+async def get_building_clusters_in_bounding_box(
+    min_long: float,
+    max_long: float,
+    min_lat: float,
+    max_lat: float,
+    zoom: Annotated[int, Query(ge=0, le=22)],
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    query, params = get_building_clusters_in_bounding_box_query(
+        min_long=min_long,
+        max_long=max_long,
+        min_lat=min_lat,
+        max_lat=max_lat,
+        zoom=zoom,
+    )
+    results = await db.execute(text(query), params)
+    return [BuildingCluster.from_orm(row) for row in results]
 
 
 @router.get(
@@ -761,11 +972,9 @@ async def get_filter_summary(
     req: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
-    detailed_buildings_in_bounding_box_results = await execute_with_timeout(
-        db,
-        text(get_filterable_buildings_in_bounding_box_query()),
-        timeout_seconds=60,
-        params={
+    filter_summary_results = await db.execute(
+        text(get_filter_summary_in_bounding_box_query()),
+        {
             "min_long": min_long,
             "max_long": max_long,
             "min_lat": min_lat,
@@ -773,17 +982,13 @@ async def get_filter_summary(
             "srid": 4326,
         },
     )
-
-    results = [
-        FilterableBuildingSchema.from_orm(result)
-        for result in detailed_buildings_in_bounding_box_results
-    ]
-    return map_filter_summary_response(results)
+    return map_filter_summary_response(filter_summary_results.one())
 
 
 @router.get(
     "/filterable-buildings",
     response_model=List[FilterableBuilding],
+    responses=STREAMING_RESPONSES,
     description="Gets all the buildings inside a bounding box along with detailed metadata e.g. floor construction, wall insulation, window glazing that can be used for filtering",
 )
 async def get_filterable_buildings_in_bounding_box(
@@ -793,16 +998,30 @@ async def get_filterable_buildings_in_bounding_box(
     max_lat: float,
     req: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
+    response_format: Annotated[
+        Optional[str], Query(alias="format", pattern=RESPONSE_FORMAT_PATTERN)
+    ] = None,
 ):
+    params = {
+        "min_long": min_long,
+        "max_long": max_long,
+        "min_lat": min_lat,
+        "max_lat": max_lat,
+        "srid": 4326,
+    }
+    response_format = get_response_format(req, response_format)
+    if response_format != "json":
+        return streaming_rows_response(
+            response_format,
+            stream_partitions(
+                text(get_filterable_buildings_in_bounding_box_query()), params
+            ),
+            map_filterable_building_row,
+            list(FilterableBuilding.model_fields),
+        )
+
     filterable_buildings_in_bounding_box_results = await db.execute(
-        text(get_filterable_buildings_in_bounding_box_query()),
-        {
-            "min_long": min_long,
-            "max_long": max_long,
-            "min_lat": min_lat,
-            "max_lat": max_lat,
-            "srid": 4326,
-        },
+        text(get_filterable_buildings_in_bounding_box_query()), params
     )
     results = [
         FilterableBuildingSchema.from_orm(result)
@@ -918,35 +1137,39 @@ async def get_building_by_uprn(
     req: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
 ):
-    building_results = run_sparql_query(
-        get_building(uprn), get_forwarding_headers(req.headers)
-    )
-    roof_results = run_sparql_query(
-        get_roof_for_building(uprn), get_forwarding_headers(req.headers)
-    )
-    floor_results = run_sparql_query(
-        get_floor_for_building(uprn), get_forwarding_headers(req.headers)
-    )
-    wall_window_results = run_sparql_query(
-        get_walls_and_windows_for_building(uprn), get_forwarding_headers(req.headers)
-    )
-    fueltype_results = run_sparql_query(
-        get_fueltype_for_building(uprn), get_forwarding_headers(req.headers)
-    )
-    ngd_roof_material_results = run_sparql_query(
-        get_ngd_roof_material_for_building(uprn), get_forwarding_headers(req.headers)
-    )
-    ngd_solar_panel_presence_results = run_sparql_query(
-        get_ngd_solar_panel_presence_for_building(uprn),
-        get_forwarding_headers(req.headers),
-    )
-    ngd_roof_shape_results = run_sparql_query(
-        get_ngd_roof_shape_for_building(uprn), get_forwarding_headers(req.headers)
-    )
-    ngd_roof_aspect_areas_results = run_sparql_query(
-        get_ngd_roof_aspect_areas_for_building(uprn),
-        get_forwarding_headers(req.headers),
-    )
+    forwarding_headers = get_forwarding_headers(req.headers)
+    if config_settings.COMBINED_BUILDING_QUERY:
+        sparql_results = split_building_details_results(
+            await run_sparql_query_async(get_building_details(uprn), forwarding_headers)
+        )
+    else:
+        sparql_results = await asyncio.gather(
+            *(
+                run_sparql_query_async(query, forwarding_headers)
+                for query in (
+                    get_building(uprn),
+                    get_roof_for_building(uprn),
+                    get_floor_for_building(uprn),
+                    get_walls_and_windows_for_building(uprn),
+                    get_fueltype_for_building(uprn),
+                    get_ngd_roof_material_for_building(uprn),
+                    get_ngd_solar_panel_presence_for_building(uprn),
+                    get_ngd_roof_shape_for_building(uprn),
+                    get_ngd_roof_aspect_areas_for_building(uprn),
+                )
+            )
+        )
+    (
+        building_results,
+        roof_results,
+        floor_results,
+        wall_window_results,
+        fueltype_results,
+        ngd_roof_material_results,
+        ngd_solar_panel_presence_results,
+        ngd_roof_shape_results,
+        ngd_roof_aspect_areas_results,
+    ) = sparql_results
 
     # OS NGD Buildings PG fallback
     fallback_required = any(
@@ -1085,69 +1308,120 @@ def post_flag_investigate(request: Request, visited: IesEntity):
 
 @router.get("/data/climate/wind-driven-rain")
 async def get_wind_driven_rain_data(
-    geojson: Annotated[Tuple, Depends(fetch_geojson_for_wind_driven_rain)],
+    request: Request,
+    geojson: Annotated[GeoJsonLayer, Depends(fetch_geojson_for_wind_driven_rain)],
 ):
-    return Response(content=geojson, media_type=APPLICATION_JSON)
+    return geojson_layer_response(request, geojson)
 
 
 @router.get("/data/climate/icing-days")
 async def get_icing_days_data(
-    geojson: Annotated[Tuple, Depends(fetch_geojson_for_icing_days)],
+    request: Request,
+    geojson: Annotated[GeoJsonLayer, Depends(fetch_geojson_for_icing_days)],
 ):
-    return Response(content=geojson, media_type=APPLICATION_JSON)
+    return geojson_layer_response(request, geojson)
 
 
 @router.get("/data/climate/hot-summer-days")
 async def get_hot_summer_days_data(
-    geojson: Annotated[Tuple, Depends(fetch_geojson_for_hot_summer_days)],
+    request: Request,
+    geojson: Annotated[GeoJsonLayer, Depends(fetch_geojson_for_hot_summer_days)],
 ):
-    return Response(content=geojson, media_type=APPLICATION_JSON)
+    return geojson_layer_response(request, geojson)
 
 
 @router.get("/data/climate/sunlight-hours")
 async def get_sunlight_hours_data(
-    geojson: Annotated[Tuple, Depends(fetch_geojson_for_sunlight_hours)],
+    request: Request,
+    geojson: Annotated[GeoJsonLayer, Depends(fetch_geojson_for_sunlight_hours)],
 ):
-    return Response(content=geojson, media_type=APPLICATION_JSON)
+    return geojson_layer_response(request, geojson)
 
 
 @router.get("/data/demographics/deprivation")
 async def get_deprivation_data(
-    geojson: Annotated[Tuple, Depends(fetch_geojson_for_deprivation)],
+    request: Request,
+    geojson: Annotated[GeoJsonLayer, Depends(fetch_geojson_for_deprivation)],
 ):
-    return Response(content=geojson, media_type=APPLICATION_JSON)
+    return geojson_layer_response(request, geojson)
 
 
 @router.get("/data/energy-performance/wards")
 async def get_energy_performance_data_by_wards(
-    geojson: Annotated[Tuple, Depends(fetch_geojson_for_energy_performance_by_wards)],
+    request: Request,
+    geojson: Annotated[GeoJsonLayer, Depends(fetch_geojson_for_energy_performance_by_wards)],
 ):
-    return Response(content=geojson, media_type=APPLICATION_JSON)
+    return geojson_layer_response(request, geojson)
 
 
 @router.get("/data/energy-performance/districts")
 async def get_energy_performance_data_by_districts(
+    request: Request,
     geojson: Annotated[
-        Tuple, Depends(fetch_geojson_for_energy_performance_by_districts)
+        GeoJsonLayer, Depends(fetch_geojson_for_energy_performance_by_districts)
     ],
 ):
-    return Response(content=geojson, media_type=APPLICATION_JSON)
+    return geojson_layer_response(request, geojson)
 
 
 @router.get("/data/energy-performance/counties")
 async def get_energy_performance_data_by_counties(
+    request: Request,
     geojson: Annotated[
-        Tuple, Depends(fetch_geojson_for_energy_performance_by_counties)
+        GeoJsonLayer, Depends(fetch_geojson_for_energy_performance_by_counties)
     ],
 ):
-    return Response(content=geojson, media_type=APPLICATION_JSON)
+    return geojson_layer_response(request, geojson)
 
 
 @router.get("/data/energy-performance/regions")
 async def get_energy_performance_data_by_regions(
-    geojson: Annotated[Tuple, Depends(fetch_geojson_for_energy_performance_by_regions)],
+    request: Request,
+    geojson: Annotated[GeoJsonLayer, Depends(fetch_geojson_for_energy_performance_by_regions)],
+):
+    return geojson_layer_response(request, geojson)
+
+
+@router.get(
+    "/tiles/{layer}/{z}/{x}/{y}.mvt",
+    response_class=Response,
+    responses={
+        200: {"content": {MAPBOX_VECTOR_TILE: {}}},
+        204: {
+            "description": "The tile contains no features, or is of buildings below their minimum zoom"
+        },
+    },
+    description="returns a Mapbox vector tile of building points or ward, district or region boundaries",
+)
+async def get_vector_tile(
+    layer: Annotated[str, Path(pattern=TILE_LAYER_PATTERN)],
+    z: Annotated[int, Path(ge=0, le=22)],
+    x: Annotated[int, Path(ge=0)],
+    y: Annotated[int, Path(ge=0)],
+    db: Annotated[AsyncSession, Depends(get_db)],
 ):
-    return Response(content=geojson, media_type=APPLICATION_JSON)
+    # below the minimum zoom a tile would cover too many buildings to render on request
+    if layer == "buildings" and z < config_settings.BUILDING_TILE_MIN_ZOOM:
+        return Response(status_code=204)
+
+    cache_key = (layer, z, x, y)
+    tile = tile_cache.get(cache_key)
+    if tile is None:
+        try:
+            query, params = get_vector_tile_query(layer, z, x, y)
+        except ValueError as e:
+            raise HTTPException(422, str(e))
+        result = await db.execute(text(query), params)
+        tile = bytes(result.scalar() or b"")
+        tile_cache.set(cache_key, tile)
+
+    if not tile:
+        return Response(status_code=204)
+    return Response(
+        content=tile,
+        media_type=MAPBOX_VECTOR_TILE,
+        headers={"Cache-Control": f"public, max-age={int(config_settings.TILE_CACHE_TTL)}"},
+    )
 
 
 @router.get("/areas/regions", response_model=List[str])
@@ -1398,8 +1672,9 @@ def get_user_details(request: Request):
 @router.get("/signout-links")
 def get_signout_links():
     try:
-        signout_links_response = requests.get(
-            f"{config_settings.IDENTITY_API_URL}/api/v1/links/sign-out"
+        signout_links_response = http_client.get_session().get(
+            f"{config_settings.IDENTITY_API_URL}/api/v1/links/sign-out",
+            timeout=http_client.get_timeout(),
         )
         if signout_links_response.status_code == codes.ok:
             return {
@@ -3,70 +3,50 @@
 # and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
 
 
-from typing import Tuple
-
 from db import get_db
 from fastapi import Depends
-from sqlalchemy import text
+from layer_cache import GeoJsonLayer, geojson_layer_cache
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
 async def fetch_geojson_for_wind_driven_rain(
     db: AsyncSession = Depends(get_db),
-) -> Tuple:
+) -> GeoJsonLayer:
     """Query the database to fetch wind-driven rain data in GeoJSON format.
 
     Keyword arguments:
     db -- an AsyncSession for sql alchemy
     """
-    result = await db.execute(
-        text(
-            "SELECT geojson::text AS geojson FROM iris.wind_driven_rain_projections_geojson;"
-        )
-    )
-    row = result.fetchone()
-    return row[0]
+    return await geojson_layer_cache.get(db, "iris.wind_driven_rain_projections_geojson")
 
 
 async def fetch_geojson_for_icing_days(
     db: AsyncSession = Depends(get_db),
-) -> Tuple:
+) -> GeoJsonLayer:
     """Query the database to fetch icing days data in GeoJSON format.
 
     Keyword arguments:
     db -- an AsyncSession for sql alchemy
     """
-    result = await db.execute(
-        text("SELECT geojson::text AS geojson FROM iris.icing_days_geojson;")
-    )
-    row = result.fetchone()
-    return row[0]
+    return await geojson_layer_cache.get(db, "iris.icing_days_geojson")
 
 
 async def fetch_geojson_for_hot_summer_days(
     db: AsyncSession = Depends(get_db),
-) -> Tuple:
+) -> GeoJsonLayer:
     """Query the database to fetch hot summer days data in GeoJSON format.
 
     Keyword arguments:
     db -- an AsyncSession for sql alchemy
     """
-    result = await db.execute(
-        text("SELECT geojson::text AS geojson FROM iris.hot_summer_days_geojson;")
-    )
-    row = result.fetchone()
-    return row[0]
+    return await geojson_layer_cache.get(db, "iris.hot_summer_days_geojson")
 
 async def fetch_geojson_for_sunlight_hours(
     db: AsyncSession = Depends(get_db),
-) -> Tuple: 
+) -> GeoJsonLayer: 
     """Query the database to fetch sunlight hours data in GeoJSON format. 
 
     Keyword arguments: 
     db -- an AsyncSession for sql alchemy 
     """
-    result = await db.execute(
-        text("SELECT geojson::text AS geojson FROM iris.annual_average_sunlight_hours_geojson;")
-    )
-    row = result.fetchone()
-    return row[0]
\ No newline at end of file
+    return await geojson_layer_cache.get(db, "iris.annual_average_sunlight_hours_geojson")
\ No newline at end of file
@@ -3,9 +3,9 @@
 # and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
 
 
-from sqlalchemy import text
 from db import get_db
 from fastapi import Depends
+from layer_cache import geojson_layer_cache
 from sqlalchemy.ext.asyncio import AsyncSession
 
 async def fetch_geojson_for_energy_performance_by_wards(
@@ -15,9 +15,7 @@ async def fetch_geojson_for_energy_performance_by_wards(
     Keyword arguments:
     db -- an AsyncSession for sql alchemy
     """
-    result = await db.execute(text("SELECT geojson::text AS geojson FROM iris.uk_ward_epc;"))
-    row = result.fetchone()
-    return row[0]
+    return await geojson_layer_cache.get(db, "iris.uk_ward_epc")
 
 async def fetch_geojson_for_energy_performance_by_districts(
     db: AsyncSession = Depends(get_db),):
@@ -26,9 +24,7 @@ async def fetch_geojson_for_energy_performance_by_districts(
     Keyword arguments:
     db -- an AsyncSession for sql alchemy
     """
-    result = await db.execute(text("SELECT geojson::text AS geojson FROM iris.district_borough_unitary_epc;"))
-    row = result.fetchone()
-    return row[0]
+    return await geojson_layer_cache.get(db, "iris.district_borough_unitary_epc")
 
 async def fetch_geojson_for_energy_performance_by_counties(
     db: AsyncSession = Depends(get_db),):
@@ -37,9 +33,7 @@ async def fetch_geojson_for_energy_performance_by_counties(
     Keyword arguments:
     db -- an AsyncSession for sql alchemy
     """
-    result = await db.execute(text("SELECT geojson::text AS geojson FROM iris.boundary_line_ceremonial_counties_epc;"))
-    row = result.fetchone()
-    return row[0]
+    return await geojson_layer_cache.get(db, "iris.boundary_line_ceremonial_counties_epc")
 
 async def fetch_geojson_for_energy_performance_by_regions(
     db: AsyncSession = Depends(get_db),):
@@ -48,7 +42,5 @@ async def fetch_geojson_for_energy_performance_by_regions(
     Keyword arguments:
     db -- an AsyncSession for sql alchemy
     """
-    result = await db.execute(text("SELECT geojson::text AS geojson FROM iris.uk_region_epc;"))
-    row = result.fetchone()
-    return row[0]
+    return await geojson_layer_cache.get(db, "iris.uk_region_epc")
     
\ No newline at end of file
@@ -0,0 +1,88 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Optional
+
+from config import get_settings
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+settings = get_settings()
+
+# Maintained by trigger whenever iris.building_epc_analytics_aggregates changes
+SNAPSHOT_METADATA_QUERY = """
+    SELECT latest_snapshot_date, snapshot_dates
+    FROM iris.building_epc_analytics_metadata
+"""
+
+
+@dataclass(frozen=True)
+class SnapshotMetadata:
+    """
+    The snapshots held in the EPC analytics aggregates.
+
+    Args:
+        latest_snapshot_date (date | None): The most recent snapshot, `None` before the
+            aggregates are first refreshed.
+        snapshot_dates (list[date]): Every snapshot, in order.
+    """
+
+    latest_snapshot_date: Optional[date] = None
+    snapshot_dates: list[date] = field(default_factory=list)
+
+
+class SnapshotMetadataCache:
+    """
+    Holds the snapshot metadata of the EPC analytics aggregates in process, read again once it
+    is older than the check interval, so the dashboard queries can take the snapshot date as a
+    parameter instead of finding it on every request.
+
+    Args:
+        check_interval (float): How long the metadata is trusted before it is read again.
+        enabled (bool): When disabled no metadata is read, and queries look up the snapshots
+            themselves.
+    """
+
+    def __init__(self, check_interval: float = 5.0, enabled: bool = True):
+        self.check_interval = check_interval
+        self.enabled = enabled
+        self._metadata: Optional[SnapshotMetadata] = None
+        self._checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, db: AsyncSession) -> SnapshotMetadata:
+        if not self.enabled:
+            return SnapshotMetadata()
+        if self._recently_checked():
+            return self._metadata
+
+        async with self._lock:
+            if not self._recently_checked():
+                row = (await db.execute(text(SNAPSHOT_METADATA_QUERY))).first()
+                self._metadata = (
+                    SnapshotMetadata(row.latest_snapshot_date, list(row.snapshot_dates))
+                    if row is not None
+                    else SnapshotMetadata()
+                )
+                self._checked_at = time.monotonic()
+        return self._metadata
+
+    def invalidate(self) -> None:
+        self._checked_at = None
+
+    def _recently_checked(self) -> bool:
+        return (
+            self._checked_at is not None
+            and time.monotonic() - self._checked_at < self.check_interval
+        )
+
+
+snapshot_metadata_cache = SnapshotMetadataCache(
+    settings.DASHBOARD_CACHE_CHECK_INTERVAL, settings.SNAPSHOT_METADATA_ENABLED
+)
@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+
+import json
+from typing import AsyncIterator, Callable, Optional, Sequence
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+APPLICATION_JSON = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+RESPONSE_FORMAT_PATTERN = "^(json|ndjson|columnar)$"
+
+STREAMING_RESPONSES = {
+    200: {
+        "content": {
+            NDJSON_MEDIA_TYPE: {},
+        },
+        "description": "With `format=ndjson` or `Accept: application/x-ndjson` one JSON object per line. "
+        "With `format=columnar` a single JSON object holding one array per field.",
+    }
+}
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def get_response_format(request: Request, response_format: Optional[str]) -> str:
+    """
+    Chooses how a list of rows is encoded, preferring an explicit `format` query parameter
+    over the request's Accept header.
+
+    Args:
+        request (Request): The incoming request.
+        response_format (str | None): The requested format: `json`, `ndjson` or `columnar`.
+
+    Returns:
+        str: The format to respond with.
+    """
+    if response_format:
+        return response_format
+    if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+        return "ndjson"
+    return "json"
+
+
+async def encode_ndjson(
+    partitions: AsyncIterator[Sequence], map_row: Callable[[object], dict]
+) -> AsyncIterator[bytes]:
+    """
+    Encodes rows as newline-delimited JSON, one chunk per partition of rows.
+
+    Args:
+        partitions (AsyncIterator[Sequence]): Partitions of rows read from a server-side cursor.
+        map_row (Callable): Maps a row to the fields of one JSON object.
+
+    Yields:
+        bytes: The encoded lines of a partition.
+    """
+    async for partition in partitions:
+        yield b"".join(_dumps(map_row(row)) + b"\n" for row in partition)
+
+
+async def encode_columnar(
+    partitions: AsyncIterator[Sequence],
+    map_row: Callable[[object], dict],
+    fields: Sequence[str],
+) -> AsyncIterator[bytes]:
+    """
+    Encodes rows as a single JSON object holding one array per field. Only the plain column
+    values are held while the rows are read, then each array is written out in turn.
+
+    Args:
+        partitions (AsyncIterator[Sequence]): Partitions of rows read from a server-side cursor.
+        map_row (Callable): Maps a row to the fields of one JSON object.
+        fields (Sequence[str]): The fields to write, in order.
+
+    Yields:
+        bytes: The encoded object, one field at a time.
+    """
+    columns = {field: [] for field in fields}
+    async for partition in partitions:
+        for row in partition:
+            mapped = map_row(row)
+            for field in fields:
+                columns[field].append(mapped.get(field))
+
+    yield b"{"
+    for index, field in enumerate(fields):
+        separator = b"," if index else b""
+        yield separator + _dumps(field) + b":" + _dumps(columns.pop(field))
+    yield b"}"
+
+
+def streaming_rows_response(
+    response_format: str,
+    partitions: AsyncIterator[Sequence],
+    map_row: Callable[[object], dict],
+    fields: Sequence[str],
+) -> StreamingResponse:
+    """
+    Builds a streaming response for rows read from a server-side cursor.
+
+    Args:
+        response_format (str): Either `ndjson` or `columnar`.
+        partitions (AsyncIterator[Sequence]): Partitions of rows read from a server-side cursor.
+        map_row (Callable): Maps a row to the fields of one JSON object.
+        fields (Sequence[str]): The fields of each object, used by the columnar format.
+
+    Returns:
+        StreamingResponse: The encoded rows.
+    """
+    if response_format == "ndjson":
+        return StreamingResponse(
+            encode_ndjson(partitions, map_row), media_type=NDJSON_MEDIA_TYPE
+        )
+    return StreamingResponse(
+        encode_columnar(partitions, map_row, fields), media_type=APPLICATION_JSON
+    )
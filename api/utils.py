@@ -2,6 +2,18 @@
 # © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
 # and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
 
+import hashlib
+import json
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+from config import get_settings
+
+# Kilometres per degree of latitude, and of longitude at the equator
+KM_PER_DEGREE_LATITUDE = 110.574
+KM_PER_DEGREE_LONGITUDE = 111.320
+
 pass_through_headers = [
     "X-Auth-Request-Access-Token",
     "Authorization",
@@ -31,8 +43,6 @@ def validate_geojson_polygon(geojson_str: str) -> str:
     Returns:
         str: The validated GeoJSON string
     """
-    import json
-
     try:
         geojson = json.loads(geojson_str)
     except json.JSONDecodeError as e:
@@ -56,9 +66,86 @@ def validate_geojson_polygon(geojson_str: str) -> str:
     if not isinstance(geojson["coordinates"], list):
         raise ValueError("GeoJSON 'coordinates' must be an array")
 
+    polygons = (
+        [geojson["coordinates"]]
+        if geojson["type"] == "Polygon"
+        else geojson["coordinates"]
+    )
+    try:
+        vertex_count = sum(len(ring) for polygon in polygons for ring in polygon)
+        area_km2 = sum(_polygon_area_km2(polygon) for polygon in polygons)
+    except (TypeError, ValueError, ZeroDivisionError):
+        raise ValueError("GeoJSON 'coordinates' must be arrays of [longitude, latitude] rings")
+
+    settings = get_settings()
+    if settings.POLYGON_MAX_VERTICES and vertex_count > settings.POLYGON_MAX_VERTICES:
+        raise ValueError(
+            f"Polygon has {vertex_count} vertices, the maximum is {settings.POLYGON_MAX_VERTICES}"
+        )
+    if settings.POLYGON_MAX_AREA_KM2 and area_km2 > settings.POLYGON_MAX_AREA_KM2:
+        raise ValueError(
+            f"Polygon covers {area_km2:.0f} km², the maximum is {settings.POLYGON_MAX_AREA_KM2:.0f} km²"
+        )
+
     return geojson_str
 
 
+def _ring_area_km2(ring: list) -> float:
+    # shoelace formula on an equirectangular projection about the ring's mean latitude,
+    # accurate enough at the scale of the limit
+    mean_latitude = sum(float(lat) for _, lat, *_ in ring) / len(ring)
+    x_scale = KM_PER_DEGREE_LONGITUDE * math.cos(math.radians(mean_latitude))
+    points = [(float(lon) * x_scale, float(lat) * KM_PER_DEGREE_LATITUDE) for lon, lat, *_ in ring]
+    return abs(
+        sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]))
+    ) / 2
+
+
+def _polygon_area_km2(polygon: list) -> float:
+    exterior, *holes = polygon
+    return max(_ring_area_km2(exterior) - sum(_ring_area_km2(hole) for hole in holes), 0.0)
+
+
+def polygon_hash(geojson_str: str) -> str:
+    """
+    Hashes a GeoJSON polygon independently of its key order and whitespace, so the same shape
+    drawn on the map always gives the same hash.
+
+    Args:
+        geojson_str: A GeoJSON Polygon or MultiPolygon string
+
+    Returns:
+        str: The hex SHA-256 of the canonical GeoJSON
+    """
+    canonical = json.dumps(json.loads(geojson_str), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class PolygonSelection:
+    """
+    A GeoJSON polygon filter resolved to the UPRNs of the buildings inside it, so queries can
+    select rows by UPRN rather than each repeating the spatial test.
+
+    Args:
+        geojson: The GeoJSON Polygon or MultiPolygon string, made valid and simplified when it
+            was prepared by the database
+        polygon_hash: The `polygon_hash` of the GeoJSON as it was requested
+        uprns: The UPRNs inside the polygon, or None when they were not resolved
+        parts: The GeoJSON of the polygon subdivided into small parts, kept when the UPRNs
+            were not resolved so the spatial filter can probe the index part by part
+    """
+
+    geojson: str
+    polygon_hash: str
+    uprns: Optional[list[str]] = None
+    parts: Optional[list[str]] = None
+
+
+def polygon_geojson(polygon: "str | PolygonSelection") -> str:
+    return polygon.geojson if isinstance(polygon, PolygonSelection) else polygon
+
+
 WELSH_REGIONS = {
     "South Wales East PER",
     "North Wales PER",
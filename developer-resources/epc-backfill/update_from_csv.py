@@ -241,6 +241,12 @@ def main():
             logger.error(f"Failed to process {csv_file}: {e}")
             continue
 
+    logger.info("Refreshing iris.current_epc_assessment")
+    with engine.begin() as conn:
+        conn.execute(
+            text("REFRESH MATERIALIZED VIEW CONCURRENTLY iris.current_epc_assessment;")
+        )
+
     elapsed = (datetime.now() - start_time).total_seconds()
     logger.info("=" * 60)
     logger.info("IMPORT SUMMARY")
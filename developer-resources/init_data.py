@@ -0,0 +1,222 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+"""
+Prepares the database for the API: runs the migrations, then the data loads, once.
+
+Run as a job or init container ahead of the API replicas, which only wait for the schema to
+be at the head revision. A Postgres advisory lock is held for the whole run, so concurrent
+runs wait for each other rather than migrating or loading together. Each load is recorded
+in iris.data_load_state and is not run again once it has completed from the same source.
+A load whose source has changed is forced, replacing the table's contents.
+"""
+
+import logging
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import psycopg2
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "5432")
+DB_NAME = os.getenv("DB_NAME", "iris")
+DB_USERNAME = os.getenv("DB_USERNAME", "postgres")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
+
+LOADED = "loaded"
+FAILED = "failed"
+
+RESOURCES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BOUNDARY_LINE_SOURCE = "https://api.os.uk/downloads/v1/products/BoundaryLine/downloads?area=GB&format=GeoPackage&redirect"
+
+# The environment of each load_gpkg_to_postgis.py run, in the order they are loaded
+LOADS = [
+    {
+        "MATERIALIZED_VIEW": "iris.wind_driven_rain_projections_geojson",
+        "TARGET_TABLE": "wind_driven_rain_projections",
+        "GPKG_SOURCE": "https://services.arcgis.com/Lq3V5RFuTBC9I7kv/arcgis/rest/services/Annual_Index_of_Wind_Driven_Rain_Projections_5km/FeatureServer/replicafilescache/Annual_Index_of_Wind_Driven_Rain_Projections_5km_-6134910210859057092.gpkg",
+        "GPKG_TABLE": "Annual_Index_of_Wind_Driven_Rain___Projections__5km_",
+    },
+    {
+        "MATERIALIZED_VIEW": "iris.icing_days_geojson",
+        "TARGET_TABLE": "annual_count_of_icing_days_1991_2020",
+        "GPKG_SOURCE": "https://services.arcgis.com/Lq3V5RFuTBC9I7kv/arcgis/rest/services/Annual_Count_of_Icing_Days_1991_2020/FeatureServer/replicafilescache/Annual_Count_of_Icing_Days_1991_2020_5977951113111576455.gpkg",
+        "GPKG_TABLE": "annual_count_of_icing_days_1991_2020",
+    },
+    {
+        "MATERIALIZED_VIEW": "iris.hot_summer_days_geojson",
+        "TARGET_TABLE": "annual_count_of_hot_summer_days_projections_12km",
+        "GPKG_SOURCE": "https://services.arcgis.com/Lq3V5RFuTBC9I7kv/arcgis/rest/services/Annual_Count_of_Hot_Days___Projections__12km_grid_/FeatureServer/replicafilescache/Annual_Count_of_Hot_Days___Projections__12km_grid__5151054028377652076.gpkg",
+        "GPKG_TABLE": "annual_count_of_hot_summer_days_projections_12km",
+    },
+    {
+        "JOIN_VIEW": "iris.uk_ward",
+        "DATA_VIEW": "iris.uk_ward_epc_data",
+        "MATERIALIZED_VIEW": "iris.uk_ward_epc",
+        "TARGET_TABLE": "district_borough_unitary_ward",
+        "GPKG_SOURCE": BOUNDARY_LINE_SOURCE,
+        "GPKG_TABLE": "district_borough_unitary_ward",
+    },
+    {
+        "JOIN_VIEW": "iris.uk_ward",
+        "DATA_VIEW": "iris.uk_ward_epc_data",
+        "MATERIALIZED_VIEW": "iris.uk_ward_epc",
+        "TARGET_TABLE": "unitary_electoral_division",
+        "GPKG_SOURCE": BOUNDARY_LINE_SOURCE,
+        "GPKG_TABLE": "unitary_electoral_division",
+    },
+    {
+        "JOIN_VIEW": "iris.uk_region",
+        "DATA_VIEW": "iris.uk_region_epc_data",
+        "MATERIALIZED_VIEW": "iris.uk_region_epc",
+        "TARGET_TABLE": "scotland_and_wales_region",
+        "GPKG_SOURCE": BOUNDARY_LINE_SOURCE,
+        "GPKG_TABLE": "scotland_and_wales_region",
+    },
+    {
+        "JOIN_VIEW": "iris.uk_region",
+        "DATA_VIEW": "iris.uk_region_epc_data",
+        "MATERIALIZED_VIEW": "iris.uk_region_epc",
+        "TARGET_TABLE": "english_region",
+        "GPKG_SOURCE": BOUNDARY_LINE_SOURCE,
+        "GPKG_TABLE": "english_region",
+    },
+    {
+        "DATA_VIEW": "iris.district_borough_unitary_epc_data",
+        "MATERIALIZED_VIEW": "iris.district_borough_unitary_epc",
+        "TARGET_TABLE": "district_borough_unitary",
+        "GPKG_SOURCE": BOUNDARY_LINE_SOURCE,
+        "GPKG_TABLE": "district_borough_unitary",
+    },
+    {
+        "DATA_VIEW": "iris.boundary_line_ceremonial_counties_epc_data",
+        "MATERIALIZED_VIEW": "iris.boundary_line_ceremonial_counties_epc",
+        "TARGET_TABLE": "boundary_line_ceremonial_counties",
+        "GPKG_SOURCE": BOUNDARY_LINE_SOURCE,
+        "GPKG_TABLE": "boundary_line_ceremonial_counties",
+    },
+    {
+        "TARGET_TABLE": "country_region",
+        "GPKG_SOURCE": BOUNDARY_LINE_SOURCE,
+        "GPKG_TABLE": "country_region",
+    },
+]
+
+# Run after the loads on every run, each checking for itself whether there is work to do
+POST_LOAD_SCRIPTS = ["sync_region_fks_dbu.py", "refresh_building_area.py"]
+
+LOCK_QUERY = "SELECT pg_advisory_lock(hashtext('iris.init_data'))"
+UNLOCK_QUERY = "SELECT pg_advisory_unlock(hashtext('iris.init_data'))"
+
+LOAD_STATE_QUERY = "SELECT source, status FROM iris.data_load_state WHERE name = %(name)s"
+
+RECORD_QUERY = """
+    INSERT INTO iris.data_load_state (name, source, status, started_at, duration_seconds, error)
+    VALUES (
+        %(name)s, %(source)s, %(status)s, %(started_at)s, %(duration_seconds)s, %(error)s
+    )
+    ON CONFLICT (name) DO UPDATE SET
+        source = EXCLUDED.source,
+        status = EXCLUDED.status,
+        started_at = EXCLUDED.started_at,
+        duration_seconds = EXCLUDED.duration_seconds,
+        error = EXCLUDED.error,
+        updated_at = now()
+"""
+
+
+def connect():
+    conn = psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USERNAME,
+        password=DB_PASSWORD,
+    )
+    conn.autocommit = True
+    return conn
+
+
+def run_script(script: str, env: dict = None):
+    subprocess.run(
+        [sys.executable, os.path.join(RESOURCES_DIR, script)],
+        env={**os.environ, **(env or {})},
+        check=True,
+    )
+
+
+def migrate():
+    logger.info("Upgrading the schema to the head revision")
+    subprocess.run(["alembic", "upgrade", "head"], check=True)
+
+
+def load(conn, load_env: dict) -> bool:
+    """Run a load unless it has completed from the same source. Returns whether it succeeded."""
+    name = f"iris.{load_env['TARGET_TABLE']}"
+    source = load_env["GPKG_SOURCE"]
+    with conn.cursor() as cur:
+        cur.execute(LOAD_STATE_QUERY, {"name": name})
+        state = cur.fetchone()
+    if state == (source, LOADED):
+        logger.info(f"{name} already loaded from its source, skipping")
+        return True
+
+    # a table loaded from another source is replaced, rather than kept because it has rows
+    env = {**load_env, "FORCE_LOAD": "true" if state and state[0] != source else "false"}
+    started_at = datetime.now(timezone.utc)
+    start = time.monotonic()
+    record = {"name": name, "source": source, "started_at": started_at, "error": None}
+    try:
+        run_script("load_gpkg_to_postgis.py", env)
+        record["status"] = LOADED
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Failed to load {name}: {e}")
+        record.update(status=FAILED, error=str(e))
+    record["duration_seconds"] = time.monotonic() - start
+
+    with conn.cursor() as cur:
+        cur.execute(RECORD_QUERY, record)
+    return record["status"] == LOADED
+
+
+def main():
+    start_time = datetime.now()
+    conn = connect()
+    try:
+        logger.info("Waiting for the init lock")
+        with conn.cursor() as cur:
+            cur.execute(LOCK_QUERY)
+
+        migrate()
+        failed = [
+            load_env["TARGET_TABLE"] for load_env in LOADS if not load(conn, load_env)
+        ]
+        for script in POST_LOAD_SCRIPTS:
+            run_script(script)
+
+        with conn.cursor() as cur:
+            cur.execute(UNLOCK_QUERY)
+    finally:
+        conn.close()
+
+    elapsed = (datetime.now() - start_time).total_seconds()
+    if failed:
+        logger.error(f"Failed to load {', '.join(failed)} in {elapsed:.2f} seconds")
+        sys.exit(1)
+    logger.info(f"Database initialised in {elapsed:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
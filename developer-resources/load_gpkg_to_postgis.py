@@ -11,6 +11,7 @@ import zipfile
 from pathlib import Path
 
 import psycopg2
+from refresh_materialized_views import FAILED, refresh_views
 
 GPKG_SOURCE = os.getenv("GPKG_SOURCE")
 DB_HOST = os.getenv("DB_HOST", "localhost")
@@ -24,6 +25,7 @@ TARGET_TABLE = os.getenv("TARGET_TABLE")
 MATERIALIZED_VIEW = os.getenv("MATERIALIZED_VIEW")
 JOIN_VIEW = os.getenv("JOIN_VIEW")
 DATA_VIEW = os.getenv("DATA_VIEW")
+FORCE_LOAD = os.getenv("FORCE_LOAD", "false").lower() in ("1", "true", "yes")
 GPKG_EXTENSION = ".gpkg"
 
 
@@ -144,31 +146,17 @@ def run_ogr2ogr_table(gpkg_path: Path):
     print("ogr2ogr import complete.")
 
 
-def refresh_materialized_view():
-    if MATERIALIZED_VIEW is not None and MATERIALIZED_VIEW != "":
-        print(f"Refreshing materialized view {MATERIALIZED_VIEW}")
-        run_db_command(f"REFRESH MATERIALIZED VIEW {MATERIALIZED_VIEW};")
-        print("Materialized view refresh complete.")
-    else:
+def refresh_loaded_views():
+    """Refresh the views built on the loaded table, and the views depending on them."""
+    views = [view for view in (JOIN_VIEW, DATA_VIEW, MATERIALIZED_VIEW) if view]
+    if not views:
         print("No materialized view given to refresh.")
-
-
-def refresh_join_view():
-    if JOIN_VIEW is not None and JOIN_VIEW != "":
-        print(f"Refreshing materialized view {JOIN_VIEW}")
-        run_db_command(f"REFRESH MATERIALIZED VIEW {JOIN_VIEW};")
-        print("Materialized view refresh complete.")
-    else:
-        print("No join view given to refresh.")
-
-
-def refresh_data_view():
-    if DATA_VIEW is not None and DATA_VIEW != "":
-        print(f"Refreshing materialized view {DATA_VIEW}")
-        run_db_command(f"REFRESH MATERIALIZED VIEW {DATA_VIEW};")
-        print("Materialized view refresh complete.")
-    else:
-        print("No data view given to refresh.")
+        return
+    results = refresh_views(views)
+    failed = sorted(view for view, result in results.items() if result.status == FAILED)
+    if failed:
+        raise RuntimeError(f"Failed to refresh {', '.join(failed)}")
+    print("Materialized view refresh complete.")
 
 
 def handle_geopackage(tmpdir):
@@ -188,18 +176,16 @@ def handle_zip(tmpdir):
         run_ogr2ogr(gpkg_file)
     else:
         run_ogr2ogr_table(gpkg_file)
-        refresh_join_view()
-        refresh_data_view()
 
 
 def main():
-    if not is_table_populated():
+    if FORCE_LOAD or not is_table_populated():
         with tempfile.TemporaryDirectory() as tmpdir:
             if GPKG_SOURCE.endswith(GPKG_EXTENSION):
                 handle_geopackage(tmpdir)
             else:
                 handle_zip(tmpdir)
-            refresh_materialized_view()
+            refresh_loaded_views()
     else:
         print(
             f"Table {TARGET_SCHEMA}.{TARGET_TABLE} already populated. Skipping data load."
@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+"""
+Brings iris.building_area, each building's county, district, region and ward, up to date.
+
+The areas are only recomputed when a boundary table has been reloaded or changed since the
+last run, against boundaries subdivided into small parts. Otherwise only buildings without
+areas yet are placed. Buildings whose areas change are logged for the incremental
+building_epc_analytics refresh, which then refreshes the materialized views built on it.
+"""
+
+import logging
+import os
+import sys
+from datetime import datetime
+
+import psycopg2
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "5432")
+DB_NAME = os.getenv("DB_NAME", "iris")
+DB_USERNAME = os.getenv("DB_USERNAME", "postgres")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
+FULL_REFRESH = os.getenv("FULL_REFRESH", "false").lower() in ("1", "true", "yes")
+
+BOUNDARY_TABLES = [
+    "iris.boundary_line_ceremonial_counties",
+    "iris.district_borough_unitary",
+    "iris.district_borough_unitary_ward",
+    "iris.unitary_electoral_division",
+    "iris.english_region",
+    "iris.scotland_and_wales_region",
+]
+
+# Changes whenever a boundary table is reloaded, as the load truncates it, or modified
+BOUNDARY_VERSION_QUERY = """
+    SELECT string_agg(
+        c.oid::text || ':' || c.relfilenode::text || ':' ||
+            COALESCE(s.n_tup_ins + s.n_tup_upd + s.n_tup_del, 0)::text,
+        ',' ORDER BY c.oid
+    )
+    FROM unnest(%(tables)s::text[]) AS t(name)
+    JOIN pg_class c ON c.oid = to_regclass(t.name)
+    LEFT JOIN pg_stat_all_tables s ON s.relid = c.oid
+"""
+
+PLACE_MISSING_QUERY = """
+    SELECT iris.refresh_building_area(
+        ARRAY(
+            SELECT b.uprn
+            FROM iris.building b
+            WHERE NOT EXISTS (SELECT 1 FROM iris.building_area ba WHERE ba.uprn = b.uprn)
+        )
+    )
+"""
+
+UPDATE_STATE_QUERY = """
+    UPDATE iris.building_area_refresh_state
+    SET boundary_version = %(boundary_version)s,
+        refreshed_at = now()
+"""
+
+
+def connect():
+    return psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USERNAME,
+        password=DB_PASSWORD,
+    )
+
+
+def full_refresh(conn, boundary_version):
+    logger.info("Recomputing the areas of every building")
+    with conn, conn.cursor() as cur:
+        cur.execute("SELECT iris.refresh_boundary_parts()")
+        logger.info(f"Subdivided the boundaries into {cur.fetchone()[0]:,} parts")
+        cur.execute("SELECT iris.refresh_building_area()")
+        logger.info(f"Updated the areas of {cur.fetchone()[0]:,} buildings")
+        cur.execute(UPDATE_STATE_QUERY, {"boundary_version": boundary_version})
+
+
+def place_missing(conn):
+    with conn, conn.cursor() as cur:
+        cur.execute(PLACE_MISSING_QUERY)
+        rows = cur.fetchone()[0]
+    logger.info(f"Placed {rows:,} new buildings")
+    return rows
+
+
+def main():
+    start_time = datetime.now()
+    conn = connect()
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(BOUNDARY_VERSION_QUERY, {"tables": BOUNDARY_TABLES})
+            boundary_version = cur.fetchone()[0]
+            cur.execute("SELECT boundary_version FROM iris.building_area_refresh_state")
+            refreshed_version = cur.fetchone()[0]
+
+        if FULL_REFRESH or boundary_version != refreshed_version:
+            full_refresh(conn, boundary_version)
+        elif not place_missing(conn):
+            logger.info("Building areas are up to date")
+    finally:
+        conn.close()
+
+    elapsed = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Total time: {elapsed:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+"""
+Brings iris.building_epc_analytics and its aggregates up to date.
+
+Changes to buildings, EPC assessments and structure units are logged by trigger in
+iris.building_epc_analytics_dirty_uprn. Only the rows of those UPRNs, and of UPRNs whose EPC
+has expired since the last run, are recomputed along with the aggregates of their areas.
+A full rebuild is run on the first run, at the start of each year when a new snapshot is
+added, when an EPC earlier than any seen before is loaded, or when FULL_REFRESH is set.
+The materialized views built on the analytics are then refreshed.
+
+Dates are the database's CURRENT_DATE, which the analytics are computed against. A run is
+recorded as of the date it started, so EPCs expiring while it runs are picked up next time.
+"""
+
+import logging
+import os
+import sys
+from datetime import datetime
+
+import psycopg2
+from refresh_materialized_views import refresh_views
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "5432")
+DB_NAME = os.getenv("DB_NAME", "iris")
+DB_USERNAME = os.getenv("DB_USERNAME", "postgres")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
+FULL_REFRESH = os.getenv("FULL_REFRESH", "false").lower() in ("1", "true", "yes")
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "5000"))
+
+# The materialized views built on these tables are refreshed once they are up to date
+ANALYTICS_TABLES = [
+    "iris.building_epc_analytics",
+    "iris.building_epc_analytics_aggregates",
+]
+
+STATE_QUERY = """
+    SELECT
+        refreshed_on,
+        CURRENT_DATE AS today,
+        min_lodgement_date,
+        (SELECT min(lodgement_date) FROM iris.epc_assessment) AS current_min_lodgement_date
+    FROM iris.building_epc_analytics_refresh_state
+"""
+
+MARK_EXPIRED_QUERY = """
+    INSERT INTO iris.building_epc_analytics_dirty_uprn (uprn)
+    SELECT DISTINCT uprn
+    FROM iris.epc_assessment
+    WHERE uprn IS NOT NULL
+      AND expiry_date >= %(refreshed_on)s
+      AND expiry_date < %(today)s
+    ON CONFLICT (uprn) DO NOTHING
+"""
+
+CLAIM_DIRTY_QUERY = """
+    DELETE FROM iris.building_epc_analytics_dirty_uprn
+    WHERE uprn IN (
+        SELECT uprn
+        FROM iris.building_epc_analytics_dirty_uprn
+        ORDER BY uprn
+        LIMIT %(batch_size)s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING uprn
+"""
+
+UPDATE_STATE_QUERY = """
+    UPDATE iris.building_epc_analytics_refresh_state
+    SET refreshed_on = %(today)s,
+        min_lodgement_date = (SELECT min(lodgement_date) FROM iris.epc_assessment),
+        full_refreshed_at = CASE WHEN %(full)s THEN now() ELSE full_refreshed_at END
+"""
+
+
+def connect():
+    return psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USERNAME,
+        password=DB_PASSWORD,
+    )
+
+
+def needs_full_refresh(refreshed_on, today, min_lodgement_date, current_min_lodgement_date):
+    """A full rebuild is needed when every row may have changed, rather than a few UPRNs."""
+    if FULL_REFRESH or refreshed_on is None:
+        return True
+    # a new year adds a snapshot to every building's history
+    if refreshed_on.year != today.year:
+        return True
+    # the snapshot series starts from the earliest lodgement
+    return (
+        current_min_lodgement_date is not None
+        and min_lodgement_date is not None
+        and current_min_lodgement_date < min_lodgement_date
+    )
+
+
+def full_refresh(conn, today):
+    logger.info("Rebuilding iris.building_epc_analytics")
+    with conn, conn.cursor() as cur:
+        # the rebuild covers every logged change
+        cur.execute("TRUNCATE iris.building_epc_analytics_dirty_uprn")
+        cur.execute("SELECT iris.refresh_building_epc_analytics()")
+        rows = cur.fetchone()[0]
+        cur.execute(UPDATE_STATE_QUERY, {"today": today, "full": True})
+    logger.info(f"Rebuilt {rows:,} rows")
+    return rows
+
+
+def incremental_refresh(conn, refreshed_on, today):
+    with conn, conn.cursor() as cur:
+        cur.execute(MARK_EXPIRED_QUERY, {"refreshed_on": refreshed_on, "today": today})
+        logger.info(f"{cur.rowcount:,} UPRNs with EPCs expired since {refreshed_on}")
+
+    uprn_count = 0
+    row_count = 0
+    while True:
+        # each batch is claimed and recomputed in one transaction, so a failed batch stays logged
+        with conn, conn.cursor() as cur:
+            cur.execute(CLAIM_DIRTY_QUERY, {"batch_size": BATCH_SIZE})
+            uprns = [row[0] for row in cur.fetchall()]
+            if not uprns:
+                break
+            cur.execute("SELECT iris.refresh_building_epc_analytics(%s)", (uprns,))
+            row_count += cur.fetchone()[0]
+            uprn_count += len(uprns)
+        logger.info(f"  Refreshed {uprn_count:,} UPRNs, {row_count:,} rows")
+
+    with conn, conn.cursor() as cur:
+        cur.execute(UPDATE_STATE_QUERY, {"today": today, "full": False})
+    logger.info(f"Refreshed {uprn_count:,} UPRNs, {row_count:,} rows")
+    return uprn_count
+
+
+def main():
+    start_time = datetime.now()
+    conn = connect()
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute(STATE_QUERY)
+            refreshed_on, today, min_lodgement_date, current_min_lodgement_date = (
+                cur.fetchone()
+            )
+
+        if needs_full_refresh(
+            refreshed_on, today, min_lodgement_date, current_min_lodgement_date
+        ):
+            changed = full_refresh(conn, today)
+        else:
+            changed = incremental_refresh(conn, refreshed_on, today)
+    finally:
+        conn.close()
+
+    if changed:
+        refresh_views(ANALYTICS_TABLES)
+
+    elapsed = (datetime.now() - start_time).total_seconds()
+    logger.info(f"Total time: {elapsed:.2f} seconds")
+
+
+if __name__ == "__main__":
+    main()
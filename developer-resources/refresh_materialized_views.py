@@ -0,0 +1,332 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+"""
+Refreshes materialized views in dependency order.
+
+The dependencies between materialized views, including through plain views, are read from
+pg_depend. A view is refreshed once every view it reads has been, and independent branches
+are refreshed in parallel on separate connections. Views with a unique index are refreshed
+CONCURRENTLY, so reads of them are not blocked. The duration and row count of each refresh
+are logged and recorded in iris.materialized_view_refresh_log.
+
+VIEWS restricts the run to the given comma-separated views, along with the views depending
+on them unless INCLUDE_DEPENDENTS is false. A table in VIEWS selects the views built on it.
+Otherwise every materialized view in SCHEMAS is refreshed. The exit code is non-zero if any refresh failed.
+"""
+
+import logging
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+import psycopg2
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "5432")
+DB_NAME = os.getenv("DB_NAME", "iris")
+DB_USERNAME = os.getenv("DB_USERNAME", "postgres")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
+SCHEMAS = [
+    schema.strip() for schema in os.getenv("SCHEMAS", "iris").split(",") if schema.strip()
+]
+VIEWS = [view.strip() for view in os.getenv("VIEWS", "").split(",") if view.strip()]
+INCLUDE_DEPENDENTS = os.getenv("INCLUDE_DEPENDENTS", "true").lower() in ("1", "true", "yes")
+CONCURRENTLY = os.getenv("CONCURRENTLY", "true").lower() in ("1", "true", "yes")
+WORKERS = int(os.getenv("WORKERS", "4"))
+
+REFRESHED = "refreshed"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+# CONCURRENTLY needs a unique index on plain columns covering every row
+VIEWS_QUERY = """
+    SELECT
+        format('%%I.%%I', n.nspname, c.relname),
+        c.relispopulated,
+        EXISTS (
+            SELECT 1
+            FROM pg_index i
+            WHERE i.indrelid = c.oid
+              AND i.indisunique
+              AND i.indisvalid
+              AND i.indpred IS NULL
+              AND i.indexprs IS NULL
+        )
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind = 'm'
+"""
+
+# The tables and materialized views each materialized view reads, directly or through plain
+# views
+DEPENDENCIES_QUERY = """
+    WITH RECURSIVE refs AS (
+        SELECT DISTINCT r.ev_class AS view_oid, d.refobjid AS ref_oid
+        FROM pg_rewrite r
+        JOIN pg_depend d ON d.classid = 'pg_rewrite'::regclass AND d.objid = r.oid
+        WHERE d.refclassid = 'pg_class'::regclass AND d.refobjid <> r.ev_class
+    ),
+    reaches AS (
+        SELECT refs.view_oid, refs.ref_oid
+        FROM refs
+        JOIN pg_class m ON m.oid = refs.view_oid AND m.relkind = 'm'
+        UNION
+        SELECT reaches.view_oid, refs.ref_oid
+        FROM reaches
+        JOIN pg_class v ON v.oid = reaches.ref_oid AND v.relkind = 'v'
+        JOIN refs ON refs.view_oid = v.oid
+    )
+    SELECT
+        format('%%I.%%I', vn.nspname, vc.relname),
+        format('%%I.%%I', rn.nspname, rc.relname)
+    FROM reaches
+    JOIN pg_class vc ON vc.oid = reaches.view_oid
+    JOIN pg_namespace vn ON vn.oid = vc.relnamespace
+    JOIN pg_class rc ON rc.oid = reaches.ref_oid AND rc.relkind IN ('m', 'r', 'p')
+    JOIN pg_namespace rn ON rn.oid = rc.relnamespace
+"""
+
+RECORD_QUERY = """
+    INSERT INTO iris.materialized_view_refresh_log (
+        run_id, view_name, status, concurrently, started_at, duration_seconds, row_count, error
+    )
+    VALUES (
+        %(run_id)s, %(view)s, %(status)s, %(concurrently)s, %(started_at)s,
+        %(duration_seconds)s, %(row_count)s, %(error)s
+    )
+"""
+
+
+@dataclass
+class MaterializedView:
+    name: str
+    populated: bool
+    has_unique_index: bool
+
+
+@dataclass
+class RefreshResult:
+    view: str
+    status: str
+    concurrently: bool = False
+    started_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    row_count: Optional[int] = None
+    error: Optional[str] = None
+
+
+def connect():
+    conn = psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USERNAME,
+        password=DB_PASSWORD,
+    )
+    conn.autocommit = True
+    return conn
+
+
+def read_views(conn) -> tuple[dict, dict]:
+    """Returns every materialized view by name, and the relations each one reads."""
+    with conn.cursor() as cur:
+        cur.execute(VIEWS_QUERY)
+        views = {
+            name: MaterializedView(name, populated, unique)
+            for name, populated, unique in cur
+        }
+        cur.execute(DEPENDENCIES_QUERY)
+        dependencies = {name: set() for name in views}
+        for view, dependency in cur:
+            dependencies[view].add(dependency)
+    return views, dependencies
+
+
+def select_views(
+    views: dict,
+    dependencies: dict,
+    requested: Optional[Iterable[str]],
+    include_dependents: bool,
+    schemas: Iterable[str] = SCHEMAS,
+) -> set:
+    """
+    The views to refresh: those requested and the views depending on them, or every view in the
+    schemas. A requested table selects the views built on it.
+    """
+    if not requested:
+        return {name for name in views if name.split(".", 1)[0] in schemas}
+
+    sources = set().union(*dependencies.values())
+    selected = set()
+    for name in requested:
+        name = name.lower()
+        if name not in views and name not in sources:
+            raise ValueError(f"No materialized view is or reads {name}")
+        selected.add(name)
+
+    dependents = {name: set() for name in set(views) | sources}
+    for view, reads in dependencies.items():
+        for dependency in reads:
+            dependents[dependency].add(view)
+
+    # a table always selects the views built on it
+    stack = [name for name in selected if include_dependents or name not in views]
+    while stack:
+        for dependent in dependents[stack.pop()]:
+            if dependent not in selected:
+                selected.add(dependent)
+                if include_dependents:
+                    stack.append(dependent)
+    return selected & set(views)
+
+
+def refresh_view(view: MaterializedView, concurrently: bool) -> RefreshResult:
+    # a view can only be refreshed concurrently once it has been populated
+    concurrently = concurrently and view.has_unique_index and view.populated
+    result = RefreshResult(view.name, REFRESHED, concurrently, datetime.now(timezone.utc))
+    start = time.monotonic()
+    try:
+        conn = connect()
+        try:
+            with conn.cursor() as cur:
+                mode = "CONCURRENTLY " if concurrently else ""
+                cur.execute(f"REFRESH MATERIALIZED VIEW {mode}{view.name}")
+                cur.execute(f"SELECT count(*) FROM {view.name}")
+                result.row_count = cur.fetchone()[0]
+        finally:
+            conn.close()
+    except psycopg2.Error as e:
+        result.status = FAILED
+        result.error = str(e).strip()
+    result.duration_seconds = time.monotonic() - start
+    return result
+
+
+def record(conn, run_id: str, result: RefreshResult) -> None:
+    if result.status == REFRESHED:
+        logger.info(
+            f"Refreshed {result.view}{' concurrently' if result.concurrently else ''} "
+            f"in {result.duration_seconds:.2f} seconds, {result.row_count:,} rows"
+        )
+    elif result.status == FAILED:
+        logger.error(f"Failed to refresh {result.view}: {result.error}")
+    else:
+        logger.warning(f"Skipped {result.view}: {result.error}")
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute(RECORD_QUERY, {"run_id": run_id, **vars(result)})
+    except psycopg2.Error as e:
+        logger.warning(f"Could not record the refresh of {result.view}: {e}")
+
+
+def refresh_views(
+    requested: Optional[Iterable[str]] = None,
+    include_dependents: bool = INCLUDE_DEPENDENTS,
+    concurrently: bool = CONCURRENTLY,
+    workers: int = WORKERS,
+) -> dict:
+    """
+    Refreshes the requested materialized views and their dependents, or every materialized
+    view in SCHEMAS, each as soon as the views it reads have been refreshed.
+
+    Returns:
+        dict: The RefreshResult of each view, by name.
+    """
+    run_id = str(uuid.uuid4())
+    conn = connect()
+    try:
+        views, dependencies = read_views(conn)
+        selected = select_views(views, dependencies, requested, include_dependents)
+        logger.info(f"Refreshing {len(selected)} materialized views with {workers} workers")
+
+        pending = {name: dependencies[name] & selected for name in selected}
+        results = {}
+
+        def settle(result: RefreshResult):
+            results[result.view] = result
+            record(conn, run_id, result)
+
+        def blocked(name: str) -> Optional[str]:
+            failed = sorted(
+                dependency
+                for dependency in pending[name]
+                if dependency in results and results[dependency].status != REFRESHED
+            )
+            if failed:
+                return f"{', '.join(failed)} not refreshed"
+            empty = sorted(
+                dependency
+                for dependency in dependencies[name] - selected
+                if dependency in views and not views[dependency].populated
+            )
+            if empty:
+                return f"{', '.join(empty)} not populated"
+            return None
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            running = {}
+            while pending or running:
+                # a view is skipped if a view it reads could not be refreshed, or is empty
+                skipping = True
+                while skipping:
+                    skipping = False
+                    for name in sorted(pending):
+                        reason = blocked(name)
+                        if reason:
+                            del pending[name]
+                            settle(RefreshResult(name, SKIPPED, error=reason))
+                            skipping = True
+
+                for name in sorted(pending):
+                    if not pending[name] - set(results):
+                        del pending[name]
+                        running[pool.submit(refresh_view, views[name], concurrently)] = name
+
+                if not running:
+                    for name in sorted(pending):
+                        settle(RefreshResult(name, FAILED, error="circular dependency"))
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    settle(future.result())
+    finally:
+        conn.close()
+    return results
+
+
+def main():
+    start_time = datetime.now()
+    results = refresh_views(VIEWS or None)
+
+    elapsed = (datetime.now() - start_time).total_seconds()
+    counts = {
+        status: sum(result.status == status for result in results.values())
+        for status in (REFRESHED, SKIPPED, FAILED)
+    }
+    logger.info(
+        f"Refreshed {counts[REFRESHED]}, skipped {counts[SKIPPED]}, failed {counts[FAILED]} "
+        f"materialized views in {elapsed:.2f} seconds"
+    )
+    if counts[FAILED]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
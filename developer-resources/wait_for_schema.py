@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+"""
+Waits for the database schema to reach the head revision before the API starts.
+
+The migrations and loads are run by init_data.py, so an API replica only checks the version
+recorded by alembic against the head of the migrations it ships with. Exits non-zero if the
+schema is not ready within SCHEMA_WAIT_TIMEOUT seconds.
+"""
+
+import logging
+import os
+import sys
+import time
+
+import psycopg2
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = os.getenv("DB_PORT", "5432")
+DB_NAME = os.getenv("DB_NAME", "iris")
+DB_USERNAME = os.getenv("DB_USERNAME", "postgres")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
+SCHEMA_WAIT_TIMEOUT = float(os.getenv("SCHEMA_WAIT_TIMEOUT", "600"))
+SCHEMA_WAIT_INTERVAL = float(os.getenv("SCHEMA_WAIT_INTERVAL", "5"))
+
+ALEMBIC_CONFIG = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, "alembic.ini"
+)
+
+VERSION_QUERY = """
+    SELECT version_num FROM alembic_version
+"""
+
+
+def head_revisions() -> set:
+    return set(ScriptDirectory.from_config(Config(ALEMBIC_CONFIG)).get_heads())
+
+
+def current_revisions() -> set:
+    conn = psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USERNAME,
+        password=DB_PASSWORD,
+    )
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('alembic_version') IS NOT NULL")
+            if not cur.fetchone()[0]:
+                return set()
+            cur.execute(VERSION_QUERY)
+            return {row[0] for row in cur}
+    finally:
+        conn.close()
+
+
+def main():
+    heads = head_revisions()
+    deadline = time.monotonic() + SCHEMA_WAIT_TIMEOUT
+    while True:
+        try:
+            current = current_revisions()
+        except psycopg2.OperationalError as e:
+            logger.warning(f"Database not reachable: {e}")
+            current = None
+        if current == heads:
+            logger.info(f"Schema is at the head revision {', '.join(sorted(heads))}")
+            return
+        if time.monotonic() >= deadline:
+            logger.error(
+                f"Schema is at {', '.join(sorted(current or [])) or 'no revision'}, "
+                f"not {', '.join(sorted(heads))}, after {SCHEMA_WAIT_TIMEOUT:.0f} seconds"
+            )
+            sys.exit(1)
+        logger.info("Waiting for the schema to be migrated")
+        time.sleep(SCHEMA_WAIT_INTERVAL)
+
+
+if __name__ == "__main__":
+    main()
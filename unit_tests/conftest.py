@@ -10,6 +10,9 @@ os.environ["ENVIRONMENT"] = "TEST"
 os.environ["DB_USERNAME"] = "test"
 os.environ["DB_PASSWORD"] = "test"
 os.environ["DB_HOST"] = "localhost"
+os.environ["DASHBOARD_CACHE_BACKEND"] = "none"
+os.environ["POLYGON_SELECTION_CACHE_SIZE"] = "0"
+os.environ["SNAPSHOT_METADATA_ENABLED"] = "false"
 
 api_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../api"))
 if api_dir not in sys.path:
@@ -126,6 +126,20 @@ def fueltype_query_response(uprn):
     }
 
 
+def building_details_query_response(uprn):
+    epc = {"section": {"type": "literal", "value": "epc"}}
+    for response in (
+        building_query_response(uprn),
+        roof_query_response(uprn),
+        floor_query_response(uprn),
+        wall_window_query_response(uprn),
+    ):
+        epc.update(response["results"]["bindings"][0])
+    fueltype = {"section": {"type": "literal", "value": "fuelType"}}
+    fueltype.update(fueltype_query_response(uprn)["results"]["bindings"][0])
+    return {"results": {"bindings": [epc, fueltype]}}
+
+
 def empty_query_response():
     return {"results": {"bindings": []}}
 
@@ -3,6 +3,8 @@
 # and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
 
 
+from unittest.mock import ANY
+
 import pytest
 import requests
 
@@ -44,8 +46,10 @@ def test_api_successful_response(mocker, connection_string, headers):
             "email": "test.user@example.com",
         }
     }
-    # Patch requests.get in the access module.
-    get_mock = mocker.patch("access.requests.get", return_value=fake_response)
+    # Patch the shared session used by the access module.
+    session = mocker.patch("access.http_client.get_session").return_value
+    get_mock = session.get
+    get_mock.return_value = fake_response
 
     client = AccessClient(connection_string, dev_mode=False)
     result = client.get_user_details(headers)
@@ -58,7 +62,7 @@ def test_api_successful_response(mocker, connection_string, headers):
 
     # Ensure the API was called with the correct URL and headers.
     expected_url = "https://test.com/api/v1/user-details"
-    get_mock.assert_called_with(expected_url, headers=headers)
+    get_mock.assert_called_with(expected_url, headers=headers, timeout=ANY)
 
 
 def test_api_error_response(mocker, connection_string, headers):
@@ -67,8 +71,68 @@ def test_api_error_response(mocker, connection_string, headers):
     fake_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
         "400 Bad Request"
     )
-    mocker.patch("access.requests.get", return_value=fake_response)
+    session = mocker.patch("access.http_client.get_session").return_value
+    session.get.return_value = fake_response
 
     client = AccessClient(connection_string, dev_mode=False)
     with pytest.raises(requests.exceptions.HTTPError):
         client.get_user_details(headers)
+
+
+def _user_details_response(mocker):
+    fake_response = mocker.MagicMock()
+    fake_response.status_code = 200
+    fake_response.json.return_value = {
+        "content": {
+            "displayName": "Test User",
+            "username": "069292e4-3081-704c-68cd-b5e621f48b62",
+            "email": "test.user@example.com",
+        }
+    }
+    return fake_response
+
+
+def test_user_details_are_cached_per_token(mocker, connection_string, headers):
+    session = mocker.patch("access.http_client.get_session").return_value
+    session.get.return_value = _user_details_response(mocker)
+
+    client = AccessClient(connection_string, dev_mode=False)
+    first = client.get_user_details(headers)
+    second = client.get_user_details(headers)
+
+    assert first == second
+    assert session.get.call_count == 1
+    assert client.user_details_cache.hits == 1
+    assert client.user_details_cache.misses == 1
+
+    client.get_user_details({"Authorization": "Bearer another_token"})
+    assert session.get.call_count == 2
+
+
+def test_user_details_cache_expires(mocker, connection_string, headers):
+    session = mocker.patch("access.http_client.get_session").return_value
+    session.get.return_value = _user_details_response(mocker)
+    now = [0.0]
+
+    client = AccessClient(connection_string, dev_mode=False)
+    client.user_details_cache.clock = lambda: now[0]
+    client.get_user_details(headers)
+    now[0] += client.user_details_cache.ttl_seconds + 1
+    client.get_user_details(headers)
+
+    assert session.get.call_count == 2
+
+
+def test_user_details_errors_are_not_cached(mocker, connection_string, headers):
+    fake_response = mocker.MagicMock()
+    fake_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+        "401 Unauthorized"
+    )
+    session = mocker.patch("access.http_client.get_session").return_value
+    session.get.return_value = fake_response
+
+    client = AccessClient(connection_string, dev_mode=False)
+    with pytest.raises(requests.exceptions.HTTPError):
+        client.get_user_details(headers)
+
+    assert len(client.user_details_cache) == 0
@@ -10,6 +10,7 @@ from fastapi.testclient import TestClient
 
 from api.query import (
     get_building,
+    get_building_details,
     get_floor_for_building,
     get_fueltype_for_building,
     get_ngd_roof_aspect_areas_for_building,
@@ -20,7 +21,11 @@ from api.query import (
     get_walls_and_windows_for_building,
 )
 from api.routes import router
-from unit_tests.query_response_mocks import empty_query_response, mock_known_building
+from unit_tests.query_response_mocks import (
+    building_details_query_response,
+    empty_query_response,
+    mock_known_building,
+)
 from unittest.mock import AsyncMock
 import db as db_module
 
@@ -224,9 +229,9 @@ class TestGetFilterableBuildingsInBoundingBox:
 class TestGetBuildingByUprn:
     def test_successful_get_building(self, client, monkeypatch):
         uprn = 10023456789
-        mock_query = MagicMock()
+        mock_query = AsyncMock()
         mock_query.side_effect = mock_known_building
-        monkeypatch.setattr("api.routes.run_sparql_query", mock_query)
+        monkeypatch.setattr("api.routes.run_sparql_query_async", mock_query)
 
         response = client.get(f"/buildings/{uprn}")
 
@@ -257,9 +262,36 @@ class TestGetBuildingByUprn:
         mock_query.assert_any_call(get_ngd_roof_shape_for_building(uprn), ANY)
         mock_query.assert_any_call(get_ngd_roof_aspect_areas_for_building(uprn), ANY)
 
+    def test_successful_get_building_combined_query(self, client, monkeypatch):
+        uprn = 10023456789
+        mock_query = AsyncMock(return_value=building_details_query_response(uprn))
+        monkeypatch.setattr("api.routes.run_sparql_query_async", mock_query)
+        monkeypatch.setattr("api.routes.config_settings.COMBINED_BUILDING_QUERY", True)
+
+        response = client.get(f"/buildings/{uprn}")
+
+        assert response.status_code == 200
+        data = response.json()
+
+        assert data["uprn"] == f"{uprn}"
+        assert data["lodgement_date"] == "2024-03-30"
+        assert data["built_form"] == "SemiDetached"
+        assert data["structure_unit_type"] == "House"
+        assert data["roof_construction"] == "RoofRooms"
+        assert data["roof_insulation_location"] == "InsulatedAssumed"
+        assert data["roof_insulation_thickness"] == "250mm_Insulation"
+        assert data["floor_construction"] == "Suspended"
+        assert data["floor_insulation"] == "NoInsulationInFloor"
+        assert data["wall_construction"] == "CavityWall"
+        assert data["wall_insulation"] == "InsulatedWall"
+        assert data["window_glazing"] == "DoubleGlazingBefore2002"
+        assert data["fueltype"] == "NaturalFuelGas"
+
+        mock_query.assert_called_once_with(get_building_details(uprn), ANY)
+
     def test_building_not_found(self, client, monkeypatch):
-        mock_query = MagicMock(return_value=empty_query_response())
-        monkeypatch.setattr("api.routes.run_sparql_query", mock_query)
+        mock_query = AsyncMock(return_value=empty_query_response())
+        monkeypatch.setattr("api.routes.run_sparql_query_async", mock_query)
         uprn = 99999999999
 
         response = client.get(f"/buildings/{uprn}")
@@ -0,0 +1,39 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+from cache import TTLCache
+
+
+class TestTTLCache:
+    def test_get_returns_default_and_counts_miss(self):
+        cache = TTLCache(max_size=2, ttl_seconds=10)
+        assert cache.get("missing", "default") == "default"
+        assert cache.stats() == {"hits": 0, "misses": 1, "size": 0, "max_size": 2}
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_entries_expire_after_ttl(self):
+        now = [100.0]
+        cache = TTLCache(max_size=2, ttl_seconds=5, clock=lambda: now[0])
+        cache.set("a", 1)
+
+        now[0] += 4
+        assert cache.get("a") == 1
+        now[0] += 2
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_zero_size_disables_caching(self):
+        cache = TTLCache(max_size=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
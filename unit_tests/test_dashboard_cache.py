@@ -0,0 +1,185 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+from typing import Annotated, List, Optional
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi import FastAPI, Query
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from dashboard_cache import (DashboardCache, LocalDashboardCacheBackend,
+                             LocalSharedCacheClient,
+                             SharedDashboardCacheBackend,
+                             create_dashboard_cache_backend, dashboard_cache_key)
+from utils import WELSH_REGIONS, PolygonSelection, polygon_hash
+
+POLYGON = '{"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]]]}'
+
+
+class Count(BaseModel):
+    name: str
+    count: int
+
+
+def version_result(stamp):
+    result = Mock()
+    result.scalar.return_value = stamp
+    return result
+
+
+class TestDashboardCacheKey:
+    def test_area_names_are_expanded_and_sorted(self):
+        wales = dashboard_cache_key(
+            "epc-ratings", "v1", {"area_level": "region", "area_names": ["Wales"]}
+        )
+        regions = dashboard_cache_key(
+            "epc-ratings",
+            "v1",
+            {"area_level": "region", "area_names": sorted(WELSH_REGIONS, reverse=True)},
+        )
+
+        assert wales == regions
+
+    def test_area_names_without_area_level_are_ignored(self):
+        assert dashboard_cache_key(
+            "epc-ratings", "v1", {"area_level": None, "area_names": ["London"]}
+        ) == dashboard_cache_key("epc-ratings", "v1", {})
+
+    def test_polygon_formatting_does_not_change_key(self):
+        reformatted = '{"coordinates": [[[0,0],[1,0],[1,1],[0,0]]], "type": "Polygon"}'
+
+        assert dashboard_cache_key(
+            "epc-ratings", "v1", {"polygon": POLYGON}
+        ) == dashboard_cache_key("epc-ratings", "v1", {"polygon": reformatted})
+
+    def test_resolved_polygon_shares_key_with_its_geojson(self):
+        selection = PolygonSelection(POLYGON, polygon_hash(POLYGON), ["1"])
+
+        assert dashboard_cache_key(
+            "epc-ratings", "v1", {"polygon": selection}
+        ) == dashboard_cache_key("epc-ratings", "v1", {"polygon": POLYGON})
+
+    def test_endpoint_and_data_version_are_part_of_key(self):
+        key = dashboard_cache_key("epc-ratings", "v1", {})
+
+        assert key != dashboard_cache_key("fuel-types-by-building-type", "v1", {})
+        assert key != dashboard_cache_key("epc-ratings", "v2", {})
+
+
+@pytest.fixture(params=["local", "shared"])
+def cache_backend(request):
+    if request.param == "local":
+        return LocalDashboardCacheBackend(max_size=16)
+    return SharedDashboardCacheBackend(LocalSharedCacheClient(), ttl_seconds=60)
+
+
+def make_app(cache, db_session):
+    calls = []
+
+    @cache.cached("counts")
+    async def get_counts(
+        db: Mock,
+        area_level: Annotated[Optional[str], Query()] = None,
+        area_names: Annotated[Optional[List[str]], Query()] = None,
+    ):
+        calls.append((area_level, area_names))
+        return [Count(name=name, count=len(calls)) for name in area_names or ["all"]]
+
+    async def route(
+        area_level: Annotated[Optional[str], Query()] = None,
+        area_names: Annotated[Optional[List[str]], Query()] = None,
+    ):
+        return await get_counts(
+            db=db_session, area_level=area_level, area_names=area_names
+        )
+
+    app = FastAPI()
+    app.add_api_route("/counts", route, response_model=List[Count])
+    return TestClient(app), calls
+
+
+def test_cached_result_is_reused_for_equivalent_filters(cache_backend):
+    db_session = AsyncMock()
+    db_session.execute.return_value = version_result("1:1:0")
+    client, calls = make_app(DashboardCache(cache_backend), db_session)
+
+    first = client.get(
+        "/counts", params={"area_level": "region", "area_names": ["b", "a"]}
+    )
+    second = client.get(
+        "/counts", params={"area_level": "region", "area_names": ["a", "b"]}
+    )
+
+    assert first.json() == second.json()
+    assert len(calls) == 1
+    # the data version is only read once within the check interval
+    assert db_session.execute.call_count == 1
+
+
+def test_data_version_change_invalidates_results(cache_backend):
+    db_session = AsyncMock()
+    db_session.execute.side_effect = [version_result("1:1:0"), version_result("1:2:0")]
+    cache = DashboardCache(cache_backend, check_interval=0)
+    client, calls = make_app(cache, db_session)
+
+    first = client.get("/counts")
+    second = client.get("/counts")
+
+    assert first.json() == [{"name": "all", "count": 1}]
+    assert second.json() == [{"name": "all", "count": 2}]
+    assert len(calls) == 2
+
+
+def test_results_are_not_cached_without_data_version():
+    db_session = AsyncMock()
+    db_session.execute.return_value = version_result(None)
+    client, calls = make_app(
+        DashboardCache(LocalDashboardCacheBackend(max_size=16), check_interval=0),
+        db_session,
+    )
+
+    client.get("/counts")
+    client.get("/counts")
+
+    assert len(calls) == 2
+
+
+def test_disabled_cache_calls_through():
+    db_session = AsyncMock()
+    client, calls = make_app(DashboardCache(None), db_session)
+
+    client.get("/counts")
+    client.get("/counts")
+
+    assert len(calls) == 2
+    db_session.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_shared_backend_expires_and_clears_entries():
+    now = [0.0]
+    client = LocalSharedCacheClient(clock=lambda: now[0])
+    backend = SharedDashboardCacheBackend(client, ttl_seconds=10)
+
+    await backend.set("a", [{"count": 1}])
+    await backend.set("b", [])
+    assert await backend.get("a") == [{"count": 1}]
+    assert await backend.get("b") == []
+
+    now[0] = 11.0
+    assert await backend.get("a") is None
+
+    await backend.set("c", [])
+    await backend.clear()
+    assert await backend.get("c") is None
+
+
+def test_redis_backend_without_redis_fails_at_creation():
+    with patch("dashboard_cache.redis_asyncio", None), patch(
+        "dashboard_cache.settings.DASHBOARD_CACHE_BACKEND", "redis"
+    ):
+        with pytest.raises(RuntimeError, match="redis package is not installed"):
+            create_dashboard_cache_backend()
@@ -3,10 +3,11 @@
 # and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
 
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from db import execute_with_timeout
+from db import (QueryTimeoutError, execute_with_timeout, raise_query_timeouts,
+                reset_pools_after_fork, stream_partitions)
 
 
 @pytest.mark.asyncio
@@ -68,3 +69,91 @@ async def test_execute_with_timeout_does_not_reset_on_error():
 
     # Verify reset was NOT attempted after error (only 2 calls, not 3)
     assert mock_session.execute.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_partitions_reads_through_server_side_cursor():
+    """Test that stream_partitions streams with yield_per on a session of its own"""
+
+    async def partitions():
+        yield [("1",), ("2",)]
+        yield [("3",)]
+
+    mock_result = MagicMock()
+    mock_result.partitions.return_value = partitions()
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_session.stream.return_value = mock_result
+    session_maker = MagicMock()
+    session_maker.return_value.__aenter__.return_value = mock_session
+
+    query = text("SELECT uprn FROM iris.building")
+    with patch("db.async_session_maker", session_maker):
+        streamed = [
+            partition
+            async for partition in stream_partitions(query, {"srid": 4326}, 2)
+        ]
+
+    assert streamed == [[("1",), ("2",)], [("3",)]]
+    mock_session.stream.assert_awaited_once_with(
+        query, {"srid": 4326}, execution_options={"yield_per": 2}
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_partitions_reads_without_cursor_behind_pgbouncer():
+    """Test that stream_partitions partitions buffered rows when server-side cursors are off"""
+    mock_result = MagicMock()
+    mock_result.partitions.return_value = iter([[("1",), ("2",)], [("3",)]])
+    mock_session = AsyncMock(spec=AsyncSession)
+    mock_session.execute.return_value = mock_result
+    session_maker = MagicMock()
+    session_maker.return_value.__aenter__.return_value = mock_session
+
+    query = text("SELECT uprn FROM iris.building")
+    with patch("db.async_session_maker", session_maker), patch(
+        "db.settings.DB_PGBOUNCER", True
+    ):
+        streamed = [
+            partition
+            async for partition in stream_partitions(query, {"srid": 4326}, 2)
+        ]
+
+    assert streamed == [[("1",), ("2",)], [("3",)]]
+    mock_session.stream.assert_not_called()
+    mock_result.partitions.assert_called_once_with(2)
+
+
+def test_reset_pools_after_fork_replaces_inherited_pools():
+    """Test that a forked worker drops the pooled connections of its parent without closing them"""
+    inherited_engine = MagicMock()
+
+    with patch("db.get_engines", return_value={29: inherited_engine}), patch(
+        "db.engine_pid", -1
+    ):
+        reset_pools_after_fork()
+        reset_pools_after_fork()
+
+    inherited_engine.sync_engine.dispose.assert_called_once_with(close=False)
+
+
+def test_reset_pools_after_fork_keeps_pools_of_the_same_process():
+    inherited_engine = MagicMock()
+
+    with patch("db.get_engines", return_value={29: inherited_engine}):
+        reset_pools_after_fork()
+
+    inherited_engine.sync_engine.dispose.assert_not_called()
+
+
+def test_asyncpg_command_timeouts_are_raised_as_query_timeouts():
+    """Test that a timeout raised by the driver during a statement becomes a QueryTimeoutError"""
+    exception_context = MagicMock(original_exception=TimeoutError())
+
+    with pytest.raises(QueryTimeoutError):
+        raise_query_timeouts(exception_context)
+
+
+def test_other_query_errors_are_left_to_sqlalchemy():
+    exception_context = MagicMock(original_exception=ValueError("bad parameter"))
+
+    assert raise_query_timeouts(exception_context) is None
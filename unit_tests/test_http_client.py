@@ -0,0 +1,96 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import http_client
+
+
+@pytest.fixture(autouse=True)
+def reset_clients():
+    http_client.session = None
+    http_client.async_client = None
+    yield
+    http_client.session = None
+    http_client.async_client = None
+
+
+def test_get_session_is_shared_and_pooled():
+    session = http_client.get_session()
+
+    assert http_client.get_session() is session
+    adapter = session.get_adapter("http://jena:3030/knowledge/query")
+    assert adapter._pool_maxsize == http_client.settings.HTTP_MAX_CONNECTIONS_PER_HOST
+    assert adapter.max_retries.total == http_client.settings.HTTP_MAX_RETRIES
+    assert "POST" not in adapter.max_retries.allowed_methods
+
+
+def test_async_client_transport_does_not_retry_on_its_own():
+    client = http_client.get_async_client()
+
+    # get_with_retry is the only retry layer for non-blocking calls
+    assert client._transport._pool._retries == 0
+
+
+@pytest.mark.asyncio
+async def test_get_with_retry_retries_unavailable_responses():
+    request = httpx.Request("GET", "http://jena")
+    client = MagicMock()
+    client.get = AsyncMock(
+        side_effect=[
+            httpx.Response(503, request=request),
+            httpx.Response(200, request=request),
+        ]
+    )
+    http_client.async_client = client
+
+    with patch("http_client.settings.HTTP_RETRY_BACKOFF", 0):
+        response = await http_client.get_with_retry("http://jena")
+
+    assert response.status_code == 200
+    assert client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_with_retry_raises_after_last_attempt():
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=httpx.ReadTimeout("timed out"))
+    http_client.async_client = client
+
+    with patch("http_client.settings.HTTP_RETRY_BACKOFF", 0), patch(
+        "http_client.settings.HTTP_MAX_RETRIES", 1
+    ):
+        with pytest.raises(httpx.ReadTimeout):
+            await http_client.get_with_retry("http://jena")
+
+    assert client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_close_clients_releases_connections():
+    await http_client.open_clients()
+    async_client = http_client.async_client
+
+    await http_client.close_clients()
+
+    assert async_client.is_closed
+    assert http_client.session is None
+    assert http_client.async_client is None
+
+
+@pytest.mark.asyncio
+async def test_get_with_retry_attempts_failed_connections_once_per_retry():
+    client = MagicMock()
+    client.get = AsyncMock(side_effect=httpx.ConnectError("refused"))
+    http_client.async_client = client
+
+    with patch("http_client.settings.HTTP_RETRY_BACKOFF", 0), patch(
+        "http_client.settings.HTTP_MAX_RETRIES", 2
+    ):
+        with pytest.raises(httpx.ConnectError):
+            await http_client.get_with_retry("http://jena")
+
+    assert client.get.call_count == 3
@@ -0,0 +1,97 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+import gzip
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from starlette.requests import Request
+
+from layer_cache import GeoJsonLayer, GeoJsonLayerCache, geojson_layer_response
+
+GEOJSON = '{"type":"FeatureCollection","features":[]}'
+
+
+def _request(headers: dict) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [
+                (name.lower().encode(), value.encode()) for name, value in headers.items()
+            ],
+        }
+    )
+
+
+def _db(versions: list, geojson: str = GEOJSON) -> AsyncMock:
+    version_result = MagicMock()
+    version_result.scalar.side_effect = versions
+    geojson_result = MagicMock()
+    geojson_result.fetchone.return_value = (geojson,)
+
+    db = AsyncMock()
+
+    async def execute(query, params=None):
+        return version_result if params else geojson_result
+
+    db.execute.side_effect = execute
+    return db
+
+
+@pytest.mark.asyncio
+async def test_layer_is_reread_only_after_view_refresh():
+    cache = GeoJsonLayerCache()
+    db = _db(["1:100:0", "1:100:0", "1:200:0"])
+
+    with patch("layer_cache.settings.GEOJSON_CACHE_CHECK_INTERVAL", 0):
+        first = await cache.get(db, "iris.uk_ward_epc")
+        second = await cache.get(db, "iris.uk_ward_epc")
+        third = await cache.get(db, "iris.uk_ward_epc")
+
+    assert first is second
+    assert third is not first
+    # three version checks and two reads of the view
+    assert db.execute.call_count == 5
+
+
+@pytest.mark.asyncio
+async def test_version_is_not_rechecked_within_interval():
+    cache = GeoJsonLayerCache()
+    db = _db(["1:100:0"])
+
+    with patch("layer_cache.settings.GEOJSON_CACHE_CHECK_INTERVAL", 60):
+        await cache.get(db, "iris.uk_ward_epc")
+        await cache.get(db, "iris.uk_ward_epc")
+
+    assert db.execute.call_count == 2
+
+
+def test_response_is_gzip_encoded_when_accepted():
+    layer = GeoJsonLayer.from_text(GEOJSON)
+
+    response = geojson_layer_response(_request({"Accept-Encoding": "gzip, deflate"}), layer)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == layer.etag
+    assert gzip.decompress(response.body) == GEOJSON.encode()
+
+
+def test_response_is_uncompressed_when_no_encoding_accepted():
+    layer = GeoJsonLayer.from_text(GEOJSON)
+
+    response = geojson_layer_response(_request({}), layer)
+
+    assert "content-encoding" not in response.headers
+    assert response.body == GEOJSON.encode()
+
+
+def test_matching_etag_returns_not_modified():
+    layer = GeoJsonLayer.from_text(GEOJSON)
+
+    response = geojson_layer_response(
+        _request({"If-None-Match": f'"stale", W/{layer.etag}'}), layer
+    )
+
+    assert response.status_code == 304
+    assert response.body == b""
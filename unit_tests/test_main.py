@@ -12,10 +12,11 @@ from fastapi import APIRouter, Depends, FastAPI, status
 from fastapi.testclient import TestClient
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import db as db_module
-from main import app, query_timeout_handler
+from main import (app, command_timeout_handler, create_app, query_timeout_handler,
+                  read_description, run)
 
 
 class MockRequest:
@@ -35,6 +36,20 @@ def test_query_timeout_handler_returns_504_for_query_canceled():
     assert response.body == b'{"detail":"The request took too long to complete.","error":"QueryCanceledError"}'
 
 
+def test_command_timeout_handler_returns_504():
+    response = asyncio.run(
+        command_timeout_handler(MockRequest(), db_module.QueryTimeoutError())
+    )
+
+    assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+    assert json.loads(response.body)["error"] == "QueryCanceledError"
+
+
+def test_command_timeout_handler_is_only_registered_for_query_timeouts():
+    assert app.exception_handlers[db_module.QueryTimeoutError] == command_timeout_handler
+    assert TimeoutError not in app.exception_handlers
+
+
 def test_query_timeout_handler_returns_json_error_response():
     original_db_error = MagicMock()
     original_db_error.sqlstate = asyncpg.exceptions.QueryCanceledError.sqlstate
@@ -121,3 +136,32 @@ def test_query_timeout_integration():
     data = response.json()
     assert data["error"] == "QueryCanceledError"
     assert "took too long" in data["detail"]
+
+
+def test_run_serves_several_workers_from_the_import_string():
+    with patch("main.config_settings.WORKERS", 4), patch("main.uvicorn.run") as uvicorn_run:
+        run()
+
+    args, kwargs = uvicorn_run.call_args
+    assert args == ("main:app",)
+    assert kwargs["workers"] == 4
+
+
+def test_run_serves_a_single_worker_from_the_app():
+    with patch("main.config_settings.WORKERS", 1), patch("main.uvicorn.run") as uvicorn_run:
+        run()
+
+    assert uvicorn_run.call_args[0] == (app,)
+
+
+def test_openapi_description_is_read_from_the_readme_on_first_request():
+    app = create_app()
+
+    assert app.description == ""
+    assert app.openapi()["info"]["description"] == read_description()
+
+
+def test_read_description_without_readme(monkeypatch):
+    monkeypatch.setattr("main.README_PATH", "/nonexistent/README.md")
+
+    assert read_description() == ""
@@ -0,0 +1,125 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from polygon_selection import PolygonSelectionCache
+from query import get_count_of_epc_rating_query
+from utils import PolygonSelection, polygon_hash
+
+POLYGON = '{"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]]]}'
+PREPARED = '{"type":"Polygon","coordinates":[[[0,0],[1,0],[1,1],[0,0]]]}'
+PARTS = [
+    '{"type":"Polygon","coordinates":[[[0,0],[1,0],[0.5,0.5],[0,0]]]}',
+    '{"type":"Polygon","coordinates":[[[1,0],[1,1],[0.5,0.5],[1,0]]]}',
+]
+
+
+def uprn_session(uprns):
+    db_session = AsyncMock()
+    db_session.execute.return_value.one = Mock(
+        return_value=Mock(geojson=PREPARED, parts=PARTS, uprns=uprns)
+    )
+    return db_session
+
+
+@pytest.mark.asyncio
+async def test_polygon_is_resolved_once_to_its_uprns():
+    db_session = uprn_session(["1", "2"])
+    cache = PolygonSelectionCache(max_size=4, max_uprns=10)
+
+    first = await cache.resolve(db_session, POLYGON)
+    second = await cache.resolve(db_session, POLYGON)
+
+    assert first is second
+    assert first.uprns == ["1", "2"]
+    assert first.parts is None
+    assert first.geojson == PREPARED
+    assert first.polygon_hash == polygon_hash(POLYGON)
+    db_session.execute.assert_called_once()
+    assert db_session.execute.call_args.args[1]["limit"] == 11
+
+
+@pytest.mark.asyncio
+async def test_large_polygon_is_left_to_spatial_filtering():
+    db_session = uprn_session(["1", "2", "3"])
+    cache = PolygonSelectionCache(max_size=4, max_uprns=2)
+
+    selection = await cache.resolve(db_session, POLYGON)
+
+    assert selection.uprns is None
+    assert selection.parts == PARTS
+    assert selection.geojson == PREPARED
+
+
+@pytest.mark.asyncio
+async def test_polygon_is_prepared_on_every_request_without_cache():
+    db_session = uprn_session(["1"])
+    cache = PolygonSelectionCache(max_size=0, max_uprns=10)
+
+    first = await cache.resolve(db_session, POLYGON)
+    second = await cache.resolve(db_session, POLYGON)
+
+    assert first.uprns == second.uprns == ["1"]
+    assert db_session.execute.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_resolved_selection_and_none_pass_through():
+    db_session = uprn_session([])
+    cache = PolygonSelectionCache(max_size=4, max_uprns=10)
+    selection = PolygonSelection(POLYGON, polygon_hash(POLYGON), ["1"])
+
+    assert await cache.resolve(db_session, selection) is selection
+    assert await cache.resolve(db_session, None) is None
+    db_session.execute.assert_not_called()
+
+
+def test_resolved_selection_filters_by_uprn():
+    selection = PolygonSelection(POLYGON, polygon_hash(POLYGON), ["1", "2"])
+
+    query, params = get_count_of_epc_rating_query(polygon=selection)
+
+    assert "uprn = ANY(:polygon_uprns)" in query
+    assert "ST_Within" not in query
+    assert params["polygon_uprns"] == ["1", "2"]
+
+
+def test_large_polygon_filters_against_its_parts():
+    """Test that a polygon with too many buildings to resolve is filtered part by part"""
+    selection = PolygonSelection(POLYGON, polygon_hash(POLYGON), parts=PARTS)
+
+    query, params = get_count_of_epc_rating_query(polygon=selection)
+
+    assert "ST_Intersects(polygon_part.geom, point)" in query
+    assert "ST_Within" not in query
+    assert "polygon_uprns" not in params
+    assert params["polygon_parts"] == PARTS
+
+
+def test_unresolved_selection_filters_spatially():
+    selection = PolygonSelection(POLYGON, polygon_hash(POLYGON))
+
+    query, params = get_count_of_epc_rating_query(polygon=selection)
+
+    assert "ST_Within(point, ST_GeomFromGeoJSON(:polygon))" in query
+    assert params["polygon"] == POLYGON
+
+
+@pytest.mark.asyncio
+async def test_polygon_is_resolved_again_for_a_new_data_version():
+    db_session = uprn_session(["1"])
+    data_version = AsyncMock(side_effect=["v1", "v1", "v2"])
+    cache = PolygonSelectionCache(max_size=4, max_uprns=10, data_version=data_version)
+
+    first = await cache.resolve(db_session, POLYGON)
+    second = await cache.resolve(db_session, POLYGON)
+    third = await cache.resolve(db_session, POLYGON)
+
+    assert first is second
+    assert third is not first
+    assert third.polygon_hash == polygon_hash(POLYGON)
+    assert db_session.execute.call_count == 2
@@ -0,0 +1,34 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+from pool_metrics import PoolMetrics
+
+
+def test_pool_metrics_records_waits_and_checkouts():
+    metrics = PoolMetrics()
+
+    metrics.record_wait(0.5)
+    metrics.record_wait(2.0, timed_out=True)
+    metrics.record_checkout()
+    metrics.record_checkin(0.25)
+
+    assert metrics.snapshot() == {
+        "checkouts": 1,
+        "wait_timeouts": 1,
+        "wait_seconds_total": 2.5,
+        "wait_seconds_max": 2.0,
+        "checkout_seconds_total": 0.25,
+        "checkout_seconds_max": 0.25,
+    }
+
+
+def test_pool_metrics_reset():
+    metrics = PoolMetrics()
+    metrics.record_checkout()
+    metrics.record_wait(1.0)
+
+    metrics.reset()
+
+    assert metrics.snapshot()["checkouts"] == 0
+    assert metrics.snapshot()["wait_seconds_max"] == 0.0
@@ -0,0 +1,84 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+import os
+import sys
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+resources_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../developer-resources")
+)
+if resources_dir not in sys.path:
+    sys.path.insert(0, resources_dir)
+
+import refresh_building_epc_analytics as refresh  # noqa: E402
+
+
+def mock_connection(cursor):
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cursor
+    return conn
+
+
+def executed(cursor, query):
+    return [call.args[1] for call in cursor.execute.call_args_list if call.args[0] == query]
+
+
+def test_needs_full_refresh_at_a_new_year():
+    """Test that a run in a new year rebuilds every row, as a snapshot is added to each"""
+    assert refresh.needs_full_refresh(
+        date(2025, 12, 31), date(2026, 1, 1), date(2010, 1, 1), date(2010, 1, 1)
+    )
+
+
+def test_needs_no_full_refresh_within_the_year():
+    """Test that a run later in the same year only recomputes the changed UPRNs"""
+    assert not refresh.needs_full_refresh(
+        date(2026, 3, 1), date(2026, 10, 18), date(2010, 1, 1), date(2010, 1, 1)
+    )
+
+
+def test_incremental_refresh_marks_epcs_expired_since_the_last_run():
+    """Test that the UPRNs of EPCs expired since the last run are recomputed, and that the
+    run is recorded as of the date it started, so expiries while it runs are not missed
+    """
+    cursor = MagicMock()
+    cursor.rowcount = 2
+    cursor.fetchall.side_effect = [[("1",), ("2",)], []]
+    cursor.fetchone.return_value = (2,)
+
+    refresh.incremental_refresh(
+        mock_connection(cursor), date(2026, 10, 1), date(2026, 10, 18)
+    )
+
+    assert executed(cursor, refresh.MARK_EXPIRED_QUERY) == [
+        {"refreshed_on": date(2026, 10, 1), "today": date(2026, 10, 18)}
+    ]
+    assert executed(cursor, "SELECT iris.refresh_building_epc_analytics(%s)") == [
+        (["1", "2"],)
+    ]
+    assert executed(cursor, refresh.UPDATE_STATE_QUERY) == [
+        {"today": date(2026, 10, 18), "full": False}
+    ]
+
+
+def test_main_rebuilds_at_a_new_year():
+    """Test that a run in a new year, by the database's date, takes the full rebuild"""
+    cursor = MagicMock()
+    cursor.fetchone.side_effect = [
+        (date(2025, 12, 31), date(2026, 1, 1), date(2010, 1, 1), date(2010, 1, 1)),
+        (10,),
+    ]
+
+    with patch.object(
+        refresh, "connect", return_value=mock_connection(cursor)
+    ), patch.object(refresh, "refresh_views") as refresh_views:
+        refresh.main()
+
+    assert executed(cursor, refresh.MARK_EXPIRED_QUERY) == []
+    assert executed(cursor, refresh.UPDATE_STATE_QUERY) == [
+        {"today": date(2026, 1, 1), "full": True}
+    ]
+    refresh_views.assert_called_once_with(refresh.ANALYTICS_TABLES)
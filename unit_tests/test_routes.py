@@ -2,10 +2,13 @@
 # © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
 # and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
 
+import asyncio
 import datetime
+import json
 from unittest.mock import AsyncMock, Mock
 
 import db as db_module
+import httpx
 import pytest
 from fastapi import FastAPI, HTTPException
 from fastapi.testclient import TestClient
@@ -132,10 +135,11 @@ def test_run_sparql_query_success(monkeypatch):
         def raise_for_status(self):
             pass
 
-    def dummy_get(url, params, headers):
-        return DummyResponse({"results": {"bindings": []}})
+    class DummySession:
+        def get(self, url, params, headers, timeout):
+            return DummyResponse({"results": {"bindings": []}})
 
-    monkeypatch.setattr(routes.requests, "get", dummy_get)
+    monkeypatch.setattr(routes.http_client, "get_session", DummySession)
     result = routes.run_sparql_query("query", {"header": "value"})
     assert result == {"results": {"bindings": []}}
 
@@ -147,31 +151,56 @@ def test_run_sparql_query_error(monkeypatch):
             self.reason = "error"
 
         def raise_for_status(self):
-            raise routes.requests.exceptions.HTTPError(response=self)
+            raise routes.exceptions.HTTPError(response=self)
 
-    def dummy_get(url, params, headers):
-        return DummyResponse(404)
+    class DummySession:
+        def get(self, url, params, headers, timeout):
+            return DummyResponse(404)
 
-    monkeypatch.setattr(routes.requests, "get", dummy_get)
+    monkeypatch.setattr(routes.http_client, "get_session", DummySession)
     with pytest.raises(HTTPException) as excinfo:
         routes.run_sparql_query("query", {"header": "value"})
     assert excinfo.value.status_code == 404
 
 
+def test_run_sparql_query_async_success(monkeypatch):
+    async def dummy_get(url, params, headers):
+        return httpx.Response(
+            200,
+            json={"results": {"bindings": []}},
+            request=httpx.Request("GET", url),
+        )
+
+    monkeypatch.setattr(routes.http_client, "get_with_retry", dummy_get)
+    result = asyncio.run(routes.run_sparql_query_async("query", {"header": "value"}))
+    assert result == {"results": {"bindings": []}}
+
+
+def test_run_sparql_query_async_error(monkeypatch):
+    async def dummy_get(url, params, headers):
+        return httpx.Response(404, request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(routes.http_client, "get_with_retry", dummy_get)
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(routes.run_sparql_query_async("query", {"header": "value"}))
+    assert excinfo.value.status_code == 404
+
+
 def test_run_sparql_update_scg(monkeypatch):
     # Set update_mode to "SCG" to use that branch.
     config_settings = get_settings()
     config_settings.UPDATE_MODE = "SCG"
     routes.config_settings = config_settings
 
-    def dummy_post(url, headers, data):
-        class DummyResponse:
-            def raise_for_status(self):
-                pass
+    class DummySession:
+        def post(self, url, headers, data, timeout):
+            class DummyResponse:
+                def raise_for_status(self):
+                    pass
 
-        return DummyResponse()
+            return DummyResponse()
 
-    monkeypatch.setattr(routes.requests, "post", dummy_post)
+    monkeypatch.setattr(routes.http_client, "get_session", DummySession)
     routes.run_sparql_update("query", {"fwd": "header"}, None)
 
 
@@ -263,7 +292,7 @@ def test_get_deprivation_data_returns_geojson(test_app):
     expected_geojson = '{"type":"FeatureCollection","features":[]}'
 
     async def override_fetch_geojson_for_deprivation():
-        return expected_geojson
+        return routes.GeoJsonLayer.from_text(expected_geojson)
 
     client, _ = test_app
 
@@ -280,7 +309,7 @@ def test_get_sunlight_hours_data_returns_geojson(test_app):
     expected_geojson = '{"type":"FeatureCollection","features":[]}'
 
     async def override_fetch_geojson_for_sunlight_hours():
-        return expected_geojson
+        return routes.GeoJsonLayer.from_text(expected_geojson)
 
     client, _ = test_app
 
@@ -293,6 +322,29 @@ def test_get_sunlight_hours_data_returns_geojson(test_app):
     assert response.json() == {"type": "FeatureCollection", "features": []}
 
 
+def test_get_geojson_layer_not_modified(test_app):
+    layer = routes.GeoJsonLayer.from_text('{"type":"FeatureCollection","features":[]}')
+
+    async def override_fetch_geojson_for_energy_performance_by_wards():
+        return layer
+
+    client, _ = test_app
+
+    client.app.dependency_overrides[
+        routes.fetch_geojson_for_energy_performance_by_wards
+    ] = override_fetch_geojson_for_energy_performance_by_wards
+
+    response = client.get("/data/energy-performance/wards")
+    assert response.status_code == 200
+    assert response.headers["etag"] == layer.etag
+
+    response = client.get(
+        "/data/energy-performance/wards", headers={"If-None-Match": layer.etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+
 def test_version_info(test_app):
     routes.config["metadata"] = {"version": "1.0"}
 
@@ -934,3 +986,329 @@ def test_buildings_download_success_response(test_app):
     response = client.get(f"/data/buildings/download?uprns={uprn}")
 
     assert response.status_code == 200
+
+
+def test_filter_summary_maps_aggregated_row(test_app):
+    summary_row = Mock(
+        postcode=["P30", "P33"],
+        built_form=["Detached"],
+        inspection_year=["2020", "2024"],
+        fuel_type=None,
+        window_glazing=["DoubleGlazing"],
+        wall_construction=[],
+        wall_insulation=None,
+        floor_construction=None,
+        floor_insulation=None,
+        any_roof_solar_panels=True,
+        any_no_roof_solar_panels=False,
+        roof_material=["ClayTile"],
+        any_roof_facing_north=True,
+        any_roof_facing_north_east=None,
+        any_roof_facing_north_west=False,
+        any_roof_facing_south=True,
+        any_roof_facing_south_east=False,
+        any_roof_facing_south_west=False,
+        any_roof_facing_east=False,
+        any_roof_facing_west=False,
+        roof_construction=["Pitched"],
+        roof_insulation_location=None,
+        roof_insulation_thickness=["270mm"],
+    )
+    mock_db_result = Mock()
+    mock_db_result.one.return_value = summary_row
+
+    client, mock_db_session = test_app
+    mock_db_session.execute.return_value = mock_db_result
+
+    response = client.get(
+        "/filter-summary?min_long=-1.5&max_long=-1.4&min_lat=50.9&max_lat=51.0"
+    )
+
+    assert response.status_code == 200
+    assert mock_db_session.execute.call_count == 1
+    summary = response.json()
+    assert sorted(summary["postcode"]) == ["P30", "P33"]
+    assert sorted(summary["inspection_year"]) == ["2020", "2024"]
+    assert summary["fuel_type"] == []
+    assert summary["has_roof_solar_panels"] == ["HasSolarPanels"]
+    assert sorted(summary["roof_aspect_area_direction"]) == ["North", "South"]
+    assert summary["roof_insulation_thickness"] == ["270mm"]
+
+
+def test_buildings_maps_coordinates_from_rows(test_app):
+    mock_db_result = Mock()
+    mock_db_result.__iter__ = lambda self: iter(
+        [
+            ("1", "1 High Street", "osgb1", -1.4, 50.9, "C", "House"),
+            ("2", "2 High Street", "osgb2", -1.5, 51.0, None, None),
+        ]
+    )
+
+    client, mock_db_session = test_app
+    mock_db_session.execute.return_value = mock_db_result
+
+    response = client.get(
+        "/buildings?min_long=-1.5&max_long=-1.4&min_lat=50.9&max_lat=51.0"
+    )
+
+    assert response.status_code == 200
+    buildings = response.json()
+    assert buildings[0] == {
+        "uri": None,
+        "securityLabel": None,
+        "types": [],
+        "uprn": "1",
+        "toid": "osgb1",
+        "first_line_of_address": "1 High Street",
+        "energy_rating": "C",
+        "structure_unit_type": "House",
+        "latitude": "50.9",
+        "longitude": "-1.4",
+    }
+    assert buildings[1]["energy_rating"] is None
+
+
+def test_buildings_streams_ndjson(test_app, monkeypatch):
+    def stream_building_rows(query, params):
+        async def partitions():
+            yield [("1", "1 High Street", "osgb1", -1.4, 50.9, "C", "House")]
+
+        return partitions()
+
+    monkeypatch.setattr(routes, "stream_partitions", stream_building_rows)
+    client, _ = test_app
+
+    response = client.get(
+        "/buildings?min_long=-1.5&max_long=-1.4&min_lat=50.9&max_lat=51.0&format=ndjson"
+    )
+
+    assert response.status_code == 200
+    assert json.loads(response.text.splitlines()[0])["longitude"] == "-1.4"
+
+
+def test_building_clusters(test_app):
+    cluster = Mock(
+        longitude=-1.45,
+        latitude=50.95,
+        building_count=12,
+        epc_a=1,
+        epc_b=2,
+        epc_c=3,
+        epc_d=2,
+        epc_e=1,
+        epc_f=0,
+        epc_g=0,
+        no_rating=3,
+    )
+    mock_db_result = Mock()
+    mock_db_result.__iter__ = lambda self: iter([cluster])
+
+    client, mock_db_session = test_app
+    mock_db_session.execute.return_value = mock_db_result
+
+    response = client.get(
+        "/buildings/clusters?min_long=-1.5&max_long=-1.4&min_lat=50.9&max_lat=51.0&zoom=10"
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "longitude": -1.45,
+            "latitude": 50.95,
+            "building_count": 12,
+            "epc_a": 1,
+            "epc_b": 2,
+            "epc_c": 3,
+            "epc_d": 2,
+            "epc_e": 1,
+            "epc_f": 0,
+            "epc_g": 0,
+            "no_rating": 3,
+        }
+    ]
+    params = mock_db_session.execute.call_args[0][1]
+    assert params["grid_size"] == pytest.approx(360.0 / (2**10 * 8))
+
+
+def test_building_clusters_requires_zoom(test_app):
+    client, _ = test_app
+
+    response = client.get(
+        "/buildings/clusters?min_long=-1.5&max_long=-1.4&min_lat=50.9&max_lat=51.0&zoom=30"
+    )
+
+    assert response.status_code == 422
+
+
+def test_dashboard_batch_runs_each_chart_on_its_own_session(test_app, monkeypatch):
+    client, _ = test_app
+    sessions = []
+
+    class DummySessionMaker:
+        def __call__(self):
+            session = AsyncMock()
+            mock_result = Mock()
+            mock_result.__iter__ = lambda self: iter([])
+            session.execute.return_value = mock_result
+            session.__aenter__.return_value = session
+            sessions.append(session)
+            return session
+
+    monkeypatch.setattr(routes, "get_session_maker", DummySessionMaker)
+
+    response = client.post(
+        "/dashboard/batch",
+        json={
+            "charts": ["epc-ratings", "fuel-types-by-building-type", "epc-ratings"],
+            "area_level": "region",
+            "area_names": ["London"],
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"epc-ratings": [], "fuel-types-by-building-type": []}
+    assert len(sessions) == 2
+    for session in sessions:
+        assert session.execute.call_args[0][1]["area_names"] == ["London"]
+
+
+def test_dashboard_batch_unknown_chart(test_app):
+    client, _ = test_app
+
+    response = client.post("/dashboard/batch", json={"charts": ["epc-ratings-by-colour"]})
+
+    assert response.status_code == 422
+    assert "epc-ratings-by-colour" in response.json()["detail"][0]["msg"]
+
+
+def filterable_building_row(uprn):
+    return Mock(
+        uprn=uprn,
+        post_code="SO16 1AB",
+        lodgement_date=datetime.date(2024, 5, 1),
+        built_form="Detached",
+        fuel_type="MainGas",
+        floor_construction=None,
+        floor_insulation=None,
+        roof_construction="Pitched",
+        roof_insulation="LoftInsulation",
+        roof_insulation_thickness="270mm",
+        wall_construction="CavityWall",
+        wall_insulation="FilledCavity",
+        window_glazing="DoubleGlazing",
+        has_roof_solar_panels=False,
+        roof_material="Clay Tile",
+        roof_aspect_area_facing_north_m2=12.5,
+        roof_aspect_area_facing_north_east_m2=None,
+        roof_aspect_area_facing_east_m2=None,
+        roof_aspect_area_facing_south_east_m2=None,
+        roof_aspect_area_facing_south_m2=12.5,
+        roof_aspect_area_facing_south_west_m2=None,
+        roof_aspect_area_facing_west_m2=None,
+        roof_aspect_area_facing_north_west_m2=None,
+    )
+
+
+def stream_filterable_building_rows(query, params):
+    async def partitions():
+        yield [filterable_building_row("1"), filterable_building_row("2")]
+        yield [filterable_building_row("3")]
+
+    return partitions()
+
+
+def test_filterable_buildings_streams_ndjson(test_app, monkeypatch):
+    monkeypatch.setattr(routes, "stream_partitions", stream_filterable_building_rows)
+    client, mock_db_session = test_app
+
+    response = client.get(
+        "/filterable-buildings?min_long=-1.5&max_long=-1.4&min_lat=50.9&max_lat=51.0",
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["uprn"] for line in lines] == ["1", "2", "3"]
+    assert lines[0]["lodgement_date"] == "2024-05-01"
+    assert lines[0]["roof_material"] == "ClayTile"
+    mock_db_session.execute.assert_not_called()
+
+
+def test_filterable_buildings_columnar(test_app, monkeypatch):
+    monkeypatch.setattr(routes, "stream_partitions", stream_filterable_building_rows)
+    client, _ = test_app
+
+    response = client.get(
+        "/filterable-buildings?min_long=-1.5&max_long=-1.4&min_lat=50.9&max_lat=51.0&format=columnar"
+    )
+
+    assert response.status_code == 200
+    columns = response.json()
+    assert columns["uprn"] == ["1", "2", "3"]
+    assert columns["roof_aspect_area_facing_south"] == [12.5, 12.5, 12.5]
+    assert set(columns) == set(routes.FilterableBuilding.model_fields)
+
+
+def test_filterable_buildings_invalid_format(test_app):
+    client, _ = test_app
+
+    response = client.get(
+        "/filterable-buildings?min_long=-1.5&max_long=-1.4&min_lat=50.9&max_lat=51.0&format=csv"
+    )
+
+    assert response.status_code == 422
+
+
+def test_vector_tile_returns_mvt(test_app, monkeypatch):
+    monkeypatch.setattr(routes, "tile_cache", routes.TTLCache(max_size=8))
+    mock_db_result = Mock()
+    mock_db_result.scalar.return_value = b"\x1a\x05tile"
+
+    client, mock_db_session = test_app
+    mock_db_session.execute.return_value = mock_db_result
+
+    response = client.get("/tiles/buildings/15/16370/10900.mvt")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == routes.MAPBOX_VECTOR_TILE
+    assert response.content == b"\x1a\x05tile"
+
+    # a second request for the same tile is served from the tile cache
+    response = client.get("/tiles/buildings/15/16370/10900.mvt")
+    assert response.status_code == 200
+    assert mock_db_session.execute.call_count == 1
+
+
+def test_vector_tile_empty_returns_no_content(test_app, monkeypatch):
+    monkeypatch.setattr(routes, "tile_cache", routes.TTLCache(max_size=8))
+    mock_db_result = Mock()
+    mock_db_result.scalar.return_value = b""
+
+    client, mock_db_session = test_app
+    mock_db_session.execute.return_value = mock_db_result
+
+    response = client.get("/tiles/wards/6/31/20.mvt")
+    assert response.status_code == 204
+
+
+def test_vector_tile_buildings_below_min_zoom_returns_no_content(test_app, monkeypatch):
+    monkeypatch.setattr(routes, "tile_cache", routes.TTLCache(max_size=8))
+    monkeypatch.setattr(routes.config_settings, "BUILDING_TILE_MIN_ZOOM", 11)
+    client, mock_db_session = test_app
+
+    response = client.get("/tiles/buildings/10/511/340.mvt")
+
+    assert response.status_code == 204
+    mock_db_session.execute.assert_not_called()
+
+
+def test_vector_tile_invalid_layer(test_app):
+    client, _ = test_app
+    response = client.get("/tiles/counties/6/31/20.mvt")
+    assert response.status_code == 422
+
+
+def test_vector_tile_out_of_range(test_app):
+    client, _ = test_app
+    response = client.get("/tiles/regions/2/4/1.mvt")
+    assert response.status_code == 422
@@ -0,0 +1,95 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from query import (get_count_of_epc_rating_by_area_level_query,
+                   get_count_of_epc_rating_query,
+                   get_number_of_in_date_and_expired_epcs_query)
+from snapshot_metadata import SnapshotMetadata, SnapshotMetadataCache
+
+POLYGON = '{"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]]]}'
+SNAPSHOTS = [date(2023, 12, 31), date(2024, 12, 31), date(2025, 12, 31)]
+
+
+def metadata_session(row):
+    db_session = AsyncMock()
+    db_session.execute.return_value.first = Mock(return_value=row)
+    return db_session
+
+
+@pytest.mark.asyncio
+async def test_metadata_is_read_once_per_check_interval():
+    db_session = metadata_session(
+        Mock(latest_snapshot_date=SNAPSHOTS[-1], snapshot_dates=SNAPSHOTS)
+    )
+    cache = SnapshotMetadataCache(check_interval=60)
+
+    first = await cache.get(db_session)
+    second = await cache.get(db_session)
+
+    assert first is second
+    assert first == SnapshotMetadata(SNAPSHOTS[-1], SNAPSHOTS)
+    db_session.execute.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_metadata_is_read_again_once_invalidated():
+    db_session = metadata_session(
+        Mock(latest_snapshot_date=SNAPSHOTS[-1], snapshot_dates=SNAPSHOTS)
+    )
+    cache = SnapshotMetadataCache(check_interval=60)
+
+    await cache.get(db_session)
+    cache.invalidate()
+    await cache.get(db_session)
+
+    assert db_session.execute.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_reads_no_metadata():
+    db_session = metadata_session(None)
+    cache = SnapshotMetadataCache(check_interval=60, enabled=False)
+
+    metadata = await cache.get(db_session)
+
+    assert metadata == SnapshotMetadata()
+    db_session.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_missing_metadata_has_no_snapshots():
+    cache = SnapshotMetadataCache(check_interval=60)
+
+    metadata = await cache.get(metadata_session(None))
+
+    assert metadata == SnapshotMetadata()
+
+
+def test_latest_snapshot_date_is_bound_as_parameter():
+    query, params = get_count_of_epc_rating_query(snapshot_date=SNAPSHOTS[-1])
+
+    assert "snapshot_date = :snapshot_date" in query
+    assert "MAX(snapshot_date)" not in query
+    assert params["snapshot_date"] == SNAPSHOTS[-1]
+
+
+def test_latest_snapshot_date_is_looked_up_when_unknown():
+    query, params = get_count_of_epc_rating_by_area_level_query("region")
+
+    assert "MAX(snapshot_date)" in query
+    assert "snapshot_date" not in params
+
+
+def test_polygon_timeline_uses_known_snapshot_dates():
+    query, params = get_number_of_in_date_and_expired_epcs_query(
+        polygon=POLYGON, snapshot_dates=SNAPSHOTS
+    )
+
+    assert "generate_series" not in query
+    assert params["snapshot_dates"] == SNAPSHOTS
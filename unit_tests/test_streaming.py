@@ -0,0 +1,62 @@
+# SPDX-License-Identifier: Apache-2.0
+# © Crown Copyright 2025. This work has been developed by the National Digital Twin Programme
+# and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
+
+import json
+
+import pytest
+
+from streaming import (NDJSON_MEDIA_TYPE, encode_columnar, encode_ndjson,
+                       get_response_format)
+
+
+class DummyRequest:
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+
+
+async def partitions():
+    yield [{"uprn": "1", "rating": "A"}, {"uprn": "2", "rating": None}]
+    yield [{"uprn": "3", "rating": "C"}]
+
+
+async def collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_get_response_format_prefers_query_parameter():
+    request = DummyRequest({"accept": NDJSON_MEDIA_TYPE})
+
+    assert get_response_format(request, "columnar") == "columnar"
+    assert get_response_format(request, None) == "ndjson"
+    assert get_response_format(DummyRequest({"accept": "*/*"}), None) == "json"
+
+
+@pytest.mark.asyncio
+async def test_encode_ndjson_writes_one_object_per_line():
+    body = await collect(encode_ndjson(partitions(), dict))
+
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+    assert lines == [
+        {"uprn": "1", "rating": "A"},
+        {"uprn": "2", "rating": None},
+        {"uprn": "3", "rating": "C"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_encode_columnar_writes_one_array_per_field():
+    body = await collect(encode_columnar(partitions(), dict, ["uprn", "rating"]))
+
+    assert json.loads(body) == {"uprn": ["1", "2", "3"], "rating": ["A", None, "C"]}
+
+
+@pytest.mark.asyncio
+async def test_encode_columnar_without_rows():
+    async def no_partitions():
+        return
+        yield
+
+    body = await collect(encode_columnar(no_partitions(), dict, ["uprn"]))
+
+    assert json.loads(body) == {"uprn": []}
@@ -3,6 +3,7 @@
 # and is legally attributed to the Department for Business and Trade (UK) as the governing entity.
 
 import pytest
+from config import get_settings
 from api.utils import (
     validate_geojson_polygon,
     is_welsh_region,
@@ -63,6 +64,33 @@ class TestValidateGeojsonPolygon:
                 '{"type": "Polygon", "coordinates": "not an array"}'
             )
 
+    def test_too_many_vertices(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "POLYGON_MAX_VERTICES", 4)
+        with pytest.raises(ValueError, match="Polygon has 5 vertices, the maximum is 4"):
+            validate_geojson_polygon(
+                '{"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]]}'
+            )
+
+    def test_area_too_large(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "POLYGON_MAX_AREA_KM2", 1000.0)
+        # roughly 70km by 111km at the latitude of London
+        with pytest.raises(ValueError, match="Polygon covers 7[0-9]{3} km²"):
+            validate_geojson_polygon(
+                '{"type": "Polygon", "coordinates": [[[0, 51], [1, 51], [1, 52], [0, 52], [0, 51]]]}'
+            )
+
+    def test_holes_are_excluded_from_area(self, monkeypatch):
+        monkeypatch.setattr(get_settings(), "POLYGON_MAX_AREA_KM2", 1000.0)
+        validate_geojson_polygon(
+            '{"type": "Polygon", "coordinates": ['
+            "[[0, 51], [1, 51], [1, 52], [0, 52], [0, 51]],"
+            "[[0.01, 51.01], [0.99, 51.01], [0.99, 51.99], [0.01, 51.99], [0.01, 51.01]]]}"
+        )
+
+    def test_malformed_rings(self):
+        with pytest.raises(ValueError, match="arrays of \\[longitude, latitude\\] rings"):
+            validate_geojson_polygon('{"type": "Polygon", "coordinates": [[0, 0]]}')
+
 
 class TestIsWelshRegion:
     def test_identifies_welsh_regions(self):